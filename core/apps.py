@@ -7,4 +7,4 @@ class CoreConfig(AppConfig):
     name = 'core'
 
     def ready(self):
-        pass
\ No newline at end of file
+        from . import signals  # noqa: F401
\ No newline at end of file
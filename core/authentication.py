@@ -0,0 +1,38 @@
+# core/authentication.py
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+
+def hot_path_authentication_classes():
+    """
+    Authenticators for high-traffic endpoints (settings.HOT_PATH_AUTHENTICATION_CLASSES).
+
+    The default authenticators unless HOT_PATH_JWT_ONLY is set; then it is
+    JWT only, so a request to e.g. /api/player-stats/ never falls through to
+    BasicAuthentication (a PBKDF2 hash per request) or the session lookup.
+    """
+    return [import_string(path) for path in settings.HOT_PATH_AUTHENTICATION_CLASSES]
+
+
+def get_validated_token(request, query_token=True):
+    """
+    Validate the access token of a plain Django request without touching the
+    database. The token is read from the Authorization header, or (unless
+    ``query_token`` is False) from ?token= for clients such as EventSource
+    that cannot set headers. Returns the token, or None when it is missing
+    or invalid.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header:
+        raw_token = authentication.get_raw_token(header)
+    else:
+        raw_token = request.GET.get('token') if query_token else None
+    if not raw_token:
+        return None
+    try:
+        return authentication.get_validated_token(raw_token)
+    except (InvalidToken, TokenError):
+        return None
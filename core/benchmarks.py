@@ -0,0 +1,404 @@
+# core/benchmarks.py
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .core import wrap_response
+from .leaderboards import leaderboard
+from .models import Game, Matchday, Metric, Player, PlayerGameStat, PlayerSeasonStat
+from .renderers import FastJSONRenderer, orjson
+from .serializers import PlayerGameStatFastSerializer, PlayerGameStatSerializer, RoleTokenObtainPairSerializer
+from .stats import apply_increments, enqueue_increments, flush_pending_increments
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return 0.0
+    index = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return samples[index]
+
+
+def measure(fn, iterations=100, warmup=5):
+    """
+    Call ``fn`` ``iterations`` times and summarise the wall-clock latency.
+    """
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "ops_per_sec": round(iterations / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(samples) / len(samples), 3),
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+    }
+
+
+def bench_leaderboard(iterations):
+    """Top-10 season leaderboard for the largest (season, metric) pair."""
+    target = (
+        PlayerSeasonStat.objects.values('season_id', 'metric_id')
+        .annotate(rows=Count('id'))
+        .order_by('-rows')
+        .first()
+    )
+    if target is None:
+        return {"skipped": "no PlayerSeasonStat rows; run rebuild_rollups first"}
+
+    result = measure(
+        lambda: list(leaderboard(target['metric_id'], season_id=target['season_id'])[:10]),
+        iterations,
+    )
+    result["rows_ranked"] = target["rows"]
+    return result
+
+
+def bench_ingest(iterations):
+    """
+    Per-event throughput of synchronous increments vs. queued increments
+    flushed in one coalesced batch, all on one hot (game, player, metric)
+    key. Runs inside a transaction that is rolled back.
+    """
+    game = Game.objects.values_list('id', flat=True).first()
+    player = Player.objects.values_list('id', flat=True).first()
+    metric = Metric.objects.values_list('id', flat=True).first()
+    if None in (game, player, metric):
+        return {"skipped": "needs at least one game, player and metric"}
+
+    increment = (game, player, metric, 1)
+    with transaction.atomic():
+        started = time.perf_counter()
+        for _ in range(iterations):
+            apply_increments([increment])
+        sync_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            enqueue_increments([increment])
+        flush_pending_increments(limit=iterations)
+        queued_elapsed = time.perf_counter() - started
+
+        transaction.set_rollback(True)
+
+    return {
+        "events": iterations,
+        "sync_events_per_sec": round(iterations / sync_elapsed, 1),
+        "queued_events_per_sec": round(iterations / queued_elapsed, 1),
+    }
+
+
+def bench_serializers(iterations, rows=10000):
+    """
+    PlayerGameStatSerializer vs. PlayerGameStatFastSerializer on ``rows``
+    in-memory rows (no database), so only serialization is measured.
+    """
+    now = timezone.now()
+    metric = Metric(id=1, name="Goal", short_code="GOAL")
+    player = Player(id=1, name="Player", jersey_number=9)
+    game = Game(id=1, date=now)
+    instances = [
+        PlayerGameStat(id=i, game=game, player=player, metric=metric, count=i, created_at=now, updated_at=now)
+        for i in range(rows)
+    ]
+    values = [
+        {
+            "id": i, "player__name": player.name, "player__jersey_number": player.jersey_number,
+            "metric__name": metric.name, "metric__short_code": metric.short_code, "count": i,
+            "game__date": now, "created_at": now, "updated_at": now,
+        }
+        for i in range(rows)
+    ]
+
+    iterations = max(1, iterations // 20)
+    model = measure(lambda: PlayerGameStatSerializer(instances, many=True).data, iterations, warmup=1)
+    fast = measure(lambda: PlayerGameStatFastSerializer.serialize(values), iterations, warmup=1)
+    return {
+        "rows": rows,
+        "model_serializer_p50_ms": model["p50_ms"],
+        "values_serializer_p50_ms": fast["p50_ms"],
+        "speedup": round(model["p50_ms"] / fast["p50_ms"], 1) if fast["p50_ms"] else None,
+    }
+
+
+def bench_envelope(iterations, rows=10000):
+    """
+    Wrapping and rendering a ``rows``-item list response: wrap_response plus
+    DRF's stdlib JSONRenderer vs. FastJSONRenderer. ``wrap_ms`` is the
+    envelope alone, before encoding.
+    """
+    now = timezone.now()
+    data = [
+        {
+            "id": i, "player_name": "Player é", "player_jersey": 9, "metric": "Goal",
+            "metric_short_code": "GOAL", "count": i, "game_date": "2024-08-17 14:30",
+            "created_at": now, "updated_at": now,
+        }
+        for i in range(rows)
+    ]
+    view = wrap_response(lambda self, request: Response(data))
+    stdlib, fast = JSONRenderer(), FastJSONRenderer()
+
+    iterations = max(1, iterations // 20)
+    wrap = measure(lambda: view(None, None), iterations, warmup=1)
+    stdlib_result = measure(lambda: stdlib.render(view(None, None).data), iterations, warmup=1)
+    fast_result = measure(lambda: fast.render(view(None, None).data), iterations, warmup=1)
+    return {
+        "rows": rows,
+        "backend": "orjson" if orjson is not None else "stdlib",
+        "wrap_ms": wrap["p50_ms"],
+        "json_renderer_p50_ms": stdlib_result["p50_ms"],
+        "fast_renderer_p50_ms": fast_result["p50_ms"],
+        "speedup": round(stdlib_result["p50_ms"] / fast_result["p50_ms"], 1) if fast_result["p50_ms"] else None,
+    }
+
+
+def endpoint_paths():
+    """
+    GET paths for the hot read endpoints, pointed at the busiest game,
+    player, season and matchday in the database.
+    """
+    game = PlayerGameStat.objects.values('game_id').annotate(rows=Count('id')).order_by('-rows').first()
+    if game is None:
+        return {}
+    game_id = game['game_id']
+    player_id = PlayerGameStat.objects.filter(game_id=game_id).values_list('player_id', flat=True).first()
+    matchday_id = Game.objects.filter(id=game_id).values_list('matchday_id', flat=True).get()
+    season_id = Matchday.objects.filter(id=matchday_id).values_list('season_id', flat=True).get()
+    metric_id = PlayerGameStat.objects.filter(game_id=game_id).values_list('metric_id', flat=True).first()
+
+    return {
+        "games": "/api/games/",
+        "metrics": "/api/metrics/",
+        "match_sheet": f"/api/games/{game_id}/match-sheet/",
+        "players_with_stats": f"/api/players/?game_id={game_id}",
+        "player_stats_by_game": f"/api/player-stats/?game_id={game_id}",
+        "player_stats_by_player": f"/api/player-stats/?player_id={player_id}",
+        "season_stats": f"/api/season-stats/?season_id={season_id}&player_id={player_id}",
+        "season_standings": f"/api/seasons/{season_id}/standings/",
+        "player_form": f"/api/players/{player_id}/form/?metric={metric_id}&window=5",
+        "season_leaderboard": f"/api/leaderboards/?metric={metric_id}&season={season_id}",
+        "matchday_leaderboard": f"/api/leaderboards/?metric={metric_id}&matchday={matchday_id}",
+        "export_csv": f"/api/player-stats/export/?output=csv&game_id={game_id}",
+    }
+
+
+def bench_endpoints(iterations):
+    """
+    Drive the real URLconf in-process with the Django test client, signed in
+    with a real JWT, and report req/s, latency percentiles and the number of
+    queries per request for each endpoint. The benchmark user is created in
+    a transaction that is rolled back.
+    """
+    paths = endpoint_paths()
+    if not paths:
+        return {"skipped": "no PlayerGameStat rows; run seed_data first"}
+
+    results = {}
+    with transaction.atomic():
+        user = User.objects.create_superuser("benchmark", "benchmark@example.com", None)
+        token = RoleTokenObtainPairSerializer.get_token(user).access_token
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        def get(path):
+            response = client.get(path)
+            if response.streaming:
+                return response, b"".join(response.streaming_content)
+            return response, response.content
+
+        for name, path in paths.items():
+            # Counted on a warm request (cached responses are filled by
+            # the first) with an execute wrapper: the test client resets
+            # connection.queries at the start of every request.
+            get(path)
+            queries = []
+
+            def count(execute, sql, params, many, context):
+                queries.append(sql)
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count):
+                response, body = get(path)
+            result = measure(lambda: get(path), iterations)
+            results[name] = {
+                "path": path,
+                "status": response.status_code,
+                "queries": len(queries),
+                "bytes": len(body),
+                "req_per_sec": result["ops_per_sec"],
+                "p50_ms": result["p50_ms"],
+                "p95_ms": result["p95_ms"],
+                "p99_ms": result["p99_ms"],
+            }
+
+        transaction.set_rollback(True)
+    return results
+
+
+def bench_connections(iterations):
+    """
+    Connection overhead per request: the request_started/request_finished
+    connection handling around one small query, with CONN_MAX_AGE=0 (a new
+    connection every request, or a pool checkout when DB_POOL is on) vs. a
+    persistent connection with health checks.
+    """
+    if connection.in_atomic_block or (connection.vendor == "sqlite" and connection.is_in_memory_db()):
+        return {"skipped": "needs a file or server database outside a transaction"}
+
+    settings_dict = connection.settings_dict
+    saved = settings_dict["CONN_MAX_AGE"], settings_dict["CONN_HEALTH_CHECKS"]
+    pooled = bool(settings_dict.get("OPTIONS", {}).get("pool"))
+
+    def request():
+        close_old_connections()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        close_old_connections()
+
+    try:
+        connection.close()
+        settings_dict["CONN_MAX_AGE"], settings_dict["CONN_HEALTH_CHECKS"] = 0, False
+        per_request = measure(request, iterations)
+        result = {
+            "database": connection.vendor,
+            "pool": pooled,
+            "per_request_connection_p50_ms": per_request["p50_ms"],
+            "per_request_connection_p99_ms": per_request["p99_ms"],
+        }
+        if not pooled:
+            connection.close()
+            settings_dict["CONN_MAX_AGE"], settings_dict["CONN_HEALTH_CHECKS"] = saved[0] or 600, True
+            persistent = measure(request, iterations)
+            result.update({
+                "persistent_p50_ms": persistent["p50_ms"],
+                "persistent_p99_ms": persistent["p99_ms"],
+                "speedup": round(per_request["p50_ms"] / persistent["p50_ms"], 1) if persistent["p50_ms"] else None,
+            })
+    finally:
+        connection.close()
+        settings_dict["CONN_MAX_AGE"], settings_dict["CONN_HEALTH_CHECKS"] = saved
+    return result
+
+
+async def _http_get(reader, writer, request):
+    """
+    One keep-alive GET on an open connection. Returns (status, keep_alive);
+    the body is read and discarded.
+    """
+    writer.write(request)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip().lower()
+
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.read()
+        return status, False
+    return status, headers.get("connection") != "close"
+
+
+async def _load(url, connections, duration, headers, timeout):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    request = "".join(
+        [f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"]
+        + [f"{name}: {value}\r\n" for name, value in headers.items()]
+        + ["\r\n"]
+    ).encode("latin-1")
+
+    samples, statuses, errors = [], {}, {}
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        reader = writer = None
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+                status, keep_alive = await asyncio.wait_for(_http_get(reader, writer, request), timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError) as exc:
+                errors[type(exc).__name__] = errors.get(type(exc).__name__, 0) + 1
+                keep_alive = False
+                await asyncio.sleep(0.1)  # don't spin against a refused port
+            else:
+                samples.append((time.perf_counter() - started) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+            if not keep_alive and writer is not None:
+                writer.close()
+                reader = writer = None
+        if writer is not None:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(connections)])
+    elapsed = time.perf_counter() - started
+
+    samples.sort()
+    return {
+        "url": url,
+        "connections": connections,
+        "requests": len(samples),
+        "req_per_sec": round(len(samples) / elapsed, 1),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "errors": errors,
+        "p50_ms": round(percentile(samples, 50), 1),
+        "p95_ms": round(percentile(samples, 95), 1),
+        "p99_ms": round(percentile(samples, 99), 1),
+    }
+
+
+def load_test(url, connections=500, duration=10.0, headers=None, timeout=30.0):
+    """
+    Hold ``connections`` concurrent HTTP/1.1 connections open against a
+    running server for ``duration`` seconds, each issuing GETs to ``url``
+    back to back (reconnecting when the server closes the connection, as
+    gunicorn's sync workers do after every response). Reports throughput,
+    latency percentiles, status counts and connection errors. The load is
+    generated by one asyncio loop, so it is a fair comparison of servers on
+    the same URL, not an absolute ceiling of either.
+    """
+    return asyncio.run(_load(url, connections, duration, headers or {}, timeout))
+
+
+SCENARIOS = {
+    "leaderboard": bench_leaderboard,
+    "ingest": bench_ingest,
+    "serializers": bench_serializers,
+    "envelope": bench_envelope,
+    "endpoints": bench_endpoints,
+    "connections": bench_connections,
+}
@@ -0,0 +1,150 @@
+# core/broadcast.py
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """
+    One listener on one game. Events are buffered in a bounded queue; when a
+    slow client lets it fill up the oldest event is dropped. Every event
+    carries absolute counts, so a client that skips some still converges.
+    """
+    def __init__(self, broker, channel, queue_size):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def push(self, event):
+        """Thread-safe: may be called from any thread."""
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """
+    Fans stat events out to the subscribers of this process. Enough for a
+    single ASGI worker; use RedisBroker when running several.
+    """
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, self.queue_size)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def publish(self, channel, event):
+        self.deliver(channel, event)
+
+    def deliver(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.push(event)
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Publishes through Redis (or any server speaking its pub/sub protocol) so
+    every worker sees every event. Each process keeps one pattern
+    subscription and fans out to its local subscribers.
+    """
+    prefix = "stats:game:"
+
+    def __init__(self, url="redis://localhost:6379/0", queue_size=100):
+        super().__init__(queue_size=queue_size)
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError:
+            raise ImproperlyConfigured("RedisBroker requires the 'redis' package.")
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+        self._async_redis = redis.asyncio
+        self._listener = None
+
+    def subscribe(self, channel):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return super().subscribe(channel)
+
+    def publish(self, channel, event):
+        self._client.publish(f"{self.prefix}{channel}", json.dumps(event))
+
+    async def _listen(self):
+        client = self._async_redis.Redis.from_url(self.url)
+        async with client.pubsub() as pubsub:
+            await pubsub.psubscribe(f"{self.prefix}*")
+            async for message in pubsub.listen():
+                if message["type"] != "pmessage":
+                    continue
+                channel = int(message["channel"].decode()[len(self.prefix):])
+                self.deliver(channel, json.loads(message["data"]))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """The broker configured in settings.STAT_BROADCAST, created on first use."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = settings.STAT_BROADCAST
+                _broker = import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
+    return _broker
+
+
+def publish_increments(deltas, counts, versions=None):
+    """
+    Broadcast applied increments, one event per game:
+      {"game_id": 5, "version": 42, "stats": [{"player_id", "metric_id", "value", "count"}, ...]}
+    ``version`` is the game's stats_version after the increments.
+    """
+    events = defaultdict(list)
+    for (game_id, player_id, metric_id), value in deltas.items():
+        events[game_id].append({
+            "player_id": player_id,
+            "metric_id": metric_id,
+            "value": value,
+            "count": counts.get((game_id, player_id, metric_id)),
+        })
+
+    broker = get_broker()
+    for game_id, stats in events.items():
+        broker.publish(game_id, {"game_id": game_id, "version": (versions or {}).get(game_id), "stats": stats})
@@ -0,0 +1,96 @@
+# core/cache.py
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from .renderers import FastJSONRenderer
+
+
+def _version_key(model):
+    return f"core:version:{model._meta.label_lower}"
+
+
+def model_version(model):
+    """
+    Current cache version of a model. Seeded from the clock, so a version
+    evicted (or expired, see CACHE_VERSION_TIMEOUT) never comes back with a
+    value already used.
+    """
+    return cache.get_or_set(_version_key(model), time.time_ns, settings.CACHE_VERSION_TIMEOUT)
+
+
+def bump_version(model):
+    """Invalidate every cached entry that depends on ``model``."""
+    try:
+        cache.incr(_version_key(model))
+    except ValueError:
+        cache.set(_version_key(model), time.time_ns(), settings.CACHE_VERSION_TIMEOUT)
+
+
+class CachedReadMixin:
+    """
+    Caches the enveloped list/retrieve responses of a viewset.
+
+    Entries are keyed by path, query string and the versions of
+    ``cache_models``; a post_save/post_delete on any of them bumps its
+    version (see core.signals), so stale entries are never read again.
+    Responses carry an ETag and a matching If-None-Match gets a bare 304.
+    """
+    cache_models = []
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_read(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_read(super().retrieve, request, *args, **kwargs)
+
+    def get_cache_key(self, request):
+        # The full URI: paginated bodies carry absolute next/previous links.
+        versions = ".".join(str(model_version(model)) for model in self.cache_models)
+        return f"core:response:{versions}:{request.build_absolute_uri()}"
+
+    def cached_read(self, handler, request, *args, **kwargs):
+        key = self.get_cache_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            body = FastJSONRenderer().render(response.data)
+            entry = ('"%s"' % hashlib.md5(body).hexdigest(), response.data)
+            cache.set(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+
+        etag, data = entry
+        if request.META.get("HTTP_IF_NONE_MATCH") == etag:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data, status=status.HTTP_200_OK)
+        response["ETag"] = etag
+        return response
+
+
+_metrics = (None, {})
+
+
+def get_metrics(expect=()):
+    """
+    {metric_id: (name, short_code)} held in process memory.
+
+    Reloaded when the Metric version changes, so the stat write path checks
+    metric ids without a query. With a per-process cache another worker's
+    change only shows up once the version expires, so callers pass the ids
+    they ``expect`` and the map is also reloaded when one of them is
+    missing, before it is rejected.
+    """
+    global _metrics
+    from .models import Metric
+
+    version = model_version(Metric)
+    if _metrics[0] != version or not _metrics[1].keys() >= set(expect):
+        rows = Metric.objects.values_list("id", "name", "short_code")
+        _metrics = (version, {pk: (name, short_code) for pk, name, short_code in rows})
+    return _metrics[1]
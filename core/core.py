@@ -1,18 +1,54 @@
 # yourapp/core.py
+from functools import wraps
+
+from django.http import HttpResponse
 from rest_framework.views import exception_handler
 from rest_framework.response import Response
 from rest_framework import status
 
+from .renderers import FastJSONRenderer
+
+DEFAULT_MESSAGE = "Operation successful."
+
+# Friendly messages for the success codes views return.
+SUCCESS_MESSAGES = {
+    200: "Record fetched successfully.",
+    201: "Record created successfully.",
+    202: "Record updated successfully.",
+    204: "Record deleted successfully.",
+}
+
+
+def _envelope(data, http_status, message):
+    return {
+        "status": "success" if http_status < 400 else "error",
+        "message": message,
+        "data": data if data is not None else {},
+    }
+
 
-def _wrap(data, http_status, message="Operation successful."):
-    """Helper that builds the final enveloped response."""
-    return Response(
-        {
-            "status": "success" if http_status < 400 else "error",
-            "message": message,
-            "data": data if data is not None else {},
-        },
+def _wrap(data, http_status, message=DEFAULT_MESSAGE, response=None):
+    """
+    Helper that builds the final enveloped response. When ``response`` is
+    given it is reused, so headers set by the view or by DRF's exception
+    handler (Location, WWW-Authenticate, Retry-After...) survive wrapping.
+    """
+    if response is None:
+        return Response(_envelope(data, http_status, message), status=http_status)
+    response.data = _envelope(data, http_status, message)
+    return response
+
+
+def json_envelope(data, http_status, message=DEFAULT_MESSAGE):
+    """
+    Same envelope as _wrap, for plain Django (non-DRF) views such as the
+    async read views. Rendered by FastJSONRenderer, so the body matches the
+    DRF responses byte for byte.
+    """
+    return HttpResponse(
+        FastJSONRenderer().render(_envelope(data, http_status, message)),
         status=http_status,
+        content_type="application/json",
     )
 
 
@@ -33,6 +69,7 @@ def custom_exception_handler(exc, context):
             data=response.data,
             http_status=response.status_code,
             message=custom_message,
+            response=response,
         )
 
     # If DRF could not handle the exception → 500
@@ -47,21 +84,20 @@ def wrap_response(view_func):
     """
     Decorator for class-based views (APIView, ViewSet actions, etc.)
     """
+    @wraps(view_func)
     def wrapped_view(self, request, *args, **kwargs):
         response = view_func(self, request, *args, **kwargs)
 
         # If the view already returned a Response → wrap it
         if isinstance(response, Response):
-            # Preserve the original status code
+            # A 304 has no body to wrap
+            if response.status_code == status.HTTP_304_NOT_MODIFIED:
+                return response
+            # Preserve the original status code and headers
             http_status = response.status_code
             # Use a friendly message for success cases
-            default_msg = {
-                200: "Record fetched successfully.",
-                201: "Record created successfully.",
-                202: "Record updated successfully.",
-                204: "Record deleted successfully.",
-            }.get(http_status, "Operation successful.")
-            return _wrap(response.data, http_status, default_msg)
+            message = SUCCESS_MESSAGES.get(http_status, DEFAULT_MESSAGE)
+            return _wrap(response.data, http_status, message, response=response)
 
         # If the view returned raw data (rare), wrap it with 200
         return _wrap(response, status.HTTP_200_OK)
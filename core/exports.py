@@ -0,0 +1,85 @@
+# core/exports.py
+import csv
+import io
+import json
+
+from django.db.models.functions import Coalesce
+
+from .models import PlayerGameStat
+
+# (output column, ORM lookup) for every exported PlayerGameStat row
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('game_id', 'game_id'),
+    ('game_date', 'game__date'),
+    ('matchday_id', 'game__matchday_id'),
+    ('player_id', 'player_id'),
+    ('player_name', 'player__name'),
+    ('player_jersey', 'player__jersey_number'),
+    ('team_id', 'stat_team_id'),
+    ('metric_id', 'metric_id'),
+    ('metric', 'metric__name'),
+    ('metric_short_code', 'metric__short_code'),
+    ('count', 'count'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+]
+
+# query param -> filter lookup
+EXPORT_FILTERS = {
+    'game_id': 'game_id',
+    'player_id': 'player_id',
+    'metric_id': 'metric_id',
+    'team_id': 'stat_team_id',
+    'matchday_id': 'game__matchday_id',
+    'season_id': 'game__matchday__season_id',
+}
+
+
+def export_rows(filters, chunk_size=2000):
+    """
+    Stream PlayerGameStat rows as tuples in EXPORT_COLUMNS order. One joined
+    query read through a cursor, so memory stays flat however many rows match.
+    team_id is the team the player played for in that game, not their
+    current club (see PlayerGameStat.team).
+    """
+    queryset = (
+        PlayerGameStat.objects
+        .annotate(stat_team_id=Coalesce('team_id', 'player__team_id'))
+        .filter(**filters)
+        .order_by('id')
+    )
+    rows = queryset.values_list(*[lookup for _, lookup in EXPORT_COLUMNS])
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield tuple(value.isoformat() if hasattr(value, 'isoformat') else value for value in row)
+
+
+def _batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def to_csv(rows, batch_size=1000):
+    """Header line, then CSV text in chunks of ``batch_size`` rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    yield buffer.getvalue()
+    for batch in _batched(rows, batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue()
+
+
+def to_ndjson(rows, batch_size=1000):
+    """One JSON object per line, in chunks of ``batch_size`` rows."""
+    names = [name for name, _ in EXPORT_COLUMNS]
+    for batch in _batched(rows, batch_size):
+        yield ''.join(json.dumps(dict(zip(names, row))) + '\n' for row in batch)
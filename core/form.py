@@ -0,0 +1,129 @@
+# core/form.py
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, FilteredRelation, Q, Sum, Value, Window
+from django.db.models.expressions import RowRange
+from django.db.models.functions import Coalesce
+
+from .cache import get_metrics, model_version
+from .models import Game, PlayerGameStat
+
+MAX_FORM_WINDOW = 50
+
+
+def _version_key(player_id):
+    return f"core:form-version:{player_id}"
+
+
+def bump_form_versions(player_ids):
+    """
+    Invalidate the cached form series of ``player_ids`` (after their stats
+    changed). With a per-process cache (locmem) this only reaches the
+    current process; the others pick the change up when their version key
+    expires after CACHE_VERSION_TIMEOUT.
+    """
+    for player_id in player_ids:
+        try:
+            cache.incr(_version_key(player_id))
+        except ValueError:
+            pass  # no version yet: the next read seeds a new one
+
+
+def minutes_metric_id():
+    """Id of the FORM_MINUTES_METRIC metric, or None if there is none."""
+    for metric_id, (_, short_code) in get_metrics().items():
+        if short_code == settings.FORM_MINUTES_METRIC:
+            return metric_id
+    return None
+
+
+def player_form(player_id, metric_id, window=5, season_id=None):
+    """
+    Per-game series of one metric for one player, oldest game first, with
+    rolling aggregates over the last ``window`` games (the game itself
+    included) and, when a minutes metric exists, per-90 rates.
+
+    The series covers every game the player has any stat in, so games in
+    which the metric stayed at zero count towards the window. It is one
+    query: the player's games are found through the (player, game) index,
+    the metric and minutes rows are joined on the unique (game, player,
+    metric) key and the windows are computed by the database.
+
+    Cached until one of the player's stats changes (see bump_form_versions),
+    a game is edited or events are replayed; on a locmem cache, changes made
+    by other processes show after at most CACHE_VERSION_TIMEOUT.
+    """
+    versions = (
+        # Seeded from the clock and expiring like model_version.
+        cache.get_or_set(_version_key(player_id), time.time_ns, settings.CACHE_VERSION_TIMEOUT),
+        model_version(Game),
+        model_version(PlayerGameStat),
+    )
+    key = "core:form:{}:{}:{}:{}:{}".format(player_id, metric_id, window, season_id, ".".join(map(str, versions)))
+    series = cache.get(key)
+    if series is None:
+        series = _series(player_id, metric_id, window, season_id)
+        cache.set(key, series, settings.FORM_CACHE_TIMEOUT)
+    return series
+
+
+def _series(player_id, metric_id, window, season_id):
+    minutes_id = minutes_metric_id()
+    games = Game.objects.filter(
+        id__in=PlayerGameStat.objects.filter(player_id=player_id).values("game_id"),
+    )
+    if season_id is not None:
+        games = games.filter(matchday__season_id=season_id)
+
+    order = [F("date").asc(), F("id").asc()]
+    frame = RowRange(start=-(window - 1), end=0)
+
+    def rolling(expression):
+        return Window(expression=expression, order_by=order, frame=frame)
+
+    games = games.annotate(
+        stat=FilteredRelation("playergamestat", condition=Q(
+            playergamestat__player_id=player_id, playergamestat__metric_id=metric_id,
+        )),
+        value=Coalesce(F("stat__count"), Value(0)),
+        rolling_sum=rolling(Sum("value")),
+        rolling_avg=rolling(Avg("value")),
+        rolling_games=rolling(Count("id")),
+    )
+    fields = ["id", "date", "matchday_id", "value", "rolling_sum", "rolling_avg", "rolling_games"]
+    if minutes_id is not None:
+        games = games.annotate(
+            played=FilteredRelation("playergamestat", condition=Q(
+                playergamestat__player_id=player_id, playergamestat__metric_id=minutes_id,
+            )),
+            minutes=Coalesce(F("played__count"), Value(0)),
+            rolling_minutes=rolling(Sum("minutes")),
+        )
+        fields += ["minutes", "rolling_minutes"]
+
+    series = []
+    for row in games.order_by(*order).values(*fields):
+        point = {
+            "game_id": row["id"],
+            "date": row["date"],
+            "matchday_id": row["matchday_id"],
+            "value": row["value"],
+            "rolling_sum": row["rolling_sum"],
+            "rolling_avg": round(float(row["rolling_avg"]), 3),
+            "rolling_games": row["rolling_games"],
+        }
+        if minutes_id is not None:
+            point.update({
+                "minutes": row["minutes"],
+                "per_90": _per_90(row["value"], row["minutes"]),
+                "rolling_minutes": row["rolling_minutes"],
+                "rolling_per_90": _per_90(row["rolling_sum"], row["rolling_minutes"]),
+            })
+        series.append(point)
+    return series
+
+
+def _per_90(value, minutes):
+    return round(value * 90 / minutes, 3) if minutes else None
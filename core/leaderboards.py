@@ -0,0 +1,42 @@
+# core/leaderboards.py
+from django.db.models import F, Sum, Window
+from django.db.models.functions import Coalesce, Rank
+
+from .models import PlayerGameStat, PlayerSeasonStat
+
+
+def leaderboard(metric_id, season_id=None, matchday_id=None, team_id=None):
+    """
+    Ranked queryset of {rank, player_id, player_name, team_id, count} rows.
+
+    Season leaderboards are read from the PlayerSeasonStat rollup through the
+    (season, metric, -count) index; season totals are per player, so there
+    ``team_id`` is the player's current club. Matchday leaderboards sum the
+    handful of PlayerGameStat rows of that matchday, and ``team_id`` is the
+    team the player played for in those games. Ties share a rank (1, 1, 3, ...).
+    """
+    if matchday_id:
+        queryset = (
+            PlayerGameStat.objects
+            .filter(game__matchday_id=matchday_id, metric_id=metric_id)
+            .values('player_id', stat_team_id=Coalesce('team_id', 'player__team_id'))
+            .annotate(count=Sum('count'))
+        )
+        team = 'stat_team_id'
+    else:
+        queryset = PlayerSeasonStat.objects.filter(season_id=season_id, metric_id=metric_id)
+        team = 'player__team_id'
+
+    if team_id:
+        queryset = queryset.filter(**{team: team_id})
+
+    return (
+        queryset
+        .annotate(
+            rank=Window(expression=Rank(), order_by=F('count').desc()),
+            player_name=F('player__name'),
+            team_id=F(team),
+        )
+        .order_by('-count', 'player_id')
+        .values('rank', 'player_id', 'player_name', 'team_id', 'count')
+    )
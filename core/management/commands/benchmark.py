@@ -0,0 +1,45 @@
+# core/management/commands/benchmark.py
+import json
+import platform
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core.benchmarks import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = 'Run micro-benchmarks and in-process endpoint load tests against the configured database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenarios', nargs='*', help=f"Any of: {', '.join(SCENARIOS)} (default: all)")
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--output', help='Also write the results to this JSON file, for comparing runs')
+
+    def handle(self, *args, **options):
+        names = options['scenarios'] or list(SCENARIOS)
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+
+        results = {}
+        for name in names:
+            results[name] = SCENARIOS[name](options['iterations'])
+            self.stdout.write(f"{name}: {json.dumps(results[name])}")
+
+        if options['output']:
+            run = {
+                "created_at": timezone.now().isoformat(),
+                "iterations": options['iterations'],
+                "database": connection.vendor,
+                "debug": settings.DEBUG,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "scenarios": results,
+            }
+            with open(options['output'], 'w') as f:
+                json.dump(run, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
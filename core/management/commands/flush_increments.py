@@ -0,0 +1,25 @@
+# core/management/commands/flush_increments.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.stats import flush_pending_increments
+
+
+class Command(BaseCommand):
+    help = 'Apply queued stat increments (STAT_INGEST_MODE = "queue") in coalesced batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0.2, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit')
+
+    def handle(self, *args, **options):
+        while True:
+            applied = flush_pending_increments(limit=options['batch_size'])
+            if applied:
+                self.stdout.write(f'Flushed {applied} queued increments')
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
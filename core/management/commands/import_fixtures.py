@@ -0,0 +1,250 @@
+# core/management/commands/import_fixtures.py
+import csv
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.cache import bump_version
+from core.models import Game, League, Matchday, Player, Season, Team
+from core.signals import CACHED_MODELS
+
+# Load order matters: later kinds reference earlier ones by name.
+KINDS = ['leagues', 'seasons', 'matchdays', 'teams', 'games', 'players']
+
+
+class RowError(Exception):
+    pass
+
+
+def read_rows(path):
+    """Stream dict rows from a .csv or a JSON Lines (.jsonl / .ndjson) file."""
+    path = Path(path)
+    with path.open(newline='', encoding='utf-8') as f:
+        if path.suffix.lower() == '.csv':
+            for row in csv.DictReader(f):
+                yield {key: (value.strip() if isinstance(value, str) else value) for key, value in row.items()}
+        elif path.suffix.lower() in ('.jsonl', '.ndjson'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise CommandError(f'{path}: expected a .csv, .jsonl or .ndjson file')
+
+
+def required(row, *fields):
+    values = []
+    for field in fields:
+        value = row.get(field)
+        if value in (None, ''):
+            raise RowError(f'missing {field}')
+        values.append(value)
+    return values
+
+
+def to_int(value, field):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RowError(f'{field} must be an integer')
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-load leagues, seasons, matchdays, teams, games and players from CSV or JSON Lines. '
+        'Rows reference each other by name (league name, season year, matchday number, team name); '
+        'rows that already exist are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--leagues', help='name, country')
+        parser.add_argument('--seasons', help='league, year[, max_substitutions]')
+        parser.add_argument('--matchdays', help='league, season, number[, name]')
+        parser.add_argument('--teams', help='name, league')
+        parser.add_argument('--games', help='league, season, matchday, home_team, away_team, date')
+        parser.add_argument('--players', help='name, team, position, jersey_number[, age]')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--max-errors', type=int, default=20, help='Row errors to print per file')
+
+    def handle(self, *args, **options):
+        if not any(options[kind] for kind in KINDS):
+            raise CommandError(f"Give at least one of --{', --'.join(KINDS)}")
+
+        self.batch_size = options['batch_size']
+        self.max_errors = options['max_errors']
+        self.load_maps()
+
+        for kind in KINDS:
+            if options[kind]:
+                self.import_file(kind, options[kind])
+
+        # bulk_create sends no post_save: invalidate like core.signals would.
+        for model in CACHED_MODELS:
+            bump_version(model)
+
+    # name -> id maps, refreshed after each file so later files see new rows
+    def load_maps(self):
+        self.leagues = dict(League.objects.values_list('name', 'id'))
+        self.seasons = {
+            (league_id, year): pk for pk, league_id, year in Season.objects.values_list('id', 'league_id', 'year')
+        }
+        self.matchdays = {
+            (season_id, number): pk for pk, season_id, number in Matchday.objects.values_list('id', 'season_id', 'number')
+        }
+        self.teams = dict(Team.objects.values_list('name', 'id'))
+        self.games = set(Game.objects.values_list('matchday_id', 'home_team_id', 'away_team_id'))
+        self.jerseys = {
+            (team_id, number): name for name, team_id, number in Player.objects.values_list('name', 'team_id', 'jersey_number')
+        }
+
+    def import_file(self, kind, path):
+        build = getattr(self, f'build_{kind[:-1]}')
+        model = build.model
+        started = time.perf_counter()
+        created = skipped = failed = 0
+        batch = []
+
+        for line, row in enumerate(read_rows(path), start=2 if str(path).endswith('.csv') else 1):
+            try:
+                obj = build(row)
+            except RowError as exc:
+                failed += 1
+                if failed <= self.max_errors:
+                    self.stderr.write(f'{kind} line {line}: {exc}')
+                continue
+            if obj is None:
+                skipped += 1
+                continue
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                created += self.flush(model, batch)
+                batch = []
+                self.report(kind, created, started)
+
+        created += self.flush(model, batch)
+        self.load_maps()
+
+        elapsed = time.perf_counter() - started
+        rate = created / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'{kind}: {created} created, {skipped} skipped, {failed} failed '
+            f'in {elapsed:.2f}s ({rate:,.0f} rows/sec)'
+        ))
+
+    def flush(self, model, batch):
+        if batch:
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+        return len(batch)
+
+    def report(self, kind, created, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'  {kind}: {created} rows ({created / elapsed:,.0f} rows/sec)')
+
+    # Each builder validates one row against the in-memory maps and returns
+    # an unsaved instance, None for rows that already exist, or raises RowError.
+    def league(self, row):
+        name = required(row, 'league')[0]
+        if name not in self.leagues:
+            raise RowError(f'unknown league {name!r}')
+        return self.leagues[name]
+
+    def season(self, row):
+        league_id = self.league(row)
+        year = str(required(row, 'season')[0])
+        if (league_id, year) not in self.seasons:
+            raise RowError(f'unknown season {year!r}')
+        return self.seasons[(league_id, year)]
+
+    def team(self, field, row):
+        name = required(row, field)[0]
+        if name not in self.teams:
+            raise RowError(f'unknown team {name!r}')
+        return self.teams[name]
+
+    def build_league(self, row):
+        name, country = required(row, 'name', 'country')
+        if name in self.leagues:
+            return None
+        self.leagues[name] = None
+        return League(name=name, country=country)
+    build_league.model = League
+
+    def build_season(self, row):
+        league_id = self.league(row)
+        year = str(required(row, 'year')[0])
+        if (league_id, year) in self.seasons:
+            return None
+        self.seasons[(league_id, year)] = None
+        season = Season(league_id=league_id, year=year)
+        if row.get('max_substitutions') not in (None, ''):
+            season.max_substitutions = to_int(row['max_substitutions'], 'max_substitutions')
+        return season
+    build_season.model = Season
+
+    def build_matchday(self, row):
+        season_id = self.season(row)
+        number = to_int(required(row, 'number')[0], 'number')
+        if (season_id, number) in self.matchdays:
+            return None
+        self.matchdays[(season_id, number)] = None
+        return Matchday(season_id=season_id, number=number, name=row.get('name') or f'Matchday {number}')
+    build_matchday.model = Matchday
+
+    def build_team(self, row):
+        name = required(row, 'name')[0]
+        league_id = self.league(row)
+        if name in self.teams:
+            return None
+        self.teams[name] = None
+        return Team(name=name, league_id=league_id)
+    build_team.model = Team
+
+    def build_game(self, row):
+        season_id = self.season(row)
+        number = to_int(required(row, 'matchday')[0], 'matchday')
+        matchday_id = self.matchdays.get((season_id, number))
+        if matchday_id is None:
+            raise RowError(f'unknown matchday {number}')
+        home_team_id = self.team('home_team', row)
+        away_team_id = self.team('away_team', row)
+        if home_team_id == away_team_id:
+            raise RowError('home_team and away_team must differ (no_self_games)')
+        date = parse_datetime(str(required(row, 'date')[0]))
+        if date is None:
+            raise RowError('date must be an ISO 8601 datetime')
+        if timezone.is_naive(date):
+            date = timezone.make_aware(date)
+
+        key = (matchday_id, home_team_id, away_team_id)
+        if key in self.games:
+            return None
+        self.games.add(key)
+        return Game(matchday_id=matchday_id, home_team_id=home_team_id, away_team_id=away_team_id, date=date)
+    build_game.model = Game
+
+    def build_player(self, row):
+        name, position = required(row, 'name', 'position')
+        team_id = self.team('team', row)
+        jersey_number = to_int(required(row, 'jersey_number')[0], 'jersey_number')
+        if not 1 <= jersey_number <= 99:
+            raise RowError('jersey_number must be between 1 and 99')
+        taken_by = self.jerseys.get((team_id, jersey_number))
+        if taken_by == name:
+            return None
+        if taken_by is not None:
+            raise RowError(f'jersey {jersey_number} is already taken by {taken_by!r} (unique_jersey_per_team)')
+        self.jerseys[(team_id, jersey_number)] = name
+        age = row.get('age')
+        return Player(
+            name=name,
+            team_id=team_id,
+            position=position,
+            jersey_number=jersey_number,
+            age=to_int(age, 'age') if age not in (None, '') else None,
+        )
+    build_player.model = Player
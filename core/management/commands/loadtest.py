@@ -0,0 +1,45 @@
+# core/management/commands/loadtest.py
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import load_test
+from core.serializers import RoleTokenObtainPairSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Concurrency load test against running servers, e.g. the sync and async game list under '
+        '"gunicorn football_api.wsgi" and "gunicorn football_api.asgi:application -k '
+        'uvicorn.workers.UvicornWorker" with the same worker count: '
+        'loadtest http://127.0.0.1:8000/api/games/ http://127.0.0.1:8001/api/async/games/ --user admin'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='URLs to load, one after the other')
+        parser.add_argument('--connections', type=int, default=500)
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds per URL')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Seconds before a request counts as an error')
+        parser.add_argument('--user', help='Sign the requests with an access token for this username')
+        parser.add_argument('--output', help='Also write the results to this JSON file, for comparing runs')
+
+    def handle(self, *args, **options):
+        headers = {}
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {options['user']!r}")
+            headers['Authorization'] = f'Bearer {RoleTokenObtainPairSerializer.get_token(user).access_token}'
+
+        results = []
+        for url in options['urls']:
+            result = load_test(url, options['connections'], options['duration'], headers, options['timeout'])
+            results.append(result)
+            self.stdout.write(json.dumps(result))
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
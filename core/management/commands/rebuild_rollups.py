@@ -0,0 +1,90 @@
+# core/management/commands/rebuild_rollups.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+
+from core.models import Game, PlayerGameStat, PlayerSeasonStat, TeamGameStat
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the PlayerSeasonStat and TeamGameStat rollups from PlayerGameStat'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--game', type=int, action='append',
+            help='Only this game (repeatable): its team rollup and its season\'s player totals',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        season_stats, team_stats = PlayerSeasonStat.objects.all(), TeamGameStat.objects.all()
+        season_source = team_source = PlayerGameStat.objects.all()
+        if options['game']:
+            seasons = set(Game.objects.filter(id__in=options['game']).values_list('matchday__season_id', flat=True))
+            season_stats = season_stats.filter(season_id__in=seasons)
+            season_source = season_source.filter(game__matchday__season_id__in=seasons)
+            team_stats = team_stats.filter(game_id__in=options['game'])
+            team_source = team_source.filter(game_id__in=options['game'])
+
+        with transaction.atomic():
+            season_stats.delete()
+            team_stats.delete()
+
+            season_rows = (
+                season_source
+                .values('player_id', 'game__matchday__season_id', 'metric_id')
+                .annotate(total=Sum('count'))
+                .order_by()
+            )
+            created = self._insert(
+                PlayerSeasonStat,
+                (
+                    PlayerSeasonStat(
+                        player_id=row['player_id'],
+                        season_id=row['game__matchday__season_id'],
+                        metric_id=row['metric_id'],
+                        count=row['total'],
+                    )
+                    for row in season_rows.iterator(chunk_size=batch_size)
+                ),
+                batch_size,
+            )
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {created} player season stats'))
+
+            # Stats count for the team stored with them (the player's team at
+            # the time); rows without one fall back to the current team.
+            team_rows = (
+                team_source
+                .values('game_id', 'metric_id', stat_team_id=Coalesce('team_id', 'player__team_id'))
+                .annotate(total=Sum('count'))
+                .order_by()
+            )
+            created = self._insert(
+                TeamGameStat,
+                (
+                    TeamGameStat(
+                        team_id=row['stat_team_id'],
+                        game_id=row['game_id'],
+                        metric_id=row['metric_id'],
+                        count=row['total'],
+                    )
+                    for row in team_rows.iterator(chunk_size=batch_size)
+                ),
+                batch_size,
+            )
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {created} team game stats'))
+
+    def _insert(self, model, objs, batch_size):
+        created, batch = 0, []
+        for obj in objs:
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                model.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch)
+            created += len(batch)
+        return created
@@ -0,0 +1,20 @@
+# core/management/commands/rebuild_standings.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.standings import goal_metric_id, rebuild_standings
+
+
+class Command(BaseCommand):
+    help = 'Recompute game scores and the Standing league tables from the TeamGameStat goal rollup'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season', type=int, action='append', help='Only this season (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if goal_metric_id() is None:
+            self.stdout.write(self.style.WARNING('No goal metric (STANDINGS_GOAL_METRIC); every game with stats counts as a 0:0 draw'))
+        with transaction.atomic():
+            created = rebuild_standings(options['season'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {created} standings'))
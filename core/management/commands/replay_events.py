@@ -0,0 +1,77 @@
+# core/management/commands/replay_events.py
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from core.cache import bump_version
+from core.models import Game, MatchEvent, PlayerGameStat
+
+
+class Command(BaseCommand):
+    help = 'Rebuild PlayerGameStat counts (and the rollups) from the MatchEvent log'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--game', type=int, help='Only replay this game')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        scope = {'game_id': options['game']} if options['game'] else {}
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            # Stats with no events left in the log go back to zero.
+            PlayerGameStat.objects.filter(**scope).update(count=0)
+
+            totals = (
+                MatchEvent.objects.filter(**scope)
+                .values('game_id', 'player_id', 'metric_id', 'player__team_id')
+                .annotate(total=Sum('value'))
+                .order_by()
+            )
+            now = timezone.now()
+            replayed, batch = 0, []
+            for row in totals.iterator(chunk_size=batch_size):
+                batch.append(PlayerGameStat(
+                    game_id=row['game_id'],
+                    player_id=row['player_id'],
+                    metric_id=row['metric_id'],
+                    team_id=row['player__team_id'],  # only used for stats not recorded before
+                    count=row['total'],
+                    updated_at=now,
+                ))
+                if len(batch) >= batch_size:
+                    replayed += self._upsert(batch)
+                    batch = []
+            replayed += self._upsert(batch)
+
+            # Counts may have changed anywhere in scope: move every replayed
+            # game to a new stats version so snapshot clients refetch it.
+            games = Game.objects.filter(id=options['game']) if options['game'] else Game.objects.all()
+            games.update(stats_version=F('stats_version') + 1)
+            PlayerGameStat.objects.filter(**scope).update(
+                version=Subquery(Game.objects.filter(id=OuterRef('game_id')).values('stats_version')[:1])
+            )
+
+            call_command('rebuild_rollups', game=[options['game']] if options['game'] else None,
+                         batch_size=batch_size, stdout=self.stdout)
+            seasons = list(games.values_list('matchday__season_id', flat=True)) if options['game'] else None
+            call_command('rebuild_standings', season=seasons, stdout=self.stdout)
+            transaction.on_commit(lambda: bump_version(PlayerGameStat))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Replayed {replayed} stats in {elapsed:.2f}s'))
+
+    def _upsert(self, batch):
+        if batch:
+            PlayerGameStat.objects.bulk_create(
+                batch,
+                update_conflicts=True,
+                unique_fields=['game', 'player', 'metric'],
+                update_fields=['count', 'updated_at'],
+            )
+        return len(batch)
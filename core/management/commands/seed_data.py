@@ -0,0 +1,225 @@
+# core/management/commands/seed_data.py
+import math
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.cache import bump_version
+from core.models import (
+    Game, League, Matchday, MatchEvent, Metric, Player, PlayerGameStat, Season, Team,
+)
+from core.signals import CACHED_MODELS
+
+# (name, short_code, mean per player per game)
+DEFAULT_METRICS = [
+    ('Goal', 'GOAL', 0.12),
+    ('Assist', 'AST', 0.09),
+    ('Shot', 'SHT', 1.1),
+    ('Shot on target', 'SOT', 0.45),
+    ('Pass', 'PASS', 38),
+    ('Key pass', 'KP', 0.9),
+    ('Tackle', 'TKL', 1.6),
+    ('Interception', 'INT', 1.1),
+    ('Foul', 'FOUL', 1.0),
+    ('Save', 'SAVE', 0.3),
+    ('Yellow card', 'YC', 0.15),
+    ('Red card', 'RC', 0.01),
+    ('Minutes played', 'MIN', None),
+]
+MEANS = {short_code: mean for _, short_code, mean in DEFAULT_METRICS}
+
+# (position, players per squad)
+SQUAD = [('Goalkeeper', 3), ('Defender', 8), ('Midfielder', 8), ('Forward', 6)]
+FIRST_NAMES = ['Alex', 'Ben', 'Carlos', 'David', 'Emil', 'Femi', 'Goran', 'Hugo', 'Ivan', 'Jamal',
+               'Kenji', 'Luca', 'Mateo', 'Nico', 'Omar', 'Pedro', 'Quinn', 'Rafa', 'Sami', 'Theo']
+LAST_NAMES = ['Adeyemi', 'Bauer', 'Costa', 'Dubois', 'Eriksen', 'Fofana', 'Garcia', 'Horvat', 'Ito',
+              'Jensen', 'Kowalski', 'Lopez', 'Moreau', 'Novak', 'Okafor', 'Petrov', 'Rossi', 'Silva']
+
+APPEARANCES = 16  # 11 starters + 5 substitutes per team and game
+
+
+def poisson(rng, mean):
+    """Poisson sample; normal approximation for large means."""
+    if mean > 30:
+        return max(0, round(rng.gauss(mean, math.sqrt(mean))))
+    limit, k, p = math.exp(-mean), 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def round_robin(team_ids):
+    """Double round robin (circle method): a list of matchdays of (home, away) pairs."""
+    teams = list(team_ids)
+    rounds = []
+    for _ in range(len(teams) - 1):
+        half = len(teams) // 2
+        rounds.append([(teams[i], teams[-1 - i]) for i in range(half)])
+        teams.insert(1, teams.pop())
+    return rounds + [[(away, home) for home, away in matchday] for matchday in rounds]
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a deterministic synthetic dataset (leagues, seasons, matchdays, teams, players, '
+        'metrics, games and PlayerGameStat rows) for benchmarking. The same --seed always produces '
+        'the same data. Each league season adds about 64k stat rows (plus as many baseline '
+        'match events): the defaults give about 250k, --leagues 4 --seasons 8 about 2M.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--prefix', default='Seed', help='Prefix for league and team names')
+        parser.add_argument('--leagues', type=int, default=2)
+        parser.add_argument('--seasons', type=int, default=2, help='Seasons per league')
+        parser.add_argument('--teams', type=int, default=20, help='Teams per league (even)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--no-events', action='store_true',
+                            help='Skip the baseline MatchEvent per stat (replay_events will then zero them)')
+        parser.add_argument('--no-rollups', action='store_true', help='Skip rebuild_rollups and rebuild_standings afterwards')
+
+    def handle(self, *args, **options):
+        if options['teams'] < 2 or options['teams'] % 2:
+            raise CommandError('--teams must be an even number of at least 2')
+        prefix = options['prefix']
+        if League.objects.filter(name__startswith=f'{prefix} League ').exists():
+            raise CommandError(f'Leagues named "{prefix} League ..." already exist; pick another --prefix')
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.squads = {}
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            metrics = self.create_metrics()
+            games = []
+            for number in range(1, options['leagues'] + 1):
+                games += self.create_league(prefix, number, options['seasons'], options['teams'])
+            self.stdout.write(f'{len(games)} games scheduled')
+
+            stats = self.insert(self.generate_stats(games, metrics), events=not options['no_events'])
+
+        for model in (*CACHED_MODELS, PlayerGameStat):
+            bump_version(model)
+        if not options['no_rollups']:
+            call_command('rebuild_rollups', batch_size=self.batch_size, stdout=self.stdout)
+            call_command('rebuild_standings', stdout=self.stdout)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Seeded {stats} stat rows in {elapsed:.1f}s ({stats / elapsed:,.0f} rows/sec)'))
+
+    def create_metrics(self):
+        existing = set()
+        for name, short_code in Metric.objects.values_list('name', 'short_code'):
+            existing.update((name, short_code))
+        Metric.objects.bulk_create([
+            Metric(name=name, short_code=code, description='Generated by seed_data')
+            for name, code, _ in DEFAULT_METRICS
+            if name not in existing and code not in existing
+        ])
+        return list(Metric.objects.order_by('id'))
+
+    def create_league(self, prefix, number, seasons, team_count):
+        rng = self.rng
+        league = League.objects.create(name=f'{prefix} League {number}', country=f'{prefix} Country {number}')
+        teams = Team.objects.bulk_create([
+            Team(name=f'{prefix} L{number} Team {i}', league=league) for i in range(1, team_count + 1)
+        ])
+
+        players = []
+        for team in teams:
+            jersey = 0
+            for position, size in SQUAD:
+                for _ in range(size):
+                    jersey += 1
+                    players.append(Player(
+                        name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                        team=team, position=position, jersey_number=jersey, age=rng.randint(17, 36),
+                    ))
+        players = Player.objects.bulk_create(players)
+        for team in teams:
+            self.squads[team.id] = [player for player in players if player.team_id == team.id]
+
+        games = []
+        schedule = round_robin([team.id for team in teams])
+        for offset in range(seasons):
+            year = 2020 + offset
+            season = Season.objects.create(league=league, year=f'{year}/{year + 1}')
+            matchdays = Matchday.objects.bulk_create([
+                Matchday(season=season, name=f'Matchday {i}', number=i) for i in range(1, len(schedule) + 1)
+            ])
+            kickoff = datetime(year, 8, 10, 12, tzinfo=dt_timezone.utc)
+            for matchday, pairs in zip(matchdays, schedule):
+                for slot, (home, away) in enumerate(pairs):
+                    games.append(Game(
+                        matchday=matchday, home_team_id=home, away_team_id=away,
+                        date=kickoff + timedelta(hours=2 * (slot % 5)),
+                    ))
+                kickoff += timedelta(days=7)
+        return Game.objects.bulk_create(games, batch_size=self.batch_size)
+
+    def lineup(self, team_id):
+        """16 players who appear, goalkeeper first, and the minutes each played."""
+        squad = self.squads[team_id]
+        keepers = [p for p in squad if p.position == 'Goalkeeper']
+        outfield = [p for p in squad if p.position != 'Goalkeeper']
+        picked = [self.rng.choice(keepers)] + self.rng.sample(outfield, APPEARANCES - 1)
+        minutes = [90] * 11 + [self.rng.randint(1, 45) for _ in range(APPEARANCES - 11)]
+        return zip(picked, minutes)
+
+    def generate_stats(self, games, metrics):
+        """(game_id, player_id, metric_id, count, team_id) tuples; zero counts are left out."""
+        rng = self.rng
+        for game in games:
+            for team_id in (game.home_team_id, game.away_team_id):
+                for player, minutes in self.lineup(team_id):
+                    share = minutes / 90
+                    for metric in metrics:
+                        mean = MEANS.get(metric.short_code, 1.0)
+                        if mean is None:
+                            count = minutes
+                        elif metric.short_code == 'SAVE' and player.position != 'Goalkeeper':
+                            continue
+                        else:
+                            count = poisson(rng, mean * share)
+                        if count:
+                            yield game.id, player.id, metric.id, count, team_id
+
+    def insert(self, stats, events=True):
+        """
+        Insert ``stats`` in batches, each with one baseline MatchEvent per row.
+
+        Uses executemany with the timestamps adapted once: at millions of
+        rows, bulk_create spends most of its time preparing each field of
+        each instance.
+        """
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        stat_sql = insert_sql(PlayerGameStat, ['game_id', 'player_id', 'metric_id', 'count', 'team_id', 'version', 'created_at', 'updated_at'])
+        event_sql = insert_sql(MatchEvent, ['game_id', 'player_id', 'metric_id', 'value', 'created_at'])
+
+        created = 0
+        with connection.cursor() as cursor:
+            while True:
+                batch = list(islice(stats, self.batch_size))
+                if not batch:
+                    return created
+                cursor.executemany(stat_sql, [row + (0, now, now) for row in batch])
+                if events:
+                    cursor.executemany(event_sql, [row[:4] + (now,) for row in batch])
+                created += len(batch)
+                if created // self.batch_size % 20 == 0:
+                    self.stdout.write(f'  {created} stat rows')
+
+
+def insert_sql(model, columns):
+    quote = connection.ops.quote_name
+    return 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table), ', '.join(quote(column) for column in columns), ', '.join(['%s'] * len(columns)),
+    )
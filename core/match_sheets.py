@@ -0,0 +1,69 @@
+# core/match_sheets.py
+from django.db.models import Case, IntegerField, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from .cache import get_metrics
+from .models import PlayerGameStat
+
+
+def match_sheet(game):
+    """
+    Wide-format stat sheet for ``game`` (with home_team/away_team loaded).
+
+    Every player with stats in the game gets one column per Metric, under
+    the team they played for (not a club they moved to since),
+    pivoted in a single conditional-aggregation query over the game's
+    PlayerGameStat rows; team totals are summed from the same rows.
+    """
+    metrics = sorted(get_metrics().items(), key=lambda item: item[1][0])
+    columns = {f"metric_{metric_id}": short_code.lower() for metric_id, (_, short_code) in metrics}
+
+    rows = (
+        PlayerGameStat.objects
+        .filter(game_id=game.id)
+        .values(
+            'player_id', 'player__name', 'player__position', 'player__jersey_number',
+            stat_team_id=Coalesce('team_id', 'player__team_id'),
+        )
+        .annotate(**{
+            alias: Sum(
+                Case(
+                    When(metric_id=int(alias[len('metric_'):]), then='count'),
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            )
+            for alias in columns
+        })
+        .order_by('player__jersey_number', 'player_id')
+    )
+
+    teams = {
+        team.id: {"team_id": team.id, "name": team.name, "side": side, "players": [], "totals": dict.fromkeys(columns.values(), 0)}
+        for side, team in [("home", game.home_team), ("away", game.away_team)]
+    }
+    for row in rows:
+        team = teams.get(row['stat_team_id'])
+        if team is None:
+            continue  # recorded for a club outside this game
+        stats = {code: row[alias] or 0 for alias, code in columns.items()}
+        for code, count in stats.items():
+            team["totals"][code] += count
+        team["players"].append({
+            "id": row['player_id'],
+            "name": row['player__name'],
+            "position": row['player__position'],
+            "jersey_number": row['player__jersey_number'],
+            "stats": stats,
+        })
+
+    return {
+        "game_id": game.id,
+        "date": game.date,
+        "matchday": game.matchday_id,
+        "metrics": [
+            {"id": metric_id, "name": name, "short_code": short_code}
+            for metric_id, (name, short_code) in metrics
+        ],
+        "teams": list(teams.values()),
+    }
@@ -0,0 +1,188 @@
+# core/middleware.py
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRecorder:
+    """
+    connection.execute_wrapper that counts and times every query. Statements
+    are keyed by their SQL with placeholders, so the same query run with
+    different parameters (the N+1 shape) adds up under one key.
+    """
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.render_started = None
+        self.render_duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    def render_finished(self, response):
+        if self.render_started is not None:
+            self.render_duration = time.perf_counter() - self.render_started
+
+
+class RequestMetrics:
+    """
+    Per-view totals and a latency histogram, kept in process memory and
+    rendered in the Prometheus text format. Each worker process reports
+    its own numbers; Prometheus sums them across scrape targets.
+    """
+    buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = Counter()            # (view, method, status)
+            self.totals = defaultdict(Counter)   # view -> queries, db, render, duration, count, n_plus_one
+            self.histogram = defaultdict(lambda: [0] * len(self.buckets))
+
+    def record(self, view, method, status, recorder, duration, suspects):
+        with self._lock:
+            self.requests[(view, method, status)] += 1
+            totals = self.totals[view]
+            totals["count"] += 1
+            totals["queries"] += recorder.count
+            totals["db"] += recorder.duration
+            totals["render"] += recorder.render_duration
+            totals["duration"] += duration
+            totals["n_plus_one"] += suspects
+            histogram = self.histogram[view]
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    histogram[i] += 1
+
+    def render(self):
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            family("api_requests_total", "counter", "Requests served, by view, method and status.")
+            for (view, method, status), count in sorted(self.requests.items()):
+                lines.append(f'api_requests_total{{view="{view}",method="{method}",status="{status}"}} {count}')
+
+            family("api_request_duration_seconds", "histogram", "Time spent in Django per request.")
+            for view, histogram in sorted(self.histogram.items()):
+                for bound, count in zip(self.buckets, histogram):
+                    lines.append(f'api_request_duration_seconds_bucket{{view="{view}",le="{bound}"}} {count}')
+                totals = self.totals[view]
+                lines.append(f'api_request_duration_seconds_bucket{{view="{view}",le="+Inf"}} {totals["count"]}')
+                lines.append(f'api_request_duration_seconds_sum{{view="{view}"}} {totals["duration"]:.6f}')
+                lines.append(f'api_request_duration_seconds_count{{view="{view}"}} {totals["count"]}')
+
+            for name, key, kind, help_text, fmt in [
+                ("api_db_queries_total", "queries", "counter", "Database queries executed.", "{:d}"),
+                ("api_db_duration_seconds_total", "db", "counter", "Time spent executing database queries.", "{:.6f}"),
+                ("api_render_duration_seconds_total", "render", "counter", "Time spent rendering responses.", "{:.6f}"),
+                ("api_n_plus_one_suspects_total", "n_plus_one", "counter",
+                 "Requests that repeated one SQL statement REQUEST_METRICS_N_PLUS_ONE_THRESHOLD times or more.", "{:d}"),
+            ]:
+                family(name, kind, help_text)
+                for view, totals in sorted(self.totals.items()):
+                    lines.append(f'{name}{{view="{view}"}} ' + fmt.format(totals[key]))
+        return "\n".join(lines) + "\n"
+
+
+metrics = RequestMetrics()
+
+
+def add_execute_wrapper(wrapper):
+    connection.execute_wrappers.append(wrapper)
+
+
+def remove_execute_wrapper(wrapper):
+    connection.execute_wrappers.remove(wrapper)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records query count, DB time, render time and total time per request.
+
+    The numbers go out in a Server-Timing header (visible in the browser's
+    network panel) and are aggregated per view for /api/_metrics. When one
+    SQL statement runs REQUEST_METRICS_N_PLUS_ONE_THRESHOLD times or more in
+    a request it is logged as an N+1 suspect.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = settings.REQUEST_METRICS_N_PLUS_ONE_THRESHOLD
+        self.server_timing = settings.REQUEST_METRICS_SERVER_TIMING
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = request._query_recorder = QueryRecorder()
+        started = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        return self.finish(request, response, recorder, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        # Connections are per thread and async views run their queries on
+        # the request's thread-sensitive sync_to_async thread, so the
+        # wrapper is installed there rather than on the event loop's
+        # connection.
+        recorder = request._query_recorder = QueryRecorder()
+        started = time.perf_counter()
+        await sync_to_async(add_execute_wrapper)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(remove_execute_wrapper)(recorder)
+        return self.finish(request, response, recorder, time.perf_counter() - started)
+
+    def process_template_response(self, request, response):
+        # Called just before a DRF Response is rendered.
+        recorder = getattr(request, "_query_recorder", None)
+        if recorder is not None:
+            recorder.render_started = time.perf_counter()
+            response.add_post_render_callback(recorder.render_finished)
+        return response
+
+    def finish(self, request, response, recorder, duration):
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name or match.route) if match else "unresolved"
+
+        suspects = 0
+        for sql, count in recorder.statements.most_common():
+            if count < self.threshold:
+                break
+            suspects = 1
+            logger.warning("Possible N+1 in %s %s (%s): %d x %s", request.method, request.path, view, count, sql)
+
+        metrics.record(view, request.method, response.status_code, recorder, duration, suspects)
+
+        if self.server_timing:
+            response["Server-Timing"] = ", ".join([
+                f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries"',
+                f"render;dur={recorder.render_duration * 1000:.1f}",
+                f"total;dur={duration * 1000:.1f}",
+            ])
+        return response
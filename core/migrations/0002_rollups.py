@@ -0,0 +1,86 @@
+# Generated by Django 5.1.3 on 2026-10-18 14:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_rollups(apps, schema_editor):
+    """Start the rollups from the existing stats, like `manage.py rebuild_rollups`."""
+    PlayerGameStat = apps.get_model('core', 'PlayerGameStat')
+    PlayerSeasonStat = apps.get_model('core', 'PlayerSeasonStat')
+    TeamGameStat = apps.get_model('core', 'TeamGameStat')
+    season_rows = (
+        PlayerGameStat.objects
+        .values('player_id', 'game__matchday__season_id', 'metric_id')
+        .annotate(total=Sum('count'))
+        .order_by()
+    )
+    PlayerSeasonStat.objects.bulk_create(
+        [
+            PlayerSeasonStat(
+                player_id=row['player_id'],
+                season_id=row['game__matchday__season_id'],
+                metric_id=row['metric_id'],
+                count=row['total'],
+            )
+            for row in season_rows.iterator(chunk_size=5000)
+        ],
+        batch_size=5000,
+    )
+    team_rows = (
+        PlayerGameStat.objects
+        .values('player__team_id', 'game_id', 'metric_id')
+        .annotate(total=Sum('count'))
+        .order_by()
+    )
+    TeamGameStat.objects.bulk_create(
+        [
+            TeamGameStat(
+                team_id=row['player__team_id'],
+                game_id=row['game_id'],
+                metric_id=row['metric_id'],
+                count=row['total'],
+            )
+            for row in team_rows.iterator(chunk_size=5000)
+        ],
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerSeasonStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('metric', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.metric')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='season_stats', to='core.player')),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='player_stats', to='core.season')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['season', 'player'], name='core_player_season__0c0dc7_idx')],
+                'constraints': [models.UniqueConstraint(fields=('player', 'season', 'metric'), name='unique_player_season_metric')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TeamGameStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='team_stats', to='core.game')),
+                ('metric', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.metric')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='game_stats', to='core.team')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('game', 'team', 'metric'), name='unique_team_stat_per_game')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-18 14:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='playerseasonstat',
+            index=models.Index(fields=['season', 'metric', '-count'], name='idx_season_metric_count'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.3 on 2026-10-18 14:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_leaderboard_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingIncrement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.IntegerField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.game')),
+                ('metric', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.metric')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.player')),
+            ],
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.3 on 2026-10-18 14:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_events(apps, schema_editor):
+    """Log one baseline event per existing stat so replays reproduce today's counts."""
+    PlayerGameStat = apps.get_model('core', 'PlayerGameStat')
+    MatchEvent = apps.get_model('core', 'MatchEvent')
+    batch = []
+    for stat in PlayerGameStat.objects.exclude(count=0).iterator(chunk_size=5000):
+        batch.append(MatchEvent(
+            game_id=stat.game_id,
+            player_id=stat.player_id,
+            metric_id=stat.metric_id,
+            value=stat.count,
+        ))
+        if len(batch) >= 5000:
+            MatchEvent.objects.bulk_create(batch)
+            batch = []
+    MatchEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_pending_increments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pendingincrement',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='pendingincrement',
+            name='minute',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='pendingincrement',
+            name='occurred_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='MatchEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.IntegerField(default=1)),
+                ('idempotency_key', models.CharField(blank=True, max_length=100, null=True, unique=True)),
+                ('minute', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('occurred_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='core.game')),
+                ('metric', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.metric')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.player')),
+            ],
+        ),
+        migrations.RunPython(seed_events, migrations.RunPython.noop),
+    ]
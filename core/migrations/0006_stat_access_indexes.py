@@ -0,0 +1,29 @@
+# Generated by Django 5.1.3 on 2026-10-18 14:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_match_events'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['matchday', 'date'], name='idx_game_matchday_date'),
+        ),
+        migrations.AddIndex(
+            model_name='playergamestat',
+            index=models.Index(fields=['player', 'game'], name='idx_stat_player_game'),
+        ),
+        migrations.AddIndex(
+            model_name='playergamestat',
+            index=models.Index(fields=['player', 'metric'], name='idx_stat_player_metric'),
+        ),
+        migrations.AddIndex(
+            model_name='playergamestat',
+            index=models.Index(fields=['game', 'metric'], name='idx_stat_game_metric'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 14:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_stat_access_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='stats_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='playergamestat',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
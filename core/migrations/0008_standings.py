@@ -0,0 +1,101 @@
+# Generated by Django 5.1.3 on 2026-10-18 14:46
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_standings(apps, schema_editor):
+    """
+    Score the games that already have stats and build their seasons'
+    tables from the TeamGameStat goal rollup, like `manage.py rebuild_standings`.
+    """
+    Game = apps.get_model('core', 'Game')
+    Metric = apps.get_model('core', 'Metric')
+    PlayerGameStat = apps.get_model('core', 'PlayerGameStat')
+    Standing = apps.get_model('core', 'Standing')
+    Team = apps.get_model('core', 'Team')
+    TeamGameStat = apps.get_model('core', 'TeamGameStat')
+
+    goal_id = Metric.objects.filter(short_code=settings.STANDINGS_GOAL_METRIC).values_list('id', flat=True).first()
+    goals = {
+        (team_id, game_id): count for team_id, game_id, count in
+        TeamGameStat.objects.filter(metric_id=goal_id).values_list('team_id', 'game_id', 'count')
+    }
+    played = PlayerGameStat.objects.values('game_id')
+    fields = ['played', 'won', 'drawn', 'lost', 'goals_for', 'goals_against', 'goal_difference', 'points']
+    tables, league_of, scored = defaultdict(dict), {}, []
+    rows = Game.objects.values_list('id', 'matchday__season_id', 'matchday__season__league_id', 'home_team_id', 'away_team_id')
+    for game_id, season_id, league_id, home_id, away_id in rows.filter(id__in=played).iterator(chunk_size=1000):
+        league_of[season_id] = league_id
+        home, away = goals.get((home_id, game_id), 0), goals.get((away_id, game_id), 0)
+        scored.append(Game(id=game_id, home_score=home, away_score=away))
+        for team_id, goals_for, goals_against in [(home_id, home, away), (away_id, away, home)]:
+            row = tables[season_id].setdefault(team_id, dict.fromkeys(fields, 0))
+            won, drawn = goals_for > goals_against, goals_for == goals_against
+            row['played'] += 1
+            row['won'] += won
+            row['drawn'] += drawn
+            row['lost'] += goals_for < goals_against
+            row['goals_for'] += goals_for
+            row['goals_against'] += goals_against
+            row['goal_difference'] += goals_for - goals_against
+            row['points'] += 3 * won + drawn
+
+    for team_id, league_id in Team.objects.filter(league_id__in=set(league_of.values())).values_list('id', 'league_id'):
+        for season_id, season_league in league_of.items():
+            if season_league == league_id:
+                tables[season_id].setdefault(team_id, dict.fromkeys(fields, 0))
+
+    Game.objects.bulk_update(scored, ['home_score', 'away_score'], batch_size=1000)
+    Standing.objects.bulk_create(
+        [
+            Standing(season_id=season_id, team_id=team_id, **row)
+            for season_id, table in tables.items()
+            for team_id, row in table.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_stats_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='away_score',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='home_score',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='Standing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('played', models.PositiveIntegerField(default=0)),
+                ('won', models.PositiveIntegerField(default=0)),
+                ('drawn', models.PositiveIntegerField(default=0)),
+                ('lost', models.PositiveIntegerField(default=0)),
+                ('goals_for', models.PositiveIntegerField(default=0)),
+                ('goals_against', models.PositiveIntegerField(default=0)),
+                ('goal_difference', models.IntegerField(default=0)),
+                ('points', models.PositiveIntegerField(default=0)),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='core.season')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='core.team')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['season', '-points', '-goal_difference', '-goals_for', 'team'], name='idx_standing_table_order')],
+                'constraints': [models.UniqueConstraint(fields=('season', 'team'), name='unique_standing_per_season')],
+            },
+        ),
+        migrations.RunPython(backfill_standings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_standings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pendingincrement',
+            name='error',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='pendingincrement',
+            name='failed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.3 on 2026-10-18 15:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_teams(apps, schema_editor):
+    """Existing stats count for the team their player is in today."""
+    PlayerGameStat = apps.get_model('core', 'PlayerGameStat')
+    Player = apps.get_model('core', 'Player')
+    PlayerGameStat.objects.update(
+        team_id=Subquery(Player.objects.filter(id=OuterRef('player_id')).values('team_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_pending_increment_dead_letters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playergamestat',
+            name='team',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.team'),
+        ),
+        migrations.RunPython(backfill_teams, migrations.RunPython.noop),
+    ]
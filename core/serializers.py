@@ -1,4 +1,7 @@
-from rest_framework import serializers
+import datetime
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from .models import *
 from django.contrib.auth.models import User, Group
 
@@ -6,6 +9,7 @@ from django.contrib.auth.models import User, Group
 
 from django.contrib.auth.models import User, Group
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -47,34 +51,83 @@ class RegisterSerializer(serializers.ModelSerializer):
     
 
 
-class LeagueSerializer(serializers.ModelSerializer):
+class FieldProjectionMixin:
+    """
+    Drops every field not listed in context['fields'] (set from ?fields=).
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Adds ``roles`` (group names) and ``is_superuser`` claims to issued tokens,
+    so that with JWT_STATELESS_AUTH permission checks can be answered from
+    the token alone (role changes then take effect the next time the user
+    obtains a token). Otherwise the claims are ignored.
+    """
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['roles'] = list(user.groups.values_list('name', flat=True))
+        token['is_superuser'] = user.is_superuser
+        return token
+
+
+class LeagueSerializer(FieldProjectionMixin, serializers.ModelSerializer):
     class Meta:
         model = League
         fields = '__all__'
 
-class SeasonSerializer(serializers.ModelSerializer):
+class SeasonSerializer(FieldProjectionMixin, serializers.ModelSerializer):
     class Meta:
         model = Season
         fields = '__all__'
 
-class MatchdaySerializer(serializers.ModelSerializer):
+class MatchdaySerializer(FieldProjectionMixin, serializers.ModelSerializer):
     class Meta:
         model = Matchday
         fields = '__all__'
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(FieldProjectionMixin, serializers.ModelSerializer):
     class Meta:
         model = Team
         fields = '__all__'
 
-class GameSerializer(serializers.ModelSerializer):
+class GameSerializer(FieldProjectionMixin, serializers.ModelSerializer):
     class Meta:
         model = Game
         fields = '__all__'
+        # Maintained by core.stats / core.standings from the recorded stats.
+        read_only_fields = ['stats_version', 'home_score', 'away_score']
+
+    def validate(self, attrs):
+        """
+        Once a game has stats, its season rollups, team totals and standings
+        are keyed on its season and teams: moving it to another season or
+        changing its teams is refused rather than leaving them stale.
+        """
+        game = self.instance
+        if game is None or not PlayerGameStat.objects.filter(game=game).exists():
+            return attrs
+        errors = {}
+        matchday = attrs.get('matchday')
+        if matchday is not None and matchday.season_id != game.matchday.season_id:
+            errors['matchday'] = 'A game with recorded stats cannot move to another season.'
+        for field in ['home_team', 'away_team']:
+            if field in attrs and attrs[field].id != getattr(game, f'{field}_id'):
+                errors[field] = 'The teams of a game with recorded stats cannot change.'
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
 
 
 # core/serializers.py
-class MetricSerializer(serializers.ModelSerializer):
+class MetricSerializer(FieldProjectionMixin, serializers.ModelSerializer):
     class Meta:
         model = Metric
         fields = ['id', 'name', 'short_code', 'description']
@@ -104,7 +157,108 @@ class PlayerGameStatSerializer(serializers.ModelSerializer):
             'count', 'game_date', 'created_at', 'updated_at'
         ]
 
-class PlayerSerializer(serializers.ModelSerializer):
+class ValuesSerializer:
+    """
+    Read-only fast path for hot list endpoints.
+
+    Works from ``.values()`` rows instead of model instances, so there is no
+    instance construction, dotted ``source`` traversal or per-row field
+    binding. Subclasses declare ``fields`` as (output name, ORM lookup,
+    DRF field or None); the DRF field defines the formatting, so the output
+    matches the ModelSerializer it stands in for exactly.
+    """
+    fields = []
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.lookups = [lookup for _, lookup, _ in cls.fields]
+        cls._plain = [(name, lookup) for name, lookup, field in cls.fields if field is None]
+        cls._formatted = [(name, lookup, field) for name, lookup, field in cls.fields if field is not None]
+        cls._order = [name for name, _, _ in cls.fields]
+
+    @classmethod
+    def values(cls, queryset):
+        return queryset.values(*cls.lookups)
+
+    @staticmethod
+    def formatter(field):
+        """
+        ``field.to_representation``, with DateTimeField's format and current
+        timezone lookups done once per call to serialize() instead of per row.
+        """
+        if not isinstance(field, serializers.DateTimeField):
+            return field.to_representation
+
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if output_format is None or field_timezone is None:
+            return field.to_representation
+        iso = output_format.lower() == ISO_8601
+
+        def to_representation(value):
+            if not isinstance(value, datetime.datetime) or value.utcoffset() is None:
+                return field.to_representation(value)
+            value = value.astimezone(field_timezone)
+            if iso:
+                value = value.isoformat()
+                return value[:-6] + 'Z' if value.endswith('+00:00') else value
+            return value.strftime(output_format)
+        return to_representation
+
+    @classmethod
+    def serialize(cls, rows):
+        plain, order = cls._plain, cls._order
+        formatted = [(name, lookup, cls.formatter(field)) for name, lookup, field in cls._formatted]
+        data = []
+        for row in rows:
+            item = {name: row[lookup] for name, lookup in plain}
+            for name, lookup, to_representation in formatted:
+                value = row[lookup]
+                item[name] = None if value is None else to_representation(value)
+            data.append({name: item[name] for name in order})
+        return data
+
+
+class GameFastSerializer(ValuesSerializer):
+    """Same output as GameSerializer."""
+    fields = [
+        ('id', 'id', None),
+        ('date', 'date', serializers.DateTimeField()),
+        ('stats_version', 'stats_version', None),
+        ('home_score', 'home_score', None),
+        ('away_score', 'away_score', None),
+        ('created_at', 'created_at', serializers.DateTimeField()),
+        ('matchday', 'matchday', None),
+        ('home_team', 'home_team', None),
+        ('away_team', 'away_team', None),
+    ]
+
+
+class PlayerGameStatFastSerializer(ValuesSerializer):
+    """Same output as PlayerGameStatSerializer."""
+    fields = [
+        ('id', 'id', None),
+        ('player_name', 'player__name', None),
+        ('player_jersey', 'player__jersey_number', None),
+        ('metric', 'metric__name', None),
+        ('metric_short_code', 'metric__short_code', None),
+        ('count', 'count', None),
+        ('game_date', 'game__date', serializers.DateTimeField(format="%Y-%m-%d %H:%M")),
+        ('created_at', 'created_at', serializers.DateTimeField()),
+        ('updated_at', 'updated_at', serializers.DateTimeField()),
+    ]
+
+
+class PlayerSeasonStatSerializer(serializers.ModelSerializer):
+    player_name = serializers.CharField(source='player.name')
+    metric = serializers.CharField(source='metric.name')
+    metric_short_code = serializers.CharField(source='metric.short_code')
+
+    class Meta:
+        model = PlayerSeasonStat
+        fields = ['player', 'player_name', 'season', 'metric', 'metric_short_code', 'count']
+
+class PlayerSerializer(FieldProjectionMixin, serializers.ModelSerializer):
     stats = serializers.SerializerMethodField()
 
     class Meta:
@@ -116,7 +270,11 @@ class PlayerSerializer(serializers.ModelSerializer):
         if not game_id:
             return {}
 
-        stats = PlayerGameStat.objects.filter(player=obj, game_id=game_id)
+        stat_map = self.context.get('stat_map')
+        if stat_map is not None:
+            return stat_map.get(obj.id, {})
+
+        stats = PlayerGameStat.objects.filter(player=obj, game_id=game_id).select_related('metric')
         return {
             stat.metric.short_code.lower(): stat.count
             for stat in stats
@@ -0,0 +1,15 @@
+# core/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_version
+from .models import Game, League, Matchday, Metric, Season, Team
+
+CACHED_MODELS = [League, Season, Matchday, Team, Metric, Game]
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_cached_model(sender, **kwargs):
+    if sender in CACHED_MODELS:
+        bump_version(sender)
@@ -0,0 +1,160 @@
+# core/standings.py
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import F
+
+from .cache import get_metrics
+from .models import Game, PlayerGameStat, Standing, Team, TeamGameStat
+
+POINTS_FOR_WIN, POINTS_FOR_DRAW = 3, 1
+TABLE_FIELDS = [
+    "played", "won", "drawn", "lost", "goals_for", "goals_against", "goal_difference", "points",
+]
+# Same order as the idx_standing_table_order index; ties end on team id.
+TABLE_ORDER = ["-points", "-goal_difference", "-goals_for", "team_id"]
+
+
+def goal_metric_id():
+    """Id of the STANDINGS_GOAL_METRIC metric, or None if there is none."""
+    for metric_id, (_, short_code) in get_metrics().items():
+        if short_code == settings.STANDINGS_GOAL_METRIC:
+            return metric_id
+    return None
+
+
+def result(goals_for, goals_against):
+    """One team's table contribution for a game that ended goals_for:goals_against."""
+    won, drawn = goals_for > goals_against, goals_for == goals_against
+    return {
+        "played": 1,
+        "won": int(won),
+        "drawn": int(drawn),
+        "lost": int(goals_for < goals_against),
+        "goals_for": goals_for,
+        "goals_against": goals_against,
+        "goal_difference": goals_for - goals_against,
+        "points": POINTS_FOR_WIN * won + POINTS_FOR_DRAW * drawn,
+    }
+
+
+NO_RESULT = dict.fromkeys(TABLE_FIELDS, 0)
+
+
+def update_standings(games, goal_deltas):
+    """
+    Apply a batch of stat changes to game scores and the league table.
+
+    ``games`` maps each changed game's id to (season_id, home_team_id,
+    away_team_id, home_score, away_score) as read inside the write
+    transaction. The game rows are already locked by the stats version bump,
+    so concurrent batches for one game are applied one after the other.
+    ``goal_deltas`` maps (team_id, game_id) to the goals added.
+
+    A game counts as played from its first recorded stat of any metric (a
+    0:0 until goals arrive), the same rule as rebuild_standings, so goalless
+    draws reach the table. For each game whose score changed, the old
+    result is subtracted from both teams' rows and the new one added, so
+    the cost is per game, not per season.
+    """
+    changed, table_deltas = [], defaultdict(lambda: dict(NO_RESULT))
+    for game_id, (season_id, home_id, away_id, home_score, away_score) in games.items():
+        played = home_score is not None
+        new_home = (home_score or 0) + goal_deltas.get((home_id, game_id), 0)
+        new_away = (away_score or 0) + goal_deltas.get((away_id, game_id), 0)
+        if played and (new_home, new_away) == (home_score, away_score):
+            continue
+
+        changed.append(Game(id=game_id, home_score=new_home, away_score=new_away))
+        for team_id, new, old in [
+            (home_id, result(new_home, new_away), result(home_score, away_score) if played else NO_RESULT),
+            (away_id, result(new_away, new_home), result(away_score, home_score) if played else NO_RESULT),
+        ]:
+            delta = table_deltas[(season_id, team_id)]
+            for field in TABLE_FIELDS:
+                delta[field] += new[field] - old[field]
+
+    if not changed:
+        return
+    Game.objects.bulk_update(changed, ["home_score", "away_score"])
+    Standing.objects.bulk_create(
+        [Standing(season_id=season_id, team_id=team_id) for season_id, team_id in table_deltas],
+        ignore_conflicts=True,
+    )
+    for (season_id, team_id), delta in table_deltas.items():
+        Standing.objects.filter(season_id=season_id, team_id=team_id).update(**{
+            field: F(field) + value for field, value in delta.items() if value
+        })
+
+
+def rebuild_standings(season_ids=None, batch_size=1000):
+    """
+    Recompute game scores and the league tables of ``season_ids`` (default:
+    every season) from the TeamGameStat rollup. A game counts as played once
+    it has any stat row (stat rows are never deleted, so this matches
+    update_standings). Every team of the season's league gets a row,
+    including teams that have not played yet.
+    Returns the number of standings rows written.
+    """
+    games = Game.objects.all()
+    standings = Standing.objects.all()
+    if season_ids is not None:
+        games = games.filter(matchday__season_id__in=season_ids)
+        standings = standings.filter(season_id__in=season_ids)
+
+    goal_id = goal_metric_id()
+    goals = dict(
+        ((row["team_id"], row["game_id"]), row["count"])
+        for row in TeamGameStat.objects.filter(game__in=games, metric_id=goal_id)
+        .values("team_id", "game_id", "count").iterator(chunk_size=batch_size)
+    ) if goal_id is not None else {}
+    played = set(PlayerGameStat.objects.filter(game__in=games).values_list("game_id", flat=True).distinct())
+
+    tables, league_of, updated = defaultdict(dict), {}, []
+    rows = games.values_list("id", "matchday__season_id", "matchday__season__league_id", "home_team_id", "away_team_id")
+    for game_id, season_id, league_id, home_id, away_id in rows.iterator(chunk_size=batch_size):
+        league_of[season_id] = league_id
+        if game_id not in played:
+            updated.append(Game(id=game_id, home_score=None, away_score=None))
+            continue
+        home, away = goals.get((home_id, game_id), 0), goals.get((away_id, game_id), 0)
+        updated.append(Game(id=game_id, home_score=home, away_score=away))
+        for team_id, contribution in [(home_id, result(home, away)), (away_id, result(away, home))]:
+            row = tables[season_id].setdefault(team_id, dict(NO_RESULT))
+            for field in TABLE_FIELDS:
+                row[field] += contribution[field]
+
+    for team_id, league_id in Team.objects.filter(league_id__in=set(league_of.values())).values_list("id", "league_id"):
+        for season_id, season_league in league_of.items():
+            if season_league == league_id:
+                tables[season_id].setdefault(team_id, dict(NO_RESULT))
+
+    Game.objects.bulk_update(updated, ["home_score", "away_score"], batch_size=batch_size)
+    standings.delete()
+    created = Standing.objects.bulk_create(
+        [
+            Standing(season_id=season_id, team_id=team_id, **row)
+            for season_id, table in tables.items()
+            for team_id, row in table.items()
+        ],
+        batch_size=batch_size,
+    )
+    return len(created)
+
+
+def standings(season_id):
+    """
+    The season's league table in one indexed query: rows of {position,
+    team_id, team_name, played, won, drawn, lost, goals_for, goals_against,
+    goal_difference, points}, best first.
+    """
+    rows = (
+        Standing.objects
+        .filter(season_id=season_id)
+        .order_by(*TABLE_ORDER)
+        .values("team_id", "team__name", *TABLE_FIELDS)
+    )
+    return [
+        {"position": position, "team_id": row.pop("team_id"), "team_name": row.pop("team__name"), **row}
+        for position, row in enumerate(rows, start=1)
+    ]
@@ -0,0 +1,415 @@
+# core/stats.py
+import operator
+from collections import defaultdict, namedtuple
+from functools import reduce
+
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import Case, F, Q, Sum, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .broadcast import publish_increments
+from .cache import get_metrics
+from .form import bump_form_versions
+from .models import (
+    Game, MatchEvent, PendingIncrement, Player, PlayerGameStat, PlayerSeasonStat, TeamGameStat,
+)
+from .standings import goal_metric_id, update_standings
+
+
+Increment = namedtuple(
+    "Increment",
+    ["game_id", "player_id", "metric_id", "value", "idempotency_key", "minute", "occurred_at"],
+    defaults=[None, None, None],
+)
+
+BELOW_ZERO = "value would take the count below zero."
+MAX_VALUE = 10000
+# Exact (game, player, metric) keys matched per query; keeps
+# the OR chain well inside SQLite's expression depth and variable limits.
+KEY_LOCK_BATCH = 250
+
+
+class IncrementError(Exception):
+    """Raised for a single increment that cannot be applied."""
+
+
+def _parse_increment(item):
+    """Turn one request item into an Increment."""
+    if not isinstance(item, dict):
+        raise IncrementError("Each increment must be an object.")
+
+    player_id = item.get("player_id")
+    game_id = item.get("game_id")
+    metric_id = item.get("metric_id")
+    if not all([player_id, game_id, metric_id]):
+        raise IncrementError("player_id, game_id, and metric_id are required.")
+
+    try:
+        ids = int(game_id), int(player_id), int(metric_id), int(item.get("value", 1))
+    except (TypeError, ValueError):
+        raise IncrementError("player_id, game_id, metric_id and value must be integers.")
+
+    if not -MAX_VALUE <= ids[3] <= MAX_VALUE:
+        raise IncrementError(f"value must be between -{MAX_VALUE} and {MAX_VALUE}.")
+
+    key = item.get("idempotency_key")
+    if key is not None and (not isinstance(key, str) or not 0 < len(key) <= 100):
+        raise IncrementError("idempotency_key must be a string of 1-100 characters.")
+
+    minute = item.get("minute")
+    if minute is not None:
+        try:
+            minute = int(minute)
+        except (TypeError, ValueError):
+            minute = -1
+        if not 0 <= minute <= 32767:
+            raise IncrementError("minute must be a non-negative integer.")
+
+    occurred_at = item.get("occurred_at")
+    if occurred_at is not None:
+        occurred_at = parse_datetime(str(occurred_at))
+        if occurred_at is None:
+            raise IncrementError("occurred_at must be an ISO 8601 datetime.")
+        if timezone.is_naive(occurred_at):
+            occurred_at = timezone.make_aware(occurred_at)
+
+    return Increment(*ids, key, minute, occurred_at)
+
+
+def validate_increments(items):
+    """
+    Check a list of raw increments with one query per referenced table
+    (metrics come from the in-process cache).
+
+    Returns (valid, errors, metrics, players) where ``valid`` is a list of
+    (index, Increment) pairs, ``errors`` maps index -> message and
+    ``metrics`` / ``players`` map id -> name for the referenced rows.
+    """
+    parsed, errors = [], {}
+    for index, item in enumerate(items):
+        try:
+            parsed.append((index, _parse_increment(item)))
+        except IncrementError as exc:
+            errors[index] = str(exc)
+    increments = [increment for _, increment in parsed]
+
+    metrics = {pk: name for pk, (name, _) in get_metrics({inc.metric_id for inc in increments}).items()}
+    players = dict(Player.objects.filter(id__in={inc.player_id for inc in increments}).values_list("id", "name"))
+    games = set(Game.objects.filter(id__in={inc.game_id for inc in increments}).values_list("id", flat=True))
+
+    valid = []
+    for index, increment in parsed:
+        if increment.metric_id not in metrics:
+            errors[index] = "Invalid metric_id."
+        elif increment.player_id not in players:
+            errors[index] = "Invalid player_id."
+        elif increment.game_id not in games:
+            errors[index] = "Invalid game_id."
+        else:
+            valid.append((index, increment))
+
+    return valid, errors, metrics, players
+
+
+def _add_counts(model, key_fields, deltas, initial=None, **extra):
+    """
+    Upsert ``count = count + n`` for every key in ``deltas`` ({key tuple: n}).
+
+    Missing rows are inserted in one statement (with the fields returned by
+    ``initial(key)``, if given), exactly the affected rows are
+    locked and read back (one statement per KEY_LOCK_BATCH keys), and the
+    increments are applied with one UPDATE per distinct delta. Returns
+    {key tuple: new count}.
+    """
+    if not deltas:
+        return {}
+
+    model.objects.bulk_create(
+        [model(count=0, **dict(zip(key_fields, key)), **(initial(key) if initial else {})) for key in deltas],
+        ignore_conflicts=True,
+    )
+
+    rows = _lock_rows(model, key_fields, deltas, "id", "count")
+
+    ids_by_delta = defaultdict(list)
+    counts = {}
+    for key, (pk, count) in rows.items():
+        ids_by_delta[deltas[key]].append(pk)
+        counts[key] = count + deltas[key]
+
+    for delta, ids in ids_by_delta.items():
+        if delta:
+            model.objects.filter(id__in=ids).update(count=F("count") + delta, **extra)
+
+    return counts
+
+
+def _lock_rows(model, key_fields, keys, *fields):
+    """
+    Lock the rows of ``model`` whose ``key_fields`` match one of ``keys``
+    exactly and return {key tuple: (field values...)}. Rows are locked in
+    key order so concurrent batches cannot deadlock on each other.
+    """
+    rows = {}
+    for chunk in _key_chunks(keys):
+        lookup = reduce(operator.or_, (Q(**dict(zip(key_fields, key))) for key in chunk))
+        queryset = model.objects.select_for_update().filter(lookup).order_by(*key_fields)
+        for row in queryset.values_list(*key_fields, *fields):
+            rows[row[:len(key_fields)]] = row[len(key_fields):]
+    return rows
+
+
+def _key_chunks(keys):
+    keys = sorted(keys)
+    for start in range(0, len(keys), KEY_LOCK_BATCH):
+        yield keys[start:start + KEY_LOCK_BATCH]
+
+
+def find_duplicates(increments):
+    """
+    Positions of the increments whose idempotency_key has been seen before
+    (in the MatchEvent log or earlier in the batch).
+    """
+    keys = {inc.idempotency_key for inc in increments if inc.idempotency_key}
+    seen = set(MatchEvent.objects.filter(idempotency_key__in=keys).values_list("idempotency_key", flat=True))
+
+    duplicates = set()
+    for position, increment in enumerate(increments):
+        key = increment.idempotency_key
+        if key and key in seen:
+            duplicates.add(position)
+        elif key:
+            seen.add(key)
+    return duplicates
+
+
+def find_below_zero(increments, skip=()):
+    """
+    Positions of the decrements that would take their count below zero,
+    checked in batch order against the locked current counts. Increments
+    at positions in ``skip`` are ignored.
+    """
+    keys = {inc[:3] for position, inc in enumerate(increments) if inc.value < 0 and position not in skip}
+    if not keys:
+        return set()
+
+    fields = ("game_id", "player_id", "metric_id")
+    locked = _lock_rows(PlayerGameStat, fields, keys, "count")
+    running = defaultdict(int, {key: count for key, (count,) in locked.items()})
+    rejected = set()
+    for position, increment in enumerate(increments):
+        if position in skip:
+            continue
+        key = increment[:3]
+        if running[key] + increment.value < 0:
+            rejected.add(position)
+        else:
+            running[key] += increment.value
+    return rejected
+
+
+def apply_increments(increments):
+    """
+    Apply validated Increments atomically.
+
+    Each increment is appended to the MatchEvent log first; retries carrying
+    an idempotency_key that is already logged are dropped, and so are
+    decrements that would take a count below zero. The remaining
+    increments for the same (game, player, metric) are coalesced, so a batch
+    costs a fixed number of queries however many events it carries. The
+    PlayerSeasonStat and TeamGameStat rollups, game scores and standings
+    are updated in the same transaction, and the increments are broadcast to live subscribers once
+    it commits.
+
+    Returns (counts, duplicates, rejected): {(game_id, player_id,
+    metric_id): count} for every key in the batch, the positions (in
+    ``increments``) of the increments skipped as duplicates and {position:
+    error message} for the ones that could not be applied.
+    """
+    increments = [Increment(*increment) for increment in increments]
+    if not increments:
+        return {}, set(), {}
+
+    try:
+        with transaction.atomic():
+            return _apply(increments)
+    except IntegrityError:
+        # A concurrent request logged one of our idempotency keys between
+        # the duplicate check and the insert, or (where reads take no row
+        # locks) took a count below what the check saw; the retry sees both.
+        with transaction.atomic():
+            return _apply(increments)
+
+
+def _apply(increments):
+    duplicates = find_duplicates(increments)
+    rejected = find_below_zero(increments, skip=duplicates)
+    new = [inc for position, inc in enumerate(increments) if position not in duplicates and position not in rejected]
+    MatchEvent.objects.bulk_create([MatchEvent(**increment._asdict()) for increment in new])
+
+    # Keys that only carried duplicates stay at 0 so their count is still read back.
+    deltas = dict.fromkeys([(inc.game_id, inc.player_id, inc.metric_id) for inc in increments], 0)
+    for increment in new:
+        deltas[(increment.game_id, increment.player_id, increment.metric_id)] += increment.value
+    applied = {key: value for key, value in deltas.items() if value}
+
+    versions = _bump_stats_versions({key[0] for key in applied}) if applied else {}
+    team_of = _game_teams({key[:2] for key in deltas})
+    counts = _add_counts(
+        PlayerGameStat,
+        ("game_id", "player_id", "metric_id"),
+        deltas,
+        initial=lambda key: {"team_id": team_of[key[:2]]},
+        updated_at=timezone.now(),
+        version=_version_expression(versions) if versions else F("version"),
+    )
+
+    if applied:
+        _update_rollups(applied, team_of)
+        # Robust: the stats are saved by then, so a broker or cache error is
+        # logged instead of failing the request.
+        transaction.on_commit(lambda: publish_increments(applied, counts, versions), robust=True)
+        transaction.on_commit(lambda: bump_form_versions({key[1] for key in applied}), robust=True)
+    return counts, duplicates, dict.fromkeys(rejected, BELOW_ZERO)
+
+
+def _bump_stats_versions(game_ids):
+    """
+    Increment Game.stats_version for ``game_ids`` and return the new values.
+    The UPDATE holds the game rows' locks until commit, so the versions of
+    one game are handed out (and become visible) strictly in order.
+    """
+    Game.objects.filter(id__in=game_ids).update(stats_version=F("stats_version") + 1)
+    return dict(Game.objects.filter(id__in=game_ids).values_list("id", "stats_version"))
+
+
+def _version_expression(versions):
+    if len(versions) == 1:
+        return Value(next(iter(versions.values())))
+    return Case(
+        *[When(game_id=game_id, then=Value(version)) for game_id, version in versions.items()],
+        default=F("version"),
+        output_field=PlayerGameStat._meta.get_field("version"),
+    )
+
+
+def _game_teams(pairs):
+    """
+    {(game_id, player_id): team_id} the player's stats in the game count
+    for: the team stored with their earlier stats in that game, else (a
+    first stat) their current team. Transfers do not move past games.
+    """
+    recorded = {}
+    for chunk in _key_chunks(pairs):
+        lookup = reduce(operator.or_, (Q(game_id=game_id, player_id=player_id) for game_id, player_id in chunk))
+        recorded.update(
+            ((game_id, player_id), team_id) for game_id, player_id, team_id in
+            PlayerGameStat.objects.filter(lookup, team__isnull=False).values_list("game_id", "player_id", "team_id")
+        )
+    current = dict(Player.objects.filter(id__in={player_id for _, player_id in pairs}).values_list("id", "team_id"))
+    return {pair: recorded.get(pair, current[pair[1]]) for pair in pairs}
+
+
+def _update_rollups(deltas, team_of):
+    games = {
+        game_id: rest for game_id, *rest in
+        Game.objects.filter(id__in={key[0] for key in deltas})
+        .values_list("id", "matchday__season_id", "home_team_id", "away_team_id", "home_score", "away_score")
+    }
+
+    goal_id = goal_metric_id()
+    season_deltas, team_deltas, goal_deltas = defaultdict(int), defaultdict(int), defaultdict(int)
+    for (game_id, player_id, metric_id), value in deltas.items():
+        season_deltas[(player_id, games[game_id][0], metric_id)] += value
+        team_id = team_of[(game_id, player_id)]
+        team_deltas[(team_id, game_id, metric_id)] += value
+        if metric_id == goal_id:
+            goal_deltas[(team_id, game_id)] += value
+
+    _add_counts(PlayerSeasonStat, ("player_id", "season_id", "metric_id"), season_deltas)
+    _add_counts(TeamGameStat, ("team_id", "game_id", "metric_id"), team_deltas)
+    update_standings(games, goal_deltas)
+
+
+def enqueue_increments(increments):
+    """
+    Append validated Increments to the PendingIncrement queue.
+
+    Decrements are checked first against the current count plus what is
+    already queued for the key, so one that would take the count below
+    zero is refused now rather than failing in the flusher. The check takes
+    no locks; the flusher rejects whatever still slips through.
+    Returns {position: error message} for the increments not queued.
+    """
+    increments = [Increment(*increment) for increment in increments]
+    keys = {inc[:3] for inc in increments if inc.value < 0}
+    running = defaultdict(int)
+    for chunk in _key_chunks(keys):
+        lookup = reduce(operator.or_, (Q(game_id=g, player_id=p, metric_id=m) for g, p, m in chunk))
+        for *key, count in PlayerGameStat.objects.filter(lookup).values_list(
+            "game_id", "player_id", "metric_id", "count"
+        ):
+            running[tuple(key)] += count
+        for *key, value in (
+            PendingIncrement.objects.filter(lookup, failed_at__isnull=True)
+            .values_list("game_id", "player_id", "metric_id").annotate(total=Sum("value")).order_by()
+        ):
+            running[tuple(key)] += value
+
+    rejected = {}
+    for position, increment in enumerate(increments):
+        if running[increment[:3]] + increment.value < 0:
+            rejected[position] = BELOW_ZERO
+        else:
+            running[increment[:3]] += increment.value
+
+    PendingIncrement.objects.bulk_create([
+        PendingIncrement(**increment._asdict())
+        for position, increment in enumerate(increments) if position not in rejected
+    ])
+    return rejected
+
+
+def flush_pending_increments(limit=10000, **filters):
+    """
+    Apply up to ``limit`` queued increments (optionally filtered, e.g. by
+    game_id) in one coalesced apply_increments call, then delete them.
+    Concurrent flushers skip each other's locked rows where supported.
+
+    Rows that cannot be applied (a decrement below zero, or a database
+    error isolated by retrying the batch row by row) are dead-lettered:
+    kept with failed_at and error set, and skipped by later flushes, so
+    one bad row never blocks the queue. Returns the number of queued rows
+    processed.
+    """
+    with transaction.atomic():
+        pending = PendingIncrement.objects.filter(failed_at__isnull=True, **filters).order_by("id")
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        rows = list(pending.values_list("id", *Increment._fields)[:limit])
+        if not rows:
+            return 0
+
+        ids = [row[0] for row in rows]
+        try:
+            with transaction.atomic():
+                _, _, rejected = apply_increments([row[1:] for row in rows])
+            failed = {ids[position]: message for position, message in rejected.items()}
+        except DatabaseError:
+            failed = {}
+            for pk, *increment in rows:
+                try:
+                    with transaction.atomic():
+                        _, _, rejected = apply_increments([increment])
+                except DatabaseError as exc:
+                    failed[pk] = str(exc)
+                else:
+                    if rejected:
+                        failed[pk] = rejected[0]
+
+        PendingIncrement.objects.filter(id__in=ids).exclude(id__in=failed).delete()
+        now = timezone.now()
+        for pk, error in failed.items():
+            PendingIncrement.objects.filter(id=pk).update(failed_at=now, error=error[:255])
+    return len(rows)
@@ -0,0 +1,111 @@
+# core/sync.py
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import PlayerGameStat
+from .stats import apply_increments, validate_increments
+
+MAX_DEVICE_ID_LENGTH = 64
+MAX_SYNC_GAMES = 50
+# Keeps "sync:<user>:<device>:<seq>" within MatchEvent.idempotency_key's 100 characters.
+MAX_SEQ = 2 ** 53
+
+
+class SyncError(Exception):
+    """Raised when a sync request as a whole is malformed."""
+
+
+def make_sync_token(moment):
+    return str(int(moment.timestamp() * 1_000_000))
+
+
+def parse_sync_token(token):
+    try:
+        micros = int(token)
+    except (TypeError, ValueError):
+        raise SyncError("since must be a sync_token returned by an earlier sync.")
+    if micros < 0:
+        raise SyncError("since must be a sync_token returned by an earlier sync.")
+    return datetime.fromtimestamp(micros / 1_000_000, tz=dt_timezone.utc)
+
+
+def sync(user_id, device_id, events, since=None, game_ids=None):
+    """
+    Merge a batch of events buffered offline by one device of ``user_id``
+    and return the authoritative counts that changed since the device's
+    last sync.
+
+    Every event carries a per-device sequence number, which together with
+    the user and device becomes its idempotency key, so a batch that is
+    uploaded again after a lost response is not counted twice (and two
+    users' devices can never collide). Valid events are applied together
+    through apply_increments. ``acked_seq`` is the highest seq below the
+    first rejected one: the client may drop everything up to it and keeps
+    the rejected events, and all after them, for another try.
+
+    The returned stats are absolute counts for the requested games (default:
+    the games of the uploaded events): every row on the first sync, then
+    only rows updated since ``since``. The token is a server timestamp and
+    the delta reaches STAT_SYNC_OVERLAP_SECONDS further back, which covers
+    transactions still committing when the last token was issued and clock
+    differences between app servers. Re-sent rows are harmless because
+    counts are absolute.
+    """
+    if not isinstance(device_id, str) or not 0 < len(device_id) <= MAX_DEVICE_ID_LENGTH:
+        raise SyncError(f"device_id must be a string of 1-{MAX_DEVICE_ID_LENGTH} characters.")
+    if not isinstance(events, list):
+        raise SyncError("events must be a list.")
+    since = parse_sync_token(since) if since not in (None, "") else None
+    if game_ids is not None:
+        if not isinstance(game_ids, list) or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in game_ids):
+            raise SyncError("games must be a list of game ids.")
+        if len(game_ids) > MAX_SYNC_GAMES:
+            raise SyncError(f"At most {MAX_SYNC_GAMES} games per sync.")
+
+    items, seqs, rejected = [], [], []
+    for event in events:
+        seq = event.get("seq") if isinstance(event, dict) else None
+        if isinstance(seq, bool) or not isinstance(seq, int) or not 0 <= seq < MAX_SEQ:
+            rejected.append({"seq": seq, "error": f"seq must be an integer between 0 and {MAX_SEQ - 1}."})
+            continue
+        items.append({**event, "idempotency_key": f"sync:{user_id}:{device_id}:{seq}"})
+        seqs.append(seq)
+
+    valid, errors, _, _ = validate_increments(items)
+    increments = [increment for _, increment in valid]
+    _, duplicates, failed = apply_increments(increments)
+    for position, message in failed.items():
+        errors[valid[position][0]] = message
+    for index, message in sorted(errors.items()):
+        rejected.append({"seq": seqs[index], "error": message})
+
+    accepted = [seq for index, seq in enumerate(seqs) if index not in errors]
+    if errors:
+        first_rejected = min(seqs[index] for index in errors)
+        accepted = [seq for seq in accepted if seq < first_rejected]
+
+    if game_ids is None:
+        game_ids = sorted({increment.game_id for increment in increments})
+
+    # Taken before the delta is read: anything committed after this point
+    # is picked up by the next sync.
+    token = timezone.now()
+    stats = PlayerGameStat.objects.filter(game_id__in=game_ids)
+    if since is not None:
+        stats = stats.filter(updated_at__gt=since - timedelta(seconds=settings.STAT_SYNC_OVERLAP_SECONDS))
+
+    return {
+        "sync_token": make_sync_token(token),
+        "acked_seq": max(accepted, default=None),
+        "applied": len(increments) - len(duplicates) - len(failed),
+        "duplicates": len(duplicates),
+        "rejected": rejected,
+        "full": since is None,
+        "stats": [
+            {"game_id": game_id, "player_id": player_id, "metric_id": metric_id, "count": count}
+            for game_id, player_id, metric_id, count in stats.order_by("game_id", "player_id", "metric_id")
+            .values_list("game_id", "player_id", "metric_id", "count")
+        ],
+    }
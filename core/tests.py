@@ -1,3 +1,1484 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import json
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import hot_path_authentication_classes
+from .benchmarks import bench_endpoints
+from .broadcast import InProcessBroker, publish_increments
+from .cache import get_metrics, model_version
+from .core import wrap_response
+from .middleware import RequestMetricsMiddleware, metrics
+from .models import (
+    Game, League, Matchday, MatchEvent, Metric, PendingIncrement, Player, PlayerGameStat, PlayerSeasonStat, Season,
+    Team, TeamGameStat,
+)
+from .renderers import FastJSONRenderer
+from .serializers import (
+    GameFastSerializer, GameSerializer, PlayerGameStatFastSerializer, PlayerGameStatSerializer,
+    RoleTokenObtainPairSerializer,
+)
+from .form import player_form
+from .standings import standings
+from .stats import Increment, apply_increments, flush_pending_increments
+from .views import GameViewSet, PlayerGameStatUpdateView
+
+
+class FixtureTestCase(TestCase):
+    """
+    Shared fixture: league "Premier", season 2024/2025 with matchday MD1 and
+    the teams named in ``team_names`` (``home`` and ``away`` are the first
+    two). Subclasses call super().setUpTestData() and add what they need.
+    """
+    team_names = ("Home", "Away")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = League.objects.create(name="Premier", country="England")
+        cls.season = Season.objects.create(league=cls.league, year="2024/2025")
+        cls.matchday = Matchday.objects.create(season=cls.season, name="MD1", number=1)
+        cls.teams = [Team.objects.create(name=name, league=cls.league) for name in cls.team_names]
+        cls.home, cls.away = cls.teams[:2]
+
+    @classmethod
+    def make_game(cls, day=17, **fields):
+        """Home vs Away on MD1, kicking off 2024-08-``day``; ``fields`` override any of that."""
+        return Game.objects.create(**{
+            "matchday": cls.matchday, "home_team": cls.home, "away_team": cls.away,
+            "date": datetime(2024, 8, day, tzinfo=dt_timezone.utc), **fields,
+        })
+
+
+class FastSerializerTests(FixtureTestCase):
+    """The values()-based serializers must render byte-identical JSON."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.game = cls.make_game(date=datetime(2024, 8, 17, 14, 30, 5, 123456, tzinfo=dt_timezone.utc))
+        cls.make_game(home_team=cls.away, away_team=cls.home, date=datetime(2024, 8, 24, 19, 0, tzinfo=dt_timezone.utc))
+        metrics = [
+            Metric.objects.create(name="Goal", short_code="GOAL"),
+            Metric.objects.create(name="Pass", short_code="PASS"),
+        ]
+        for number in range(1, 4):
+            player = Player.objects.create(name=f"Player é{number}", team=cls.home, position="MF", jersey_number=number)
+            for metric in metrics:
+                PlayerGameStat.objects.create(game=cls.game, player=player, metric=metric, count=number)
+
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_player_game_stat_fast_serializer_matches(self):
+        queryset = PlayerGameStat.objects.order_by("metric__name", "id")
+        expected = PlayerGameStatSerializer(queryset.select_related("metric", "player", "game"), many=True).data
+        actual = PlayerGameStatFastSerializer.serialize(PlayerGameStatFastSerializer.values(queryset))
+        self.assertEqual(self.render(actual), self.render(expected))
+
+    def test_game_fast_serializer_matches(self):
+        queryset = Game.objects.order_by("id")
+        expected = GameSerializer(queryset, many=True).data
+        actual = GameFastSerializer.serialize(GameFastSerializer.values(queryset))
+        self.assertEqual(self.render(actual), self.render(expected))
+
+    def test_endpoints_match_with_and_without_fast_path(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        for view, url in [
+            (PlayerGameStatUpdateView, f"/api/player-stats/?game_id={self.game.id}"),
+            (GameViewSet, "/api/games/"),
+        ]:
+            fast = client.get(url)
+            with mock.patch.object(view, "fast_serializer_class", None):
+                slow = client.get(url)
+            self.assertEqual(fast.status_code, 200)
+            self.assertEqual(fast.content, slow.content)
+
+
+class BatchIngestTests(FixtureTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.game = cls.make_game()
+        cls.players = [
+            Player.objects.create(name=f"Player {number}", team=cls.home, position="FW", jersey_number=number)
+            for number in (9, 10)
+        ]
+        cls.goal = Metric.objects.create(name="Goal", short_code="GOAL")
+        cls.shot = Metric.objects.create(name="Shot", short_code="SHT")
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def item(self, player, metric, value=1, **extra):
+        return {"game_id": self.game.id, "player_id": player.id, "metric_id": metric.id, "value": value, **extra}
+
+    def post(self, items):
+        return self.client.post("/api/player-stats/", items, format="json")
+
+    def count(self, player, metric):
+        return PlayerGameStat.objects.get(game=self.game, player=player, metric=metric).count
+
+    def test_mixed_batch_reports_per_item(self):
+        scorer, other = self.players
+        response = self.post([
+            self.item(scorer, self.goal, idempotency_key="goal-1"),
+            self.item(scorer, self.goal, idempotency_key="goal-1"),
+            self.item(other, self.shot, 3),
+            {**self.item(other, self.shot), "metric_id": 999},
+            {"game_id": self.game.id},
+        ])
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()["data"]
+        self.assertEqual((data["applied"], data["failed"]), (3, 2))
+        self.assertEqual([result["status"] for result in data["results"]], ["success"] * 3 + ["error"] * 2)
+        self.assertEqual([result.get("duplicate") for result in data["results"][:2]], [False, True])
+        self.assertEqual(data["results"][2]["count"], 3)
+        self.assertEqual((self.count(scorer, self.goal), self.count(other, self.shot)), (1, 3))
+
+        response = self.post({"increments": [{"game_id": self.game.id}]})
+        self.assertEqual(response.status_code, 400)
+
+    def test_decrement_below_zero_is_a_per_item_error(self):
+        scorer, other = self.players
+        self.post([self.item(scorer, self.goal, 2)])
+
+        response = self.post([
+            self.item(scorer, self.goal, -1),
+            self.item(scorer, self.goal, -2),
+            self.item(other, self.goal, -1),
+            self.item(other, self.shot),
+        ])
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()["data"]
+        self.assertEqual((data["applied"], data["failed"]), (2, 2))
+        self.assertEqual([result["status"] for result in data["results"]], ["success", "error", "error", "success"])
+        self.assertEqual((self.count(scorer, self.goal), self.count(other, self.shot)), (1, 1))
+        self.assertEqual(PlayerSeasonStat.objects.get(player=scorer, metric=self.goal).count, 1)
+        self.assertEqual(MatchEvent.objects.filter(value__lt=0).count(), 1)
+
+        response = self.post(self.item(other, self.goal, -1))
+        self.assertEqual(response.status_code, 400)
+
+    def test_only_the_batch_keys_are_locked(self):
+        scorer, other = self.players
+        with CaptureQueriesContext(connection) as queries:
+            self.post([self.item(scorer, self.goal), self.item(other, self.shot)])
+        selects = [
+            query["sql"] for query in queries.captured_queries
+            if query["sql"].startswith("SELECT") and 'FROM "core_playergamestat"' in query["sql"]
+        ]
+        self.assertTrue(selects)
+        for sql in selects:
+            self.assertNotIn(" IN (", sql)
+
+
+class PlayerStatMapTests(FixtureTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.game = cls.make_game()
+        cls.goal = Metric.objects.create(name="Goal", short_code="GOAL")
+        cls.shot = Metric.objects.create(name="Shot", short_code="SHT")
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_players(self, count):
+        start = Player.objects.count()
+        players = Player.objects.bulk_create([
+            Player(name=f"Player {number}", team=self.home, position="MF", jersey_number=number)
+            for number in range(start, start + count)
+        ])
+        PlayerGameStat.objects.bulk_create([
+            PlayerGameStat(game=self.game, player=player, metric=metric, count=player.id)
+            for player in players for metric in (self.goal, self.shot)
+        ])
+        return players
+
+    def list_players(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/api/players/?game_id={self.game.id}")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["data"]["results"], len(queries)
+
+    def test_query_count_does_not_grow_with_players(self):
+        player = self.add_players(2)[0]
+        few, few_queries = self.list_players()
+        self.add_players(20)
+        many, many_queries = self.list_players()
+        self.assertEqual((len(few), len(many)), (2, 22))
+        self.assertEqual(few_queries, many_queries)
+        self.assertEqual(many[0]["stats"], {"goal": player.id, "sht": player.id})
+
+        response = self.client.get(f"/api/players/{player.id}/?game_id={self.game.id}")
+        self.assertEqual(response.json()["data"]["stats"], {"goal": player.id, "sht": player.id})
+        response = self.client.get(f"/api/players/{player.id}/")
+        self.assertEqual(response.json()["data"]["stats"], {})
+
+
+class PaginationProjectionTests(FixtureTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.games = Game.objects.bulk_create([
+            Game(matchday=cls.matchday, home_team=cls.home, away_team=cls.away,
+                 date=datetime(2024, 8, 17, tzinfo=dt_timezone.utc) + timedelta(days=day))
+            for day in range(5)
+        ])
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_pages_walk_forward_and_back(self):
+        url, ids, pages = "/api/games/?page_size=2", [], []
+        while url:
+            data = self.client.get(url).json()["data"]
+            pages.append(data)
+            ids += [game["id"] for game in data["results"]]
+            url = data["next"]
+        self.assertEqual(ids, [game.id for game in self.games])
+        self.assertEqual([len(page["results"]) for page in pages], [2, 2, 1])
+        self.assertIsNone(pages[0]["previous"])
+
+        back = self.client.get(pages[-1]["previous"]).json()["data"]
+        self.assertEqual([game["id"] for game in back["results"]], ids[2:4])
+
+    def test_fields_projection(self):
+        data = self.client.get("/api/games/?fields=id,date&page_size=1").json()["data"]
+        self.assertEqual(list(data["results"][0]), ["id", "date"])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/api/games/{self.games[0].id}/?fields=id,home_score")
+        self.assertEqual(response.json()["data"], {"id": self.games[0].id, "home_score": None})
+        select = next(query["sql"] for query in queries.captured_queries if 'FROM "core_game"' in query["sql"])
+        self.assertNotIn('"core_game"."date"', select)
+
+
+class RollupTests(FixtureTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        later = Season.objects.create(league=cls.league, year="2025/2026")
+        cls.seasons = [cls.season, later]
+        cls.games = [
+            cls.make_game(),
+            cls.make_game(
+                matchday=Matchday.objects.create(season=later, name="MD1", number=1),
+                date=datetime(2025, 8, 17, tzinfo=dt_timezone.utc),
+            ),
+        ]
+        cls.scorer = Player.objects.create(name="Scorer", team=cls.home, position="FW", jersey_number=9)
+        cls.keeper = Player.objects.create(name="Keeper", team=cls.away, position="GK", jersey_number=1)
+        cls.goal = Metric.objects.create(name="Goal", short_code="GOAL")
+        cls.save_ = Metric.objects.create(name="Save", short_code="SAV")
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def record(self, game, player, metric, value=1):
+        apply_increments([Increment(game.id, player.id, metric.id, value)])
+
+    def rollups(self):
+        return (
+            set(PlayerSeasonStat.objects.values_list("player_id", "season_id", "metric_id", "count")),
+            set(TeamGameStat.objects.values_list("team_id", "game_id", "metric_id", "count")),
+        )
+
+    def test_incremental_rollups_match_rebuild(self):
+        first, second = self.games
+        self.record(first, self.scorer, self.goal, 2)
+        self.record(first, self.keeper, self.save_, 3)
+        self.record(second, self.scorer, self.goal)
+        self.record(first, self.scorer, self.goal, -1)
+
+        season_stats, team_stats = self.rollups()
+        self.assertEqual(season_stats, {
+            (self.scorer.id, self.seasons[0].id, self.goal.id, 1),
+            (self.keeper.id, self.seasons[0].id, self.save_.id, 3),
+            (self.scorer.id, self.seasons[1].id, self.goal.id, 1),
+        })
+        self.assertIn((self.scorer.team_id, first.id, self.goal.id, 1), team_stats)
+
+        call_command("rebuild_rollups", stdout=StringIO())
+        self.assertEqual(self.rollups(), (season_stats, team_stats))
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        data = client.get(f"/api/season-stats/?season_id={self.seasons[0].id}&team_id={self.scorer.team_id}").json()
+        self.assertEqual(
+            [(row["player"], row["metric_short_code"], row["count"]) for row in data["data"]],
+            [(self.scorer.id, "GOAL", 1)],
+        )
+
+    def test_replay_of_one_game_only_rebuilds_its_season(self):
+        first, second = self.games
+        self.record(first, self.scorer, self.goal, 2)
+        self.record(second, self.scorer, self.goal)
+        PlayerGameStat.objects.filter(game=first).update(count=0)
+        PlayerSeasonStat.objects.update(count=7)
+
+        call_command("replay_events", game=first.id, stdout=StringIO())
+        counts = dict(PlayerSeasonStat.objects.values_list("season_id", "count"))
+        self.assertEqual(counts, {self.seasons[0].id: 2, self.seasons[1].id: 7})
+        self.assertEqual(PlayerGameStat.objects.get(game=first).count, 2)
+
+
+class LeaderboardTests(FixtureTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.md1 = cls.matchday
+        cls.md2 = Matchday.objects.create(season=cls.season, name="MD2", number=2)
+        first = cls.make_game()
+        second = cls.make_game(24, matchday=cls.md2, home_team=cls.away, away_team=cls.home)
+        cls.players = [
+            Player.objects.create(name=f"Player {number}", team=team, position="FW", jersey_number=number)
+            for number, team in enumerate([cls.home, cls.away, cls.home, cls.away], start=1)
+        ]
+        cls.goal = Metric.objects.create(name="Goal", short_code="GOAL")
+        # Season: 3, 3, 1, 0 goals; matchday 2: 2, 0, 1.
+        apply_increments([
+            Increment(first.id, cls.players[0].id, cls.goal.id, 3),
+            Increment(first.id, cls.players[1].id, cls.goal.id, 1),
+            Increment(second.id, cls.players[1].id, cls.goal.id, 2),
+            Increment(second.id, cls.players[2].id, cls.goal.id, 1),
+        ])
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, query):
+        return self.client.get(f"/api/leaderboards/?metric={self.goal.id}&{query}")
+
+    def ranking(self, query):
+        data = self.get(query).json()["data"]
+        return [(row["rank"], row["player_id"], row["count"]) for row in data["results"]], data["next_offset"]
+
+    def test_season_and_matchday_rankings(self):
+        p1, p2, p3, _ = [player.id for player in self.players]
+        self.assertEqual(self.ranking(f"season={self.season.id}"), ([(1, p1, 3), (1, p2, 3), (3, p3, 1)], None))
+        self.assertEqual(self.ranking(f"season={self.season.id}&limit=1&offset=1"), ([(1, p2, 3)], 2))
+        self.assertEqual(self.ranking(f"season={self.season.id}&team={self.home.id}"), ([(1, p1, 3), (2, p3, 1)], None))
+        self.assertEqual(self.ranking(f"matchday={self.md2.id}"), ([(1, p2, 2), (2, p3, 1)], None))
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get("/api/leaderboards/?metric=1").status_code, 400)
+        self.assertEqual(self.get("season=x").status_code, 400)
+
+
+class RoleClaimTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.collector = User.objects.create_user("collector", password="password123")
+        cls.collector.groups.add(Group.objects.create(name="data_collector"))
+        cls.admin = User.objects.create_user("admin", password="password123")
+        cls.admin.groups.add(Group.objects.create(name="admin"))
+
+    def group_queries(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        return response.status_code, sum('"auth_group"' in query["sql"] for query in queries.captured_queries)
+
+    def test_token_carries_roles(self):
+        response = APIClient().post("/api/token/", {"username": "collector", "password": "password123"})
+        access = response.json()["access"]
+        token = RefreshToken.for_user(self.collector)
+        self.assertEqual(RoleTokenObtainPairSerializer.get_token(self.collector)["roles"], ["data_collector"])
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        with override_settings(JWT_STATELESS_AUTH=True):
+            self.assertEqual(self.group_queries(client, "/api/player-stats/?game_id=1"), (200, 0))
+        # With the User row loaded anyway, the claim is ignored: one groups query.
+        self.assertEqual(self.group_queries(client, "/api/player-stats/?game_id=1"), (200, 1))
+
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token.access_token}")
+        self.assertEqual(self.group_queries(client, "/api/player-stats/?game_id=1"), (200, 1))
+
+    def test_group_removal_applies_to_issued_tokens(self):
+        access = APIClient().post("/api/token/", {"username": "collector", "password": "password123"}).json()["access"]
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(client.get("/api/player-stats/?game_id=1").status_code, 200)
+        self.collector.groups.clear()
+        self.assertEqual(client.get("/api/player-stats/?game_id=1").status_code, 403)
+
+    def test_groups_are_loaded_once_per_request(self):
+        client = APIClient()
+        client.force_authenticate(self.collector)
+        # IsSuperAdminOrAdminOrDataCollector asks for two roles; one query answers both.
+        self.assertEqual(self.group_queries(client, "/api/player-stats/export/?game_id=1"), (200, 1))
+
+        client.force_authenticate(self.admin)
+        self.assertEqual(self.group_queries(client, "/api/player-stats/?game_id=1"), (403, 1))
+
+    def test_hot_path_authentication_defaults_to_the_default_classes(self):
+        client = APIClient()
+        client.login(username="collector", password="password123")
+        self.assertEqual(client.get("/api/player-stats/?game_id=1").status_code, 200)
+
+        self.assertEqual(
+            [cls.__name__ for cls in hot_path_authentication_classes()],
+            ["JWTAuthentication", "BasicAuthentication", "SessionAuthentication"],
+        )
+        with override_settings(HOT_PATH_AUTHENTICATION_CLASSES=[
+            "rest_framework_simplejwt.authentication.JWTAuthentication",
+        ]):
+            self.assertEqual([cls.__name__ for cls in hot_path_authentication_classes()], ["JWTAuthentication"])
+
+
+class StatStreamTests(FixtureTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.game = cls.make_game()
+        cls.player = Player.objects.create(name="Player", team=cls.home, position="FW", jersey_number=9)
+        cls.goal = Metric.objects.create(name="Goal", short_code="GOAL")
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+        cls.token = str(RefreshToken.for_user(cls.user).access_token)
+
+    def url(self, game_id=None, token=None):
+        return f"/api/games/{game_id or self.game.id}/stream/?token={token or self.token}"
+
+    async def test_stream_delivers_published_increments(self):
+        client = AsyncClient()
+        self.assertEqual((await client.get(self.url(token="invalid"))).status_code, 401)
+        self.assertEqual((await client.get(self.url(game_id=999))).status_code, 404)
+
+        response = await client.get(self.url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = aiter(response.streaming_content)
+        self.assertEqual(await anext(content), b": connected\n\n")
+
+        key = (self.game.id, self.player.id, self.goal.id)
+        publish_increments({key: 1}, {key: 3}, {self.game.id: 7})
+        publish_increments({(self.game.id + 1, self.player.id, self.goal.id): 1}, {})
+        event = (await asyncio.wait_for(anext(content), timeout=5)).decode()
+        self.assertTrue(event.startswith("event: stats\ndata: "))
+        self.assertEqual(json.loads(event.split("data: ", 1)[1]), {
+            "game_id": self.game.id, "version": 7,
+            "stats": [{"player_id": self.player.id, "metric_id": self.goal.id, "value": 1, "count": 3}],
+        })
+        await content.aclose()
+
+    def test_wsgi_requests_are_refused(self):
+        self.assertEqual(self.client.get(self.url()).status_code, 501)
+
+    async def test_slow_subscribers_drop_the_oldest_event(self):
+        broker = InProcessBroker(queue_size=2)
+        async with broker.subscribe(1) as subscription:
+            for event in range(3):
+                broker.publish(1, event)
+            broker.publish(2, "other game")
+            await asyncio.sleep(0)
+            self.assertEqual([await subscription.get(), await subscription.get()], [1, 2])
+            self.assertEqual(subscription.dropped, 1)
+        self.assertEqual(broker._subscribers, {})
+
+    def test_broker_errors_do_not_fail_saved_writes(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        item = {"game_id": self.game.id, "player_id": self.player.id, "metric_id": self.goal.id}
+        with mock.patch.object(InProcessBroker, "publish", side_effect=ConnectionError("broker down")), \
+                self.assertLogs("django.test", "ERROR"), self.captureOnCommitCallbacks(execute=True):
+            response = client.post("/api/player-stats/", item, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(PlayerGameStat.objects.get().count, 1)
+
+
+class ResponseCacheTests(FixtureTestCase):
+    team_names = ("Team 0", "Team 1", "Team 2")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.game = cls.make_game()
+        cls.player = Player.objects.create(name="Player", team=cls.teams[0], position="FW", jersey_number=9)
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def names(self):
+        return [team["name"] for team in self.client.get("/api/teams/").json()["data"]["results"]]
+
+    def test_saves_and_deletes_invalidate(self):
+        self.assertEqual(self.names(), ["Team 0", "Team 1", "Team 2"])
+        with self.assertNumQueries(0):
+            self.names()
+
+        Team.objects.filter(pk=self.teams[2].pk).update(name="Stale")   # no signal: still cached
+        self.assertEqual(self.names(), ["Team 0", "Team 1", "Team 2"])
+        self.client.patch(f"/api/teams/{self.teams[1].id}/", {"name": "Renamed"})
+        self.assertEqual(self.names(), ["Team 0", "Renamed", "Stale"])
+        self.teams[0].delete()
+        self.assertEqual(self.names(), ["Renamed", "Stale"])
+
+    def test_etag_and_conditional_get(self):
+        url = f"/api/leagues/{self.league.id}/"
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.league.save()   # new version, same body: same ETag
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.league.name = "Championship"
+        self.league.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_pagination_links_keep_the_requests_host(self):
+        for host in ["a.example.com", "b.example.com"]:
+            data = self.client.get("/api/teams/?page_size=1", HTTP_HOST=host).json()["data"]
+            self.assertTrue(data["next"].startswith(f"http://{host}/api/teams/"), data["next"])
+
+    def test_metric_created_by_another_process_is_accepted(self):
+        get_metrics()
+        # bulk_create sends no signal, like a save in a worker with its own locmem cache.
+        metric = Metric.objects.bulk_create([Metric(name="Goal", short_code="GOAL")])[0]
+        response = self.client.post("/api/player-stats/", {
+            "game_id": self.game.id, "player_id": self.player.id, "metric_id": metric.id,
+        }, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.client.post("/api/player-stats/", {
+            "game_id": self.game.id, "player_id": self.player.id, "metric_id": metric.id + 1,
+        }, format="json").status_code, 400)
+
+    @override_settings(CACHE_VERSION_TIMEOUT=60)
+    def test_versions_expire_when_set(self):
+        version = model_version(Team)
+        with mock.patch("time.time", return_value=time.time() + 61):
+            self.assertNotEqual(model_version(Team), version)
+
+
+@override_settings(STAT_INGEST_MODE="queue")
+class QueuedIngestTests(FixtureTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.game = cls.make_game()
+        cls.player = Player.objects.create(name="Player", team=cls.home, position="FW", jersey_number=9)
+        cls.goal = Metric.objects.create(name="Goal", short_code="GOAL")
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, value=1):
+        item = {"game_id": self.game.id, "player_id": self.player.id, "metric_id": self.goal.id, "value": value}
+        return self.client.post("/api/player-stats/", item, format="json")
+
+    def counts(self):
+        data = self.client.get(f"/api/player-stats/?game_id={self.game.id}").json()["data"]
+        return [row["count"] for row in data]
+
+    def test_queued_increments_are_coalesced_by_the_flusher(self):
+        self.assertEqual(self.post(2).status_code, 202)
+        self.assertEqual(self.post().status_code, 202)
+        self.assertEqual(self.counts(), [])
+        self.assertEqual(flush_pending_increments(), 2)
+        self.assertEqual(self.counts(), [3])
+        self.assertEqual(MatchEvent.objects.count(), 2)
+        self.assertFalse(PendingIncrement.objects.exists())
+
+        self.post()
+        with override_settings(STAT_INGEST_READ_YOUR_WRITES=True):
+            self.assertEqual(self.counts(), [4])
+
+    def test_decrements_and_bounds_are_checked_before_queueing(self):
+        self.post(2)
+        self.assertEqual(self.post(-2).status_code, 202)
+        response = self.post(-1)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["data"]["error"], "value would take the count below zero.")
+        self.assertEqual(self.post(10001).status_code, 400)
+        self.assertEqual(PendingIncrement.objects.count(), 2)
+
+    def test_failing_rows_are_dead_lettered(self):
+        bad, good = PendingIncrement.objects.bulk_create([
+            PendingIncrement(game=self.game, player=self.player, metric=self.goal, value=-1),
+            PendingIncrement(game=self.game, player=self.player, metric=self.goal, value=1),
+        ])
+        self.assertEqual(flush_pending_increments(), 2)
+        self.assertEqual(PlayerGameStat.objects.get().count, 1)
+        bad.refresh_from_db()
+        self.assertIsNotNone(bad.failed_at)
+        self.assertEqual(bad.error, "value would take the count below zero.")
+        self.assertEqual(flush_pending_increments(), 0)
+
+    def test_database_errors_are_isolated_to_their_row(self):
+        other = Player.objects.create(name="Other", team=self.player.team, position="DF", jersey_number=4)
+        PendingIncrement.objects.bulk_create([
+            PendingIncrement(game=self.game, player=player, metric=self.goal) for player in (self.player, other)
+        ])
+
+        def apply(increments):
+            if any(increment[1] == other.id for increment in increments):
+                raise DatabaseError("disk I/O error")
+            return apply_increments(increments)
+
+        with mock.patch("core.stats.apply_increments", side_effect=apply):
+            self.assertEqual(flush_pending_increments(), 2)
+        self.assertEqual(list(PlayerGameStat.objects.values_list("player_id", "count")), [(self.player.id, 1)])
+        self.assertEqual(PendingIncrement.objects.get().error, "disk I/O error")
+
+    def test_non_integer_filters_are_rejected(self):
+        with override_settings(STAT_INGEST_READ_YOUR_WRITES=True):
+            self.assertEqual(self.client.get("/api/player-stats/?game_id=x").status_code, 400)
+        self.assertEqual(self.client.get("/api/player-stats/?player_id=1.5").status_code, 400)
+
+
+class EventLogTests(FixtureTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.game = cls.make_game()
+        cls.player = Player.objects.create(name="Player", team=cls.home, position="FW", jersey_number=9)
+        cls.goal = Metric.objects.create(name="Goal", short_code="GOAL")
+        cls.shot = Metric.objects.create(name="Shot", short_code="SHT")
+
+    def increment(self, metric, value=1, key=None, minute=None):
+        return Increment(self.game.id, self.player.id, metric.id, value, key, minute)
+
+    def test_every_increment_is_logged_once(self):
+        counts, duplicates, _ = apply_increments([
+            self.increment(self.goal, key="a", minute=12),
+            self.increment(self.goal, key="a"),
+            self.increment(self.shot, 2),
+        ])
+        self.assertEqual(duplicates, {1})
+        self.assertEqual(counts[(self.game.id, self.player.id, self.goal.id)], 1)
+        _, duplicates, _ = apply_increments([self.increment(self.goal, key="a")])
+        self.assertEqual(duplicates, {0})
+
+        events = MatchEvent.objects.order_by("id").values_list("metric_id", "value", "idempotency_key", "minute")
+        self.assertEqual(list(events), [(self.goal.id, 1, "a", 12), (self.shot.id, 2, None, None)])
+
+    def test_replay_rebuilds_counts_from_the_log(self):
+        apply_increments([self.increment(self.goal, 2), self.increment(self.shot), self.increment(self.shot, -1)])
+        PlayerGameStat.objects.filter(metric=self.goal).update(count=9)
+        MatchEvent.objects.filter(metric=self.shot).delete()
+
+        call_command("replay_events", stdout=StringIO())
+        counts = dict(PlayerGameStat.objects.values_list("metric_id", "count"))
+        self.assertEqual(counts, {self.goal.id: 2, self.shot.id: 0})
+        self.assertEqual(PlayerSeasonStat.objects.get(metric=self.goal).count, 2)
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.stats_version, 2)
+        self.assertEqual(set(PlayerGameStat.objects.values_list("version", flat=True)), {2})
+
+
+class ImportFixturesTests(TestCase):
+    FILES = {
+        "leagues.csv": "name,country\nPremier,England\n",
+        "seasons.csv": "league,year\nPremier,2024/2025\n",
+        "matchdays.csv": "league,season,number\nPremier,2024/2025,1\nPremier,2024/2025,2\n",
+        "teams.jsonl": '{"name": "Home", "league": "Premier"}\n{"name": "Away", "league": "Premier"}\n',
+        "games.csv": (
+            "league,season,matchday,home_team,away_team,date\n"
+            "Premier,2024/2025,1,Home,Away,2024-08-17T15:00:00Z\n"
+            "Premier,2024/2025,2,Away,Home,2024-08-24T15:00:00Z\n"
+            "Premier,2024/2025,3,Away,Home,2024-08-31T15:00:00Z\n"
+            "Premier,2024/2025,2,Home,Home,2024-08-24T15:00:00Z\n"
+        ),
+        "players.csv": (
+            "name,team,position,jersey_number,age\n"
+            "Keeper,Home,GK,1,30\nStriker,Home,FW,9,\nImpostor,Home,FW,9,\nWinger,Away,MF,7,22\n"
+        ),
+    }
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.paths = {}
+        for name, content in self.FILES.items():
+            path = Path(directory.name) / name
+            path.write_text(content, encoding="utf-8")
+            self.paths[name.split(".")[0]] = str(path)
+
+    def load(self):
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_fixtures", stdout=stdout, stderr=stderr, **self.paths)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_is_validated_and_repeatable(self):
+        stdout, stderr = self.load()
+        self.assertIn("games: 2 created, 0 skipped, 2 failed", stdout)
+        self.assertIn("players: 3 created, 0 skipped, 1 failed", stdout)
+        self.assertIn("unknown matchday 3", stderr)
+        self.assertIn("no_self_games", stderr)
+        self.assertIn("unique_jersey_per_team", stderr)
+        self.assertEqual(Player.objects.get(name="Keeper").age, 30)
+        self.assertEqual(Game.objects.filter(home_team__name="Home").get().matchday.number, 1)
+
+        stdout, _ = self.load()
+        self.assertIn("games: 0 created, 2 skipped", stdout)
+        self.assertEqual(Team.objects.count(), 2)
+
+    def test_import_invalidates_cached_reads(self):
+        versions = [model_version(model) for model in (Team, Game)]
+        self.load()
+        self.assertNotEqual([model_version(model) for model in (Team, Game)], versions)
+
+
+class ExportTests(FixtureTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.game = cls.make_game()
+        cls.players = [
+            Player.objects.create(name=name, team=team, position="FW", jersey_number=9)
+            for name, team in [("Müller, Thomas", cls.home), ("Kane", cls.away)]
+        ]
+        cls.goal = Metric.objects.create(name="Goal", short_code="GOAL")
+        for count, player in enumerate(cls.players, start=1):
+            PlayerGameStat.objects.create(game=cls.game, player=player, metric=cls.goal, count=count)
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def export(self, query=""):
+        response = self.client.get(f"/api/player-stats/export/{query}")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_and_ndjson(self):
+        rows = list(csv.DictReader(StringIO(self.export())))
+        self.assertEqual([(row["player_name"], row["count"]) for row in rows], [("Müller, Thomas", "1"), ("Kane", "2")])
+        self.assertEqual(rows[0]["game_date"], "2024-08-17T00:00:00+00:00")
+
+        lines = [json.loads(line) for line in self.export("?output=ndjson").splitlines()]
+        self.assertEqual([(row["player_id"], row["count"]) for row in lines], [(player.id, count) for count, player in enumerate(self.players, 1)])
+
+    def test_filters(self):
+        lines = self.export(f"?output=ndjson&team_id={self.players[1].team_id}&season_id={self.game.matchday.season_id}")
+        self.assertEqual([json.loads(line)["player_name"] for line in lines.splitlines()], ["Kane"])
+        self.assertEqual(self.export("?game_id=999").splitlines()[1:], [])
+        self.assertEqual(self.client.get("/api/player-stats/export/?game_id=x").status_code, 400)
+        self.assertEqual(self.client.get("/api/player-stats/export/?output=xml").status_code, 400)
+
+
+class MatchSheetTests(FixtureTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.game = cls.make_game()
+        cls.striker = Player.objects.create(name="Striker", team=cls.home, position="FW", jersey_number=9)
+        cls.keeper = Player.objects.create(name="Keeper", team=cls.away, position="GK", jersey_number=1)
+        Player.objects.create(name="Bench", team=cls.home, position="DF", jersey_number=4)
+        cls.goal = Metric.objects.create(name="Goal", short_code="GOAL")
+        cls.save_ = Metric.objects.create(name="Save", short_code="SAV")
+        apply_increments([
+            Increment(cls.game.id, cls.striker.id, cls.goal.id, 2),
+            Increment(cls.game.id, cls.keeper.id, cls.save_.id, 5),
+        ])
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_pivot_of_the_players_with_stats(self):
+        data = self.client.get(f"/api/games/{self.game.id}/match-sheet/").json()["data"]
+        self.assertEqual([metric["short_code"] for metric in data["metrics"]], ["GOAL", "SAV"])
+        home, away = data["teams"]
+        self.assertEqual((home["side"], [player["name"] for player in home["players"]]), ("home", ["Striker"]))
+        self.assertEqual(home["players"][0]["stats"], {"goal": 2, "sav": 0})
+        self.assertEqual(away["totals"], {"goal": 0, "sav": 5})
+
+    def test_unknown_or_malformed_game_is_404(self):
+        self.assertEqual(self.client.get("/api/games/999/match-sheet/").status_code, 404)
+        self.assertEqual(self.client.get("/api/games/abc/match-sheet/").status_code, 404)
+
+
+class FastJSONRendererTests(TestCase):
+    """FastJSONRenderer must be a drop-in replacement for JSONRenderer."""
+
+    def test_output_matches_json_renderer(self):
+        data = {
+            "status": "success",
+            "message": "Record fetched successfully.",
+            "data": {
+                1: "int key",
+                "when": datetime(2024, 8, 17, 14, 30, 5, 123456, tzinfo=dt_timezone.utc),
+                "offset": datetime(2024, 8, 17, 14, 30, tzinfo=dt_timezone(timedelta(hours=2))),
+                "day": date(2024, 8, 17),
+                "amount": Decimal("1.50"),
+                "text": "Müller\u2028line\u2029",
+                "big": 2 ** 70,
+                "items": [None, True, 1.5, (1, 2)],
+            },
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_indent_uses_stdlib_path(self):
+        data = {"a": [1, 2]}
+        self.assertEqual(
+            FastJSONRenderer().render(data, "application/json; indent=4"),
+            JSONRenderer().render(data, "application/json; indent=4"),
+        )
+
+    def test_wrap_response_keeps_headers(self):
+        def view(self, request):
+            response = Response({"id": 1}, status=201)
+            response["Location"] = "/api/games/1/"
+            return response
+
+        response = wrap_response(view)(None, None)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response["Location"], "/api/games/1/")
+        self.assertEqual(response.data, {
+            "status": "success", "message": "Record created successfully.", "data": {"id": 1},
+        })
+
+
+class QueryPlanTests(TestCase):
+    """
+    EXPLAIN the stat read paths against a seeded dataset and fail on a full
+    table scan or a sort the indexes should have made unnecessary.
+    """
+    SEASONS, MATCHDAYS, TEAMS, SQUAD = 2, 6, 8, 11
+    INDEXED_TABLES = ["core_playergamestat", "core_playerseasonstat", "core_game", "core_standing"]
+
+    @classmethod
+    def setUpTestData(cls):
+        league = League.objects.create(name="Premier", country="England")
+        teams = Team.objects.bulk_create([Team(name=f"Team {i}", league=league) for i in range(cls.TEAMS)])
+        players = Player.objects.bulk_create([
+            Player(name=f"Player {team.id}-{number}", team=team, position="MF", jersey_number=number)
+            for team in teams for number in range(1, cls.SQUAD + 1)
+        ])
+        cls.metrics = Metric.objects.bulk_create([
+            Metric(name=f"Metric {i}", short_code=f"M{i}") for i in range(8)
+        ])
+        squads = {team.id: [p for p in players if p.team_id == team.id] for team in teams}
+
+        games, kickoff = [], datetime(2024, 8, 1, tzinfo=dt_timezone.utc)
+        for year in range(cls.SEASONS):
+            season = Season.objects.create(league=league, year=f"{2024 + year}")
+            for number in range(1, cls.MATCHDAYS + 1):
+                matchday = Matchday.objects.create(season=season, name=f"MD{number}", number=number)
+                for i in range(0, cls.TEAMS, 2):
+                    kickoff += timedelta(hours=3)
+                    games.append(Game(matchday=matchday, home_team=teams[i], away_team=teams[i + 1], date=kickoff))
+        games = Game.objects.bulk_create(games)
+
+        PlayerGameStat.objects.bulk_create([
+            PlayerGameStat(game=game, player=player, metric=metric, count=(game.id + player.id) % 5)
+            for game in games
+            for player in squads[game.home_team_id] + squads[game.away_team_id]
+            for metric in cls.metrics
+        ])
+        cls.season, cls.matchday, cls.game = season, matchday, games[-1]
+        cls.player = players[0]
+
+        call_command("rebuild_rollups", stdout=StringIO())
+        call_command("rebuild_standings", stdout=StringIO())
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                # The seeded tables are small enough that Postgres would
+                # rather seq scan; make it show the plan it uses at scale.
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("EXPLAIN " + sql)
+                return "\n".join(row[0] for row in cursor.fetchall())
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            return "\n".join(row[-1] for row in cursor.fetchall())
+
+    def assertIndexed(self, url, allow_sort=False, tables=None):
+        """Every SELECT ``url`` runs must reach the stat tables through an index."""
+        if connection.vendor not in ("sqlite", "postgresql"):
+            self.skipTest(f"no plan checks for {connection.vendor}")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        for query in queries.captured_queries:
+            if not query["sql"].startswith("SELECT"):
+                continue
+            plan = self.explain(query["sql"])
+            message = f"{url}\n{query['sql']}\n{plan}"
+            for table in tables or self.INDEXED_TABLES:
+                self.assertNotRegex(plan, rf"\b(SCAN|Seq Scan on) {table}\b", message)
+            if not allow_sort:
+                self.assertNotRegex(plan, r"(?m)TEMP B-TREE FOR ORDER BY|^\s*(->\s*)?Sort\b", message)
+
+    def test_player_stats_by_game(self):
+        self.assertIndexed(f"/api/player-stats/?game_id={self.game.id}")
+
+    def test_player_stats_by_player(self):
+        self.assertIndexed(f"/api/player-stats/?player_id={self.player.id}")
+
+    def test_player_stats_by_game_and_player(self):
+        self.assertIndexed(f"/api/player-stats/?game_id={self.game.id}&player_id={self.player.id}")
+
+    def test_players_with_game_stats(self):
+        self.assertIndexed(f"/api/players/?game_id={self.game.id}")
+
+    def test_match_sheet(self):
+        self.assertIndexed(f"/api/games/{self.game.id}/match-sheet/", allow_sort=True)
+
+    def test_season_stats(self):
+        self.assertIndexed(f"/api/season-stats/?season_id={self.season.id}&player_id={self.player.id}")
+
+    def test_season_leaderboard(self):
+        self.assertIndexed(f"/api/leaderboards/?metric={self.metrics[0].id}&season={self.season.id}", allow_sort=True)
+
+    def test_matchday_leaderboard(self):
+        # Ranking sorts the aggregated rows of one matchday, which is small.
+        self.assertIndexed(f"/api/leaderboards/?metric={self.metrics[0].id}&matchday={self.matchday.id}", allow_sort=True)
+
+    def test_season_standings(self):
+        self.assertIndexed(f"/api/seasons/{self.season.id}/standings/")
+
+    def test_player_form(self):
+        # The player's games are sorted by date. Here one player is in an
+        # eighth of all games, so SQLite rightly scans core_game; with real
+        # data it looks the player's games up by primary key.
+        cache.clear()
+        self.assertIndexed(
+            f"/api/players/{self.player.id}/form/?metric={self.metrics[0].id}",
+            allow_sort=True, tables=["core_playergamestat"],
+        )
+
+    def test_season_player_games(self):
+        queryset = PlayerGameStat.objects.filter(player_id=self.player.id, game__matchday__season_id=self.season.id)
+        plan = self.explain(str(queryset.query))
+        self.assertNotRegex(plan, r"\b(SCAN|Seq Scan on) core_(playergamestat|game)\b", plan)
+
+    def test_matchday_games_by_date(self):
+        queryset = Game.objects.filter(matchday_id=self.matchday.id).order_by("date")
+        plan = self.explain(str(queryset.query))
+        self.assertNotRegex(plan, r"\bSCAN core_game\b|Seq Scan on core_game|TEMP B-TREE|Sort\b", plan)
+
+
+class SeedDataTests(TestCase):
+    def test_seed_and_benchmark_endpoints(self):
+        call_command("seed_data", leagues=1, seasons=1, teams=4, stdout=StringIO())
+
+        self.assertEqual(Game.objects.count(), 12)  # double round robin of 4 teams
+        stats = PlayerGameStat.objects.count()
+        self.assertGreater(stats, 0)
+        self.assertEqual(MatchEvent.objects.count(), stats)
+        self.assertTrue(PlayerSeasonStat.objects.exists())
+
+        results = bench_endpoints(iterations=1)
+        for name, result in results.items():
+            self.assertEqual(result["status"], 200, name)
+        self.assertFalse(User.objects.filter(username="benchmark").exists())
+
+
+class RequestMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        metrics.reset()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_and_prometheus_endpoint(self):
+        response = self.client.get("/api/games/")
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", render;dur=[\d.]+, total;dur=[\d.]+$')
+
+        with self.settings(REQUEST_METRICS_TOKEN="", DEBUG=True):
+            self.assertEqual(self.client.get("/api/_metrics").status_code, 404)
+        with self.settings(REQUEST_METRICS_TOKEN="secret"):
+            self.assertEqual(self.client.get("/api/_metrics").status_code, 401)
+            response = self.client.get("/api/_metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('api_requests_total{view="game-list",method="GET",status="200"} 1', body)
+        self.assertIn('api_request_duration_seconds_count{view="game-list"} 1', body)
+        self.assertIn('api_db_queries_total{view="game-list"}', body)
+
+    def test_repeated_sql_is_logged_as_n_plus_one(self):
+        def view(request):
+            for metric_id in range(3):
+                list(Metric.objects.filter(id=metric_id))
+            return HttpResponse()
+
+        with self.settings(REQUEST_METRICS_N_PLUS_ONE_THRESHOLD=3):
+            middleware = RequestMetricsMiddleware(view)
+        with self.assertLogs("core.middleware", "WARNING") as logs:
+            response = middleware(RequestFactory().get("/api/metrics/"))
+        self.assertIn("3 x SELECT", logs.output[0])
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+        self.assertEqual(metrics.totals["unresolved"]["n_plus_one"], 1)
+
+
+class StatSyncTests(FixtureTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.game = cls.make_game()
+        cls.player = Player.objects.create(name="Player", team=cls.home, position="FW", jersey_number=9)
+        cls.goal = Metric.objects.create(name="Goal", short_code="GOAL")
+        cls.shot = Metric.objects.create(name="Shot", short_code="SHT")
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def event(self, seq, metric, value=1):
+        return {"seq": seq, "game_id": self.game.id, "player_id": self.player.id, "metric_id": metric.id, "value": value}
+
+    def sync(self, body, **extra):
+        payload = gzip.compress(json.dumps(body).encode())
+        return self.client.post(
+            "/api/sync/", payload, content_type="application/json", HTTP_CONTENT_ENCODING="gzip", **extra,
+        )
+
+    def counts(self, data):
+        return {stat["metric_id"]: stat["count"] for stat in data["stats"]}
+
+    @override_settings(STAT_SYNC_OVERLAP_SECONDS=0)
+    def test_merge_resend_and_delta(self):
+        events = [self.event(1, self.goal), self.event(2, self.goal), self.event(3, self.shot, 4)]
+        response = self.sync({"device_id": "tablet-1", "events": events})
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()["data"]
+        self.assertEqual((data["applied"], data["duplicates"], data["acked_seq"], data["full"]), (3, 0, 3, True))
+        self.assertEqual(self.counts(data), {self.goal.id: 2, self.shot.id: 4})
+
+        # The response was lost: the same batch comes again and is not counted twice.
+        data = self.sync({"device_id": "tablet-1", "events": events, "since": data["sync_token"]}).json()["data"]
+        self.assertEqual((data["applied"], data["duplicates"], data["full"]), (0, 3, False))
+        token = data["sync_token"]
+
+        # Another device records a shot; the first device only gets that row back.
+        self.sync({"device_id": "tablet-2", "events": [self.event(1, self.shot)]})
+        data = self.sync({"device_id": "tablet-1", "events": [], "since": token, "games": [self.game.id]}).json()["data"]
+        self.assertEqual(self.counts(data), {self.shot.id: 5})
+        self.assertIsNone(data["acked_seq"])
+
+    def test_rejected_events_and_errors(self):
+        data = self.sync({"device_id": "tablet-1", "events": [
+            self.event(1, self.goal), {**self.event(2, self.goal), "metric_id": 999}, {"seq": "x"},
+            self.event(3, self.goal), self.event(4, self.shot, -1),
+        ]}).json()["data"]
+        self.assertEqual(data["applied"], 2)
+        # Only acknowledged up to the first rejected event.
+        self.assertEqual(data["acked_seq"], 1)
+        self.assertEqual([r["seq"] for r in data["rejected"]], ["x", 2, 4])
+
+        self.assertEqual(self.sync({"events": []}).status_code, 400)
+        self.assertEqual(self.sync({"device_id": "d", "since": "soon"}).status_code, 400)
+        with override_settings(STAT_SYNC_MAX_BODY_BYTES=100):
+            response = self.sync({"device_id": "d", "events": [self.event(i, self.goal) for i in range(10)]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(PlayerGameStat.objects.get(metric=self.goal).count, 2)
+
+    def test_sequence_numbers_are_scoped_per_user(self):
+        other = User.objects.create_superuser("other", "other@example.com", "password")
+        events = [self.event(1, self.goal)]
+        self.assertEqual(self.sync({"device_id": "tablet-1", "events": events}).json()["data"]["applied"], 1)
+        self.client.force_authenticate(other)
+        data = self.sync({"device_id": "tablet-1", "events": events}).json()["data"]
+        self.assertEqual((data["applied"], data["duplicates"]), (1, 0))
+        self.assertEqual(PlayerGameStat.objects.get(metric=self.goal).count, 2)
+
+    def test_response_is_gzipped_when_accepted(self):
+        squad = Player.objects.bulk_create([
+            Player(name=f"Squad {number}", team=self.player.team, position="MF", jersey_number=number)
+            for number in range(10, 30)
+        ])
+        events = [{**self.event(seq, self.goal), "player_id": player.id} for seq, player in enumerate(squad)]
+        response = self.sync({"device_id": "tablet-1", "events": events}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(response.content))["data"]["applied"], 20)
+
+
+class GameSnapshotTests(FixtureTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.game = cls.make_game()
+        cls.other = cls.make_game(24, home_team=cls.away, away_team=cls.home)
+        cls.player = Player.objects.create(name="Player", team=cls.home, position="FW", jersey_number=9)
+        cls.goal = Metric.objects.create(name="Goal", short_code="GOAL")
+        cls.shot = Metric.objects.create(name="Shot", short_code="SHT")
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def record(self, *increments):
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_increments([Increment(game.id, self.player.id, metric.id, 1) for game, metric in increments])
+
+    def snapshot(self, query="", **extra):
+        return self.client.get(f"/api/games/{self.game.id}/snapshot/{query}", **extra)
+
+    def test_versions_follow_increments(self):
+        self.record((self.game, self.goal), (self.game, self.shot), (self.other, self.goal))
+        self.record((self.game, self.shot))
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.stats_version, 2)
+        versions = dict(PlayerGameStat.objects.filter(game=self.game).values_list("metric_id", "version"))
+        self.assertEqual(versions, {self.goal.id: 1, self.shot.id: 2})
+        self.assertEqual(Game.objects.get(pk=self.other.pk).stats_version, 1)
+
+    def test_conditional_get_and_delta(self):
+        self.record((self.game, self.goal), (self.game, self.shot))
+        response = self.snapshot()
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual((data["version"], data["full"], len(data["stats"])), (1, True, 2))
+
+        self.assertEqual(self.snapshot(HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+        self.record((self.game, self.shot))
+        self.assertEqual(self.snapshot(HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 200)
+        data = self.snapshot(f"?since_version={data['version']}").json()["data"]
+        self.assertEqual(data["version"], 2)
+        self.assertEqual(data["stats"], [{"player_id": self.player.id, "metric_id": self.shot.id, "count": 2, "version": 2}])
+
+        response = self.snapshot("?since_version=2")
+        self.assertEqual(response.json()["data"]["stats"], [])
+        self.assertEqual(self.snapshot("?since_version=2", HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        self.assertEqual(self.snapshot("?since_version=-1").status_code, 400)
+
+    def test_unknown_or_malformed_game_is_404(self):
+        self.assertEqual(self.client.get("/api/games/999/snapshot/").status_code, 404)
+        self.assertEqual(self.client.get("/api/games/abc/snapshot/").status_code, 404)
+
+    def test_version_and_score_are_read_only(self):
+        self.record((self.game, self.goal))
+        response = self.client.patch(
+            f"/api/games/{self.game.id}/", {"stats_version": 0, "home_score": 5, "away_score": 5}, format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.game.refresh_from_db()
+        self.assertEqual((self.game.stats_version, self.game.home_score, self.game.away_score), (1, 1, 0))
+
+
+class AsyncReadViewTests(FixtureTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.games = [cls.make_game(day) for day in (10, 17, 24)]
+        cls.players = [
+            Player.objects.create(name=f"Player {number}", team=cls.home, position="FW", jersey_number=number)
+            for number in (9, 10)
+        ]
+        cls.goal = Metric.objects.create(name="Goal", short_code="GOAL")
+        apply_increments([Increment(cls.games[0].id, player.id, cls.goal.id, 1) for player in cls.players])
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "password")
+        cls.viewer = User.objects.create_user("viewer", "viewer@example.com", "password")
+
+    def client_for(self, user, claims=True):
+        token = RoleTokenObtainPairSerializer.get_token(user) if claims else RefreshToken.for_user(user)
+        token = token.access_token
+        return APIClient(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def assertSameResponse(self, sync_path, async_path, client=None):
+        client = client or self.client_for(self.admin)
+        expected, actual = client.get(sync_path), client.get(async_path)
+        self.assertEqual(actual.status_code, expected.status_code)
+        expected, actual = expected.json(), actual.json()
+        for body in (expected, actual):
+            for key in ("next", "previous"):
+                if isinstance(body["data"], dict) and body["data"].get(key):
+                    body["data"][key] = body["data"][key].replace("/async", "")
+        self.assertEqual(actual, expected)
+        return actual
+
+    def test_same_output_as_sync_views(self):
+        game, player = self.games[0], self.players[0]
+        self.assertSameResponse("/api/games/", "/api/async/games/")
+        self.assertSameResponse(f"/api/games/{game.id}/", f"/api/async/games/{game.id}/")
+        self.assertSameResponse("/api/games/999/", "/api/async/games/999/")
+        self.assertSameResponse(f"/api/players/?game_id={game.id}", f"/api/async/players/?game_id={game.id}")
+        self.assertSameResponse(f"/api/players/{player.id}/?game_id={game.id}", f"/api/async/players/{player.id}/?game_id={game.id}")
+        body = self.assertSameResponse(f"/api/player-stats/?game_id={game.id}", f"/api/async/player-stats/?game_id={game.id}")
+        self.assertEqual(len(body["data"]), 2)
+        self.assertSameResponse("/api/player-stats/", "/api/async/player-stats/")
+
+    def test_cursor_links_follow_the_sync_pagination(self):
+        client = self.client_for(self.admin)
+        data = self.assertSameResponse("/api/games/?page_size=1", "/api/async/games/?page_size=1")["data"]
+        seen = [game["id"] for game in data["results"]]
+        while data["next"]:
+            data = self.assertSameResponse(data["next"], data["next"].replace("/api/", "/api/async/"))["data"]
+            seen += [game["id"] for game in data["results"]]
+        self.assertEqual(seen, [game.id for game in self.games])
+
+        previous = client.get(data["previous"].replace("/api/", "/api/async/")).json()["data"]
+        self.assertEqual([game["id"] for game in previous["results"]], [self.games[1].id])
+        self.assertEqual(client.get("/api/async/games/?cursor=bogus").status_code, 404)
+
+    def test_authentication_and_roles(self):
+        path = f"/api/async/player-stats/?game_id={self.games[0].id}"
+        self.assertEqual(APIClient().get(path).status_code, 401)
+        self.assertEqual(self.client_for(self.viewer).get(path).status_code, 403)
+        self.assertEqual(self.client_for(self.viewer).get("/api/async/games/").status_code, 200)
+        self.assertEqual(self.client_for(self.admin).post("/api/async/games/").status_code, 405)
+
+        # One query for the user and its groups, one for the stats read.
+        client = self.client_for(self.admin)
+        with self.assertNumQueries(2):
+            self.assertEqual(client.get(path).status_code, 200)
+        collector = User.objects.create_user("collector", "collector@example.com", "password")
+        collector.groups.add(Group.objects.create(name="data_collector"))
+        self.assertEqual(self.client_for(collector, claims=False).get(path).status_code, 200)
+        self.assertEqual(self.client_for(self.viewer, claims=False).get(path).status_code, 403)
+
+    def test_roles_are_checked_against_the_database(self):
+        path = f"/api/async/player-stats/?game_id={self.games[0].id}"
+        collector = User.objects.create_user("collector", "collector@example.com", "password")
+        group = Group.objects.create(name="data_collector")
+        collector.groups.add(group)
+        client = self.client_for(collector)
+        self.assertEqual(client.get(path).status_code, 200)
+
+        # The token still claims the role, but the user was demoted.
+        collector.groups.remove(group)
+        self.assertEqual(client.get(path).status_code, 403)
+
+        collector.is_active = False
+        collector.save()
+        self.assertEqual(client.get(path).status_code, 401)
+        self.assertEqual(client.get("/api/async/games/").status_code, 401)
+
+    def test_malformed_filters(self):
+        client = self.client_for(self.admin)
+        for query in ["", "?game_id=x"]:
+            self.assertSameResponse(f"/api/player-stats/{query}", f"/api/async/player-stats/{query}", client)
+        player = self.players[0]
+        body = self.assertSameResponse("/api/players/?game_id=abc", "/api/async/players/?game_id=abc", client)
+        self.assertEqual(body["message"], "game_id must be an integer.")
+        self.assertSameResponse(f"/api/players/{player.id}/?game_id=abc", f"/api/async/players/{player.id}/?game_id=abc", client)
+
+
+class StandingsTests(FixtureTestCase):
+    team_names = ("A", "B", "C", "D")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.a, cls.b, cls.c, cls.d = cls.teams
+        cls.players = {
+            team.id: Player.objects.create(name=f"{team.name} 9", team=team, position="FW", jersey_number=9)
+            for team in (cls.a, cls.b, cls.c, cls.d)
+        }
+        cls.ab = cls.make_game(home_team=cls.a, away_team=cls.b)
+        cls.bc = cls.make_game(home_team=cls.b, away_team=cls.c)
+        cls.ca = cls.make_game(home_team=cls.c, away_team=cls.a)
+        cls.goal = Metric.objects.create(name="Goal", short_code="GOAL")
+        cls.shot = Metric.objects.create(name="Shot", short_code="SHT")
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def score(self, game, team, metric=None, value=1):
+        apply_increments([Increment(game.id, self.players[team.id].id, (metric or self.goal).id, value)])
+
+    def table(self):
+        return {
+            row["team_name"]: (row["position"], row["played"], row["won"], row["drawn"], row["lost"],
+                               row["goals_for"], row["goals_against"], row["goal_difference"], row["points"])
+            for row in standings(self.season.id)
+        }
+
+    def test_incremental_updates_match_rebuild(self):
+        self.score(self.ab, self.a, value=2)
+        self.score(self.ab, self.b)
+        self.score(self.bc, self.c, metric=self.shot)   # first stat: a 0:0 draw so far
+        self.assertEqual(self.table(), {
+            "A": (1, 1, 1, 0, 0, 2, 1, 1, 3),
+            "C": (2, 1, 0, 1, 0, 0, 0, 0, 1),
+            "B": (3, 2, 0, 1, 1, 1, 2, -1, 1),
+        })
+
+        self.score(self.ab, self.b)                     # A 2:2 B turns A's win into a draw
+        self.score(self.bc, self.c)
+        self.ab.refresh_from_db()
+        self.assertEqual((self.ab.home_score, self.ab.away_score), (2, 2))
+        expected = {
+            "C": (1, 1, 1, 0, 0, 1, 0, 1, 3),
+            "A": (2, 1, 0, 1, 0, 2, 2, 0, 1),
+            "B": (3, 2, 0, 1, 1, 2, 3, -1, 1),
+        }
+        self.assertEqual(self.table(), expected)
+
+        call_command("rebuild_standings", stdout=StringIO())
+        self.assertEqual(self.table(), {**expected, "D": (4, 0, 0, 0, 0, 0, 0, 0, 0)})
+        self.assertIsNone(Game.objects.get(pk=self.ca.pk).home_score)
+
+    def test_goalless_games_count_the_same_either_way(self):
+        self.score(self.ab, self.a, metric=self.shot)   # shots only
+        self.score(self.bc, self.b)
+        self.score(self.bc, self.b, value=-1)           # a goal taken back
+        expected = {
+            "B": (1, 2, 0, 2, 0, 0, 0, 0, 2),
+            "A": (2, 1, 0, 1, 0, 0, 0, 0, 1),
+            "C": (3, 1, 0, 1, 0, 0, 0, 0, 1),
+        }
+        self.assertEqual(self.table(), expected)
+
+        call_command("rebuild_standings", stdout=StringIO())
+        self.assertEqual(self.table(), {**expected, "D": (4, 0, 0, 0, 0, 0, 0, 0, 0)})
+
+    def test_goals_stay_with_the_team_at_game_time(self):
+        scorer = self.players[self.a.id]
+        self.score(self.ab, self.a)
+        scorer.team, scorer.jersey_number = self.d, 10
+        scorer.save()
+        self.score(self.ab, self.a)                     # same game, after the transfer
+        self.ab.refresh_from_db()
+        self.assertEqual((self.ab.home_score, self.ab.away_score), (2, 0))
+
+        call_command("rebuild_rollups", stdout=StringIO())
+        call_command("rebuild_standings", stdout=StringIO())
+        self.ab.refresh_from_db()
+        self.assertEqual((self.ab.home_score, self.ab.away_score), (2, 0))
+        self.assertEqual(self.table()["A"], (1, 1, 1, 0, 0, 2, 0, 2, 3))
+        client = APIClient()
+        client.force_authenticate(self.user)
+        home = client.get(f"/api/games/{self.ab.id}/match-sheet/").json()["data"]["teams"][0]
+        self.assertEqual([player["id"] for player in home["players"]], [scorer.id])
+
+        export = client.get(f"/api/player-stats/export/?output=ndjson&team_id={self.a.id}")
+        rows = [json.loads(line) for line in b"".join(export.streaming_content).decode().splitlines()]
+        self.assertEqual([(row["player_id"], row["team_id"]) for row in rows], [(scorer.id, self.a.id)])
+        board = client.get(f"/api/leaderboards/?metric={self.goal.id}&matchday={self.ab.matchday_id}&team={self.a.id}")
+        self.assertEqual(
+            [(row["player_id"], row["team_id"], row["count"]) for row in board.json()["data"]["results"]],
+            [(scorer.id, self.a.id, 2)],
+        )
+
+    def test_games_with_stats_keep_their_season_and_teams(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        other_season = Season.objects.create(league=self.league, year="2025/2026")
+        elsewhere = Matchday.objects.create(season=other_season, name="MD1", number=1)
+        same_season = Matchday.objects.create(season=self.season, name="MD2", number=2)
+
+        # No stats yet: the game can still move anywhere.
+        self.assertEqual(client.patch(f"/api/games/{self.ca.id}/", {"matchday": elsewhere.id}).status_code, 200)
+
+        self.score(self.ab, self.a)
+        path = f"/api/games/{self.ab.id}/"
+        self.assertEqual(client.patch(path, {"matchday": elsewhere.id}).status_code, 400)
+        self.assertEqual(client.patch(path, {"home_team": self.d.id}).status_code, 400)
+        self.assertEqual(client.patch(path, {"matchday": same_season.id}).status_code, 200)
+        self.ab.refresh_from_db()
+        self.assertEqual((self.ab.matchday_id, self.ab.home_team_id), (same_season.id, self.a.id))
+
+    def test_endpoint_is_one_query(self):
+        self.score(self.ab, self.a)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.assertNumQueries(1):
+            response = client.get(f"/api/seasons/{self.season.id}/standings/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["team_id"] for row in response.json()["data"]], [self.a.id, self.b.id])
+        self.assertEqual(client.get("/api/seasons/999/standings/").status_code, 404)
+
+
+class PlayerFormTests(FixtureTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.player = Player.objects.create(name="Player", team=cls.home, position="FW", jersey_number=9)
+        cls.goal = Metric.objects.create(name="Goal", short_code="GOAL")
+        cls.minutes = Metric.objects.create(name="Minutes played", short_code="MIN")
+        # Created out of date order: the series follows Game.date.
+        cls.games = [cls.make_game(day) for day in (24, 3, 17, 10)]
+        cls.games.sort(key=lambda game: game.date)
+        stats = [(2, 90), (0, 45), (1, 90), (3, 60)]   # (goals, minutes) in date order
+        apply_increments(
+            [Increment(game.id, cls.player.id, cls.minutes.id, minutes) for game, (_, minutes) in zip(cls.games, stats)]
+            + [Increment(game.id, cls.player.id, cls.goal.id, goals) for game, (goals, _) in zip(cls.games, stats) if goals]
+        )
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def form(self, query):
+        return self.client.get(f"/api/players/{self.player.id}/form/{query}")
+
+    def test_rolling_windows_and_per_90(self):
+        data = self.form(f"?metric={self.goal.id}&window=3").json()["data"]
+        series = data["series"]
+        self.assertEqual([point["game_id"] for point in series], [game.id for game in self.games])
+        self.assertEqual([point["value"] for point in series], [2, 0, 1, 3])
+        self.assertEqual([point["rolling_sum"] for point in series], [2, 2, 3, 4])
+        self.assertEqual([point["rolling_games"] for point in series], [1, 2, 3, 3])
+        self.assertEqual([point["rolling_avg"] for point in series], [2.0, 1.0, 1.0, 1.333])
+        self.assertEqual([point["per_90"] for point in series], [2.0, 0.0, 1.0, 4.5])
+        self.assertEqual(series[-1]["rolling_minutes"], 195)
+        self.assertEqual(series[-1]["rolling_per_90"], round(4 * 90 / 195, 3))
+
+        self.assertEqual(len(self.form(f"?metric={self.goal.id}&last=2").json()["data"]["series"]), 2)
+        self.assertEqual(self.form("?window=3").status_code, 400)
+        self.assertEqual(self.form(f"?metric={self.goal.id}&window=0").status_code, 400)
+        self.assertEqual(self.form("?metric=999").status_code, 400)
+        self.assertEqual(self.client.get(f"/api/players/999/form/?metric={self.goal.id}").status_code, 404)
+
+    def test_cached_until_the_players_stats_change(self):
+        player, metric = self.player.id, self.goal.id
+        self.assertEqual(player_form(player, metric, 3)[-1]["value"], 3)
+        with self.assertNumQueries(0):
+            player_form(player, metric, 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_increments([Increment(self.games[-1].id, player, metric, 1)])
+        self.assertEqual(player_form(player, metric, 3)[-1]["value"], 4)
+
+    @override_settings(CACHE_VERSION_TIMEOUT=60)
+    def test_changes_from_other_processes_show_once_the_version_expires(self):
+        player, metric = self.player.id, self.goal.id
+        self.assertEqual(player_form(player, metric, 3)[-1]["value"], 3)
+        # Commit callbacks not run: the bump went to another process's locmem cache.
+        apply_increments([Increment(self.games[-1].id, player, metric, 1)])
+        self.assertEqual(player_form(player, metric, 3)[-1]["value"], 3)
+        with mock.patch("time.time", return_value=time.time() + 61):
+            self.assertEqual(player_form(player, metric, 3)[-1]["value"], 4)
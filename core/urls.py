@@ -24,6 +24,18 @@ urlpatterns = [
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),  # POST username/password -> access/refresh tokens
     path('register/', RegisterView.as_view(), name='register'),
     path('player-stats/', PlayerGameStatUpdateView.as_view(), name='player-stats'),
+    path('player-stats/export/', PlayerGameStatExportView.as_view(), name='player-stats-export'),
+    path('sync/', StatSyncView.as_view(), name='stat-sync'),
+    path('season-stats/', PlayerSeasonStatView.as_view(), name='season-stats'),
+    path('leaderboards/', LeaderboardView.as_view(), name='leaderboards'),
+    path('games/<int:game_id>/stream/', game_stat_stream, name='game-stat-stream'),
+    path('_metrics', request_metrics, name='request-metrics'),
+    # Async read views; serve with football_api.asgi to benefit from them.
+    path('async/player-stats/', async_player_stats, name='async-player-stats'),
+    path('async/games/', async_games, name='async-game-list'),
+    path('async/games/<int:pk>/', async_games, name='async-game-detail'),
+    path('async/players/', async_players, name='async-player-list'),
+    path('async/players/<int:pk>/', async_players, name='async-player-detail'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),  # POST refresh -> new access token
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,5 +1,6 @@
 from django.shortcuts import render
-from rest_framework.decorators import api_view
+from rest_framework.decorators import action, api_view
+from rest_framework.exceptions import ParseError
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.views import APIView
@@ -9,6 +10,11 @@ from rest_framework.permissions import IsAuthenticated
 from .models import *
 from .serializers import *
 from .core import wrap_response
+from .cache import CachedReadMixin, get_metrics
+from .match_sheets import match_sheet
+from .standings import standings
+from .form import MAX_FORM_WINDOW, player_form
+from django.http import Http404
 from .permissions import (
     IsSuperAdmin, IsSuperAdminOrAdmin, IsSuperAdminOrDataCollector,
     IsSuperAdminOrAdminOrDataCollector
@@ -26,11 +32,49 @@ def viewset_with_wrapper(viewset_class):
     """
     Takes a ModelViewSet class and returns a new class where every action
     (list, retrieve, create, update, partial_update, destroy) is wrapped.
+
+    Read actions also accept ?fields=a,b, which is applied as .only() on the
+    queryset and trims the serializer output to the requested fields.
+    Viewsets that set ``fast_serializer_class`` (a ValuesSerializer) list
+    through it instead of serializer_class.
     """
     class WrappedViewSet(viewset_class):
+        def get_projected_fields(self):
+            """
+            Field names requested with ?fields=a,b on list/retrieve, or None.
+            """
+            if self.action not in ['list', 'retrieve']:
+                return None
+            fields = self.request.query_params.get('fields')
+            if not fields:
+                return None
+            return [name.strip() for name in fields.split(',') if name.strip()]
+
+        def get_queryset(self):
+            queryset = super().get_queryset()
+            fields = self.get_projected_fields()
+            if fields:
+                concrete = {f.name for f in queryset.model._meta.concrete_fields}
+                queryset = queryset.only('pk', *[name for name in fields if name in concrete])
+            return queryset
+
+        def get_serializer_context(self):
+            context = super().get_serializer_context()
+            context['fields'] = self.get_projected_fields()
+            return context
+
         @wrap_response
         def list(self, request, *args, **kwargs):
-            return super().list(request, *args, **kwargs)
+            fast_serializer_class = getattr(self, 'fast_serializer_class', None)
+            if fast_serializer_class is None or self.get_projected_fields():
+                return super().list(request, *args, **kwargs)
+
+            # Opt-in fast path: serialize .values() rows, no model instances.
+            queryset = fast_serializer_class.values(self.filter_queryset(self.get_queryset()))
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                return self.get_paginated_response(fast_serializer_class.serialize(page))
+            return Response(fast_serializer_class.serialize(queryset))
 
         @wrap_response
         def retrieve(self, request, *args, **kwargs):
@@ -80,8 +124,9 @@ class RegisterView(generics.CreateAPIView):
     
 
 
-class LeagueViewSet(viewset_with_wrapper(ModelViewSet)):
+class LeagueViewSet(CachedReadMixin, viewset_with_wrapper(ModelViewSet)):
     queryset = League.objects.all()
+    cache_models = [League]
     serializer_class = LeagueSerializer
 
     def get_permissions(self):
@@ -89,17 +134,32 @@ class LeagueViewSet(viewset_with_wrapper(ModelViewSet)):
             return [IsAuthenticated()]
         return [IsAuthenticated(), IsSuperAdminOrAdmin()]
 
-class SeasonViewSet(viewset_with_wrapper(ModelViewSet)):
+class SeasonViewSet(CachedReadMixin, viewset_with_wrapper(ModelViewSet)):
     queryset = Season.objects.all()
+    cache_models = [Season]
     serializer_class = SeasonSerializer
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'standings']:
             return [IsAuthenticated()]
         return [IsAuthenticated(), IsSuperAdminOrAdmin()]
 
-class MatchdayViewSet(viewset_with_wrapper(ModelViewSet)):
+    @action(detail=True, methods=['get'], url_path='standings')
+    @wrap_response
+    def standings(self, request, pk=None):
+        """
+        GET: The league table, best first: position, team, played, won,
+        drawn, lost, goals for/against, goal difference and points.
+        Teams appear once they have played (or after rebuild_standings).
+        """
+        table = standings(pk)
+        if not table and not Season.objects.filter(pk=pk).exists():
+            raise Http404("No Season matches the given query.")
+        return Response(table, status=status.HTTP_200_OK)
+
+class MatchdayViewSet(CachedReadMixin, viewset_with_wrapper(ModelViewSet)):
     queryset = Matchday.objects.all()
+    cache_models = [Matchday]
     serializer_class = MatchdaySerializer
 
     def get_permissions(self):
@@ -107,8 +167,9 @@ class MatchdayViewSet(viewset_with_wrapper(ModelViewSet)):
             return [IsAuthenticated()]
         return [IsAuthenticated(), IsSuperAdminOrAdmin()]
 
-class TeamViewSet(viewset_with_wrapper(ModelViewSet)):
+class TeamViewSet(CachedReadMixin, viewset_with_wrapper(ModelViewSet)):
     queryset = Team.objects.all()
+    cache_models = [Team]
     serializer_class = TeamSerializer
 
     def get_permissions(self):
@@ -119,12 +180,79 @@ class TeamViewSet(viewset_with_wrapper(ModelViewSet)):
 class GameViewSet(viewset_with_wrapper(ModelViewSet)):
     queryset = Game.objects.all()
     serializer_class = GameSerializer
+    fast_serializer_class = GameFastSerializer
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'match_sheet', 'snapshot']:
             return [IsAuthenticated()]
         return [IsAuthenticated(), IsSuperAdminOrAdmin()]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'match_sheet':
+            queryset = queryset.select_related('home_team', 'away_team')
+        elif self.action == 'snapshot':
+            queryset = queryset.only('stats_version')
+        return queryset
+
+    @action(detail=True, methods=['get'], url_path='match-sheet')
+    @wrap_response
+    def match_sheet(self, request, pk=None):
+        """
+        GET: One row per player with stats in the game, one column per
+        metric, plus team totals.
+        """
+        return Response(match_sheet(self.get_object()), status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], url_path='snapshot')
+    @wrap_response
+    def snapshot(self, request, pk=None):
+        """
+        GET: The game's stat rows for polling clients.
+
+        ?since_version=N returns only the rows changed after stats version N
+        (the ``version`` of an earlier snapshot); without it every row is
+        returned. The ETag is the game's stats_version, so If-None-Match
+        answers an unchanged game with an empty 304.
+        """
+        since = request.query_params.get('since_version')
+        if since in (None, ''):
+            since = None
+        else:
+            try:
+                since = int(since)
+            except ValueError:
+                since = -1
+            if since < 0:
+                return Response({"since_version": ["Must be a non-negative integer."]},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        game = self.get_object()
+        version = game.stats_version
+
+        etag = f'"game-{game.id}-{since if since is not None else "full"}-{version}"'
+        if request.META.get("HTTP_IF_NONE_MATCH") == etag:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response["ETag"] = etag
+            return response
+
+        stats = PlayerGameStat.objects.filter(game=game)
+        if since is not None:
+            stats = stats.filter(version__gt=since)
+        rows = stats.order_by('player_id', 'metric_id').values_list('player_id', 'metric_id', 'count', 'version')
+        response = Response({
+            "game_id": game.id,
+            "version": version,
+            "since_version": since,
+            "full": since is None,
+            "stats": [
+                {"player_id": player_id, "metric_id": metric_id, "count": count, "version": row_version}
+                for player_id, metric_id, count, row_version in rows
+            ],
+        }, status=status.HTTP_200_OK)
+        response["ETag"] = etag
+        return response
+
 # class PlayerViewSet(viewset_with_wrapper(ModelViewSet)):
 #     queryset = Player.objects.all()
 #     serializer_class = PlayerSerializer
@@ -139,21 +267,83 @@ class PlayerViewSet(viewset_with_wrapper(ModelViewSet)):
     serializer_class = PlayerSerializer
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'form']:
             return [IsAuthenticated()]
         return [IsAuthenticated(), IsSuperAdminOrAdmin()]
 
-    # ← ADD THIS METHOD
+    @action(detail=True, methods=['get'], url_path='form')
+    @wrap_response
+    def form(self, request, pk=None):
+        """
+        GET: Per-game series of one metric with rolling aggregates
+          ?metric=2                 (required)
+          &window=5                 (games per rolling window, max 50)
+          &season=3                 (optional, series and windows within one season)
+          &last=10                  (optional, only the latest N games)
+        Each point: game_id, date, matchday_id, value, rolling_sum,
+        rolling_avg, rolling_games and, when minutes are recorded, minutes,
+        per_90, rolling_minutes and rolling_per_90.
+        """
+        try:
+            player_id = int(pk)
+        except ValueError:
+            raise Http404("No Player matches the given query.")
+        params = request.query_params
+        try:
+            metric_id = int(params["metric"])
+            window = int(params.get("window", 5))
+            season_id = int(params["season"]) if params.get("season") else None
+            last = int(params["last"]) if params.get("last") else None
+        except (KeyError, ValueError):
+            return Response(
+                {"error": "metric is required; metric, window, season and last must be integers."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if metric_id not in get_metrics([metric_id]):
+            return Response({"error": f"Metric {metric_id} does not exist."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= window <= MAX_FORM_WINDOW or (last is not None and last < 1):
+            return Response(
+                {"error": f"window must be between 1 and {MAX_FORM_WINDOW}; last must be positive."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        series = player_form(player_id, metric_id, window, season_id)
+        if not series and not Player.objects.filter(pk=player_id).exists():
+            raise Http404("No Player matches the given query.")
+        return Response({
+            "player_id": player_id,
+            "metric_id": metric_id,
+            "window": window,
+            "season_id": season_id,
+            "series": series[-last:] if last else series,
+        }, status=status.HTTP_200_OK)
+
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        context['game_id'] = self.request.query_params.get('game_id')
+        try:
+            context['game_id'] = _int_param(self.request, 'game_id')
+        except ValueError:
+            raise ParseError('game_id must be an integer.')
+        if context['game_id'] is not None:
+            context['stat_map'] = self.get_stat_map(context['game_id'])
         return context
+
+    def get_stat_map(self, game_id):
+        """
+        {player_id: {short_code: count}} for every stat in the game,
+        loaded in one query and reused for every player in the response.
+        """
+        if not hasattr(self, '_stat_map'):
+            player_id = self.kwargs[self.lookup_field] if self.action == 'retrieve' else None
+            self._stat_map = build_stat_map(stat_map_rows(game_id, player_id))
+        return self._stat_map
     
 
 
 # core/views.py
-class MetricViewSet(viewset_with_wrapper(ModelViewSet)):
+class MetricViewSet(CachedReadMixin, viewset_with_wrapper(ModelViewSet)):
     queryset = Metric.objects.all()
+    cache_models = [Metric]
     serializer_class = MetricSerializer
     permission_classes = [IsAuthenticated, IsSuperAdminOrAdmin]
 
@@ -163,15 +353,70 @@ class MetricViewSet(viewset_with_wrapper(ModelViewSet)):
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import F
 from .models import PlayerGameStat, Metric
-from .serializers import PlayerGameStatSerializer
+from .serializers import PlayerGameStatSerializer, PlayerGameStatFastSerializer
 from .permissions import IsSuperAdminOrDataCollector
 from .core import wrap_response  # your wrapper
+from .authentication import hot_path_authentication_classes
+from .stats import apply_increments, enqueue_increments, flush_pending_increments, validate_increments
+from django.conf import settings
+from .leaderboards import leaderboard
+from .exports import EXPORT_FILTERS, export_rows, to_csv, to_ndjson
+from .core import _wrap
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.gzip import gzip_page
+from .parsers import GzipJSONParser
+from .sync import SyncError, sync
+
+
+# Query construction shared by the sync stat reads and their async
+# counterparts (async_player_stats, async_players), so both always agree.
+def player_stat_filters(params):
+    """
+    {game_id, player_id} filters of a player stats read from query params
+    (either may be omitted, not both). Raises ValueError with the 400 message.
+    """
+    try:
+        filters = {name: int(params[name]) for name in ["game_id", "player_id"] if params.get(name)}
+    except ValueError:
+        raise ValueError("game_id and player_id must be integers.")
+    if not filters:
+        raise ValueError("At least one of game_id or player_id is required.")
+    return filters
+
+
+def flush_before_read(filters):
+    """In queue mode with STAT_INGEST_READ_YOUR_WRITES, apply the pending increments a read covers."""
+    if settings.STAT_INGEST_MODE == "queue" and settings.STAT_INGEST_READ_YOUR_WRITES:
+        flush_pending_increments(**filters)
+
+
+def player_stats_queryset(filters):
+    return PlayerGameStat.objects.filter(**filters).order_by('metric__name')
+
+
+def stat_map_rows(game_id, player_id=None):
+    """(player_id, metric__short_code, count) rows of one game, optionally one player."""
+    stats = PlayerGameStat.objects.filter(game_id=game_id)
+    if player_id is not None:
+        stats = stats.filter(player_id=player_id)
+    # .values(): in Django 5.1, values_list() querysets cannot aiterator().
+    return stats.values('player_id', 'metric__short_code', 'count')
+
+
+def build_stat_map(rows):
+    """{player_id: {short_code: count}} from stat_map_rows."""
+    stat_map = {}
+    for row in rows:
+        stat_map.setdefault(row['player_id'], {})[row['metric__short_code'].lower()] = row['count']
+    return stat_map
 
 
 class PlayerGameStatUpdateView(APIView):
+    authentication_classes = hot_path_authentication_classes()
     permission_classes = [IsAuthenticated, IsSuperAdminOrDataCollector]
+    fast_serializer_class = PlayerGameStatFastSerializer
 
     @wrap_response
     def get(self, request):
@@ -182,66 +427,473 @@ class PlayerGameStatUpdateView(APIView):
           ?player_id=10
           ?game_id=5&player_id=10
         """
-        game_id = request.query_params.get("game_id")
-        player_id = request.query_params.get("player_id")
+        try:
+            filters = player_stat_filters(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-        if not game_id and not player_id:
+        flush_before_read(filters)
+        queryset = player_stats_queryset(filters)
+
+        if self.fast_serializer_class is not None:
+            data = self.fast_serializer_class.serialize(self.fast_serializer_class.values(queryset))
+        else:
+            data = PlayerGameStatSerializer(queryset.select_related('metric', 'player', 'game'), many=True).data
+        return Response(data, status=status.HTTP_200_OK)
+
+    @wrap_response
+    def post(self, request):
+        """
+        POST: Increment one stat, or a batch of stats in one request.
+          {"player_id": 10, "game_id": 5, "metric_id": 2, "value": 1}
+          [{"player_id": 10, "game_id": 5, "metric_id": 2}, ...]
+          {"increments": [...]}
+        Optional per increment: "idempotency_key" (retries with a key that
+        was already recorded are not counted again), "minute", "occurred_at".
+        """
+        if isinstance(request.data, list) or "increments" in request.data:
+            return self._post_batch(request)
+
+        valid, errors, metrics, players = validate_increments([request.data])
+        if errors:
             return Response(
-                {"error": "At least one of game_id or player_id is required."},
+                {"error": errors[0]},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        queryset = PlayerGameStat.objects.all()
+        increment = valid[0][1]
+        if settings.STAT_INGEST_MODE == "queue":
+            rejected = enqueue_increments([increment])
+            if rejected:
+                return Response({"error": rejected[0]}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({
+                "message": f"{metrics[increment.metric_id]} queued",
+                "player": players[increment.player_id],
+                "value": increment.value,
+                "game_id": request.data.get("game_id"),
+                "metric_id": request.data.get("metric_id")
+            }, status=status.HTTP_202_ACCEPTED)
+
+        counts, duplicates, rejected = apply_increments([increment])
+        if rejected:
+            return Response({"error": rejected[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = {
+            "message": f"{metrics[increment.metric_id]} {'already recorded' if duplicates else 'updated'}",
+            "player": players[increment.player_id],
+            "count": counts[increment[:3]],
+            "game_id": request.data.get("game_id"),
+            "metric_id": request.data.get("metric_id")
+        }
+        if increment.idempotency_key:
+            data["duplicate"] = bool(duplicates)
+        return Response(data, status=status.HTTP_200_OK)
+
+    def _post_batch(self, request):
+        items = request.data if isinstance(request.data, list) else request.data.get("increments")
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "increments must be a non-empty list."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        if game_id:
-            queryset = queryset.filter(game_id=game_id)
-        if player_id:
-            queryset = queryset.filter(player_id=player_id)
+        valid, errors, metrics, players = validate_increments(items)
+        queued = settings.STAT_INGEST_MODE == "queue"
+        duplicates = set()
+        if queued:
+            rejected = enqueue_increments([increment for _, increment in valid])
+        else:
+            counts, duplicates, rejected = apply_increments([increment for _, increment in valid])
+        # Positions in ``valid`` -> request indexes.
+        duplicates = {valid[position][0] for position in duplicates}
+        for position, message in rejected.items():
+            errors[valid[position][0]] = message
+        valid = [(index, increment) for index, increment in valid if index not in errors]
+
+        results = [None] * len(items)
+        for index, message in errors.items():
+            results[index] = {"index": index, "status": "error", "error": message}
+        for index, increment in valid:
+            if queued:
+                action = "queued"
+            elif index in duplicates:
+                action = "already recorded"
+            else:
+                action = "updated"
+            result = {
+                "index": index,
+                "status": "success",
+                "message": f"{metrics[increment.metric_id]} {action}",
+                "player": players[increment.player_id],
+                "game_id": increment.game_id,
+                "metric_id": increment.metric_id,
+            }
+            if queued:
+                result["value"] = increment.value
+            else:
+                result["count"] = counts[increment[:3]]
+            if increment.idempotency_key and not queued:
+                result["duplicate"] = index in duplicates
+            results[index] = result
+
+        if not valid:
+            http_status = status.HTTP_400_BAD_REQUEST
+        elif queued:
+            http_status = status.HTTP_202_ACCEPTED
+        else:
+            http_status = status.HTTP_200_OK
+        return Response(
+            {"applied": len(valid), "failed": len(errors), "results": results},
+            status=http_status
+        )
 
-        # Optional: order by metric
-        queryset = queryset.select_related('metric', 'player', 'game').order_by('metric__name')
 
-        serializer = PlayerGameStatSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+@method_decorator(gzip_page, name="dispatch")
+class StatSyncView(APIView):
+    authentication_classes = hot_path_authentication_classes()
+    permission_classes = [IsAuthenticated, IsSuperAdminOrDataCollector]
+    parser_classes = [GzipJSONParser]
 
     @wrap_response
     def post(self, request):
-        player_id = request.data.get("player_id")
-        game_id = request.data.get("game_id")
-        metric_id = request.data.get("metric_id")
-        value = int(request.data.get("value", 1))
+        """
+        POST: Upload events buffered offline and get back what changed.
+          {
+            "device_id": "tablet-7",
+            "since": "1729260000000000",      (sync_token of the last sync; omit on first sync)
+            "games": [5],                      (optional, default: games of the events)
+            "events": [{"seq": 101, "game_id": 5, "player_id": 10, "metric_id": 2,
+                        "value": 1, "minute": 67, "occurred_at": "..."}, ...]
+          }
+        The body may be sent with Content-Encoding: gzip; the response is
+        gzipped for clients that accept it. Events whose (user, device_id,
+        seq) was already merged are skipped, so a batch can be re-sent
+        safely. Once acked_seq comes back the client can drop every event up
+        to it; it stops short of the first rejected event.
+        """
+        data = request.data
+        if not isinstance(data, dict):
+            return Response({"error": "Expected a JSON object."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = sync(
+                request.user.id, data.get("device_id"), data.get("events", []), data.get("since"), data.get("games"),
+            )
+        except SyncError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK)
+
 
-        if not all([player_id, game_id, metric_id]):
+class PlayerSeasonStatView(APIView):
+    authentication_classes = hot_path_authentication_classes()
+    permission_classes = [IsAuthenticated]
+
+    @wrap_response
+    def get(self, request):
+        """
+        GET: Season totals from the PlayerSeasonStat rollup
+        Filters:
+          ?season_id=3            (required)
+          ?player_id=10
+          ?team_id=4              (the player's current club; season totals are per player)
+          ?metric_id=2
+        """
+        season_id = request.query_params.get("season_id")
+        if not season_id:
             return Response(
-                {"error": "player_id, game_id, and metric_id are required."},
+                {"error": "season_id is required."},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            metric = Metric.objects.get(id=metric_id)
-        except Metric.DoesNotExist:
+        queryset = PlayerSeasonStat.objects.filter(season_id=season_id)
+        for param, field in [("player_id", "player_id"), ("team_id", "player__team_id"), ("metric_id", "metric_id")]:
+            value = request.query_params.get(param)
+            if value:
+                queryset = queryset.filter(**{field: value})
+
+        queryset = queryset.select_related('player', 'metric').order_by('player_id', 'metric__name')
+        serializer = PlayerSeasonStatSerializer(queryset, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class LeaderboardView(APIView):
+    authentication_classes = hot_path_authentication_classes()
+    permission_classes = [IsAuthenticated]
+
+    @wrap_response
+    def get(self, request):
+        """
+        GET: Top players for a metric
+          ?metric=2&season=3              (season leaderboard)
+          ?metric=2&matchday=7            (matchday leaderboard)
+          &team=4                         (optional, restrict to one team: the player's
+                                           current club for seasons, the team played
+                                           for in that matchday's games for matchdays)
+          &limit=10&offset=0              (optional, max limit 100)
+        """
+        params = request.query_params
+        if not params.get("metric") or not (params.get("season") or params.get("matchday")):
             return Response(
-                {"error": "Invalid metric_id."},
+                {"error": "metric and one of season or matchday are required."},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        stat, created = PlayerGameStat.objects.get_or_create(
-            player_id=player_id,
-            game_id=game_id,
-            metric_id=metric_id,
-            defaults={'count': 0}
-        )
+        try:
+            metric_id, season_id, matchday_id, team_id = (
+                int(params[name]) if params.get(name) else None
+                for name in ["metric", "season", "matchday", "team"]
+            )
+            limit = min(max(int(params.get("limit", 10)), 1), 100)
+            offset = max(int(params.get("offset", 0)), 0)
+        except ValueError:
+            return Response(
+                {"error": "metric, season, matchday, team, limit and offset must be integers."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        stat.count = F('count') + value
-        stat.save()
-        stat.refresh_from_db()
+        rows = list(leaderboard(
+            metric_id,
+            season_id=season_id,
+            matchday_id=matchday_id,
+            team_id=team_id,
+        )[offset:offset + limit + 1])
 
         return Response({
-            "message": f"{metric.name} updated",
-            "player": stat.player.name,
-            "count": stat.count,
-            "game_id": game_id,
-            "metric_id": metric_id
+            "metric": metric_id,
+            "season": season_id,
+            "matchday": matchday_id,
+            "results": rows[:limit],
+            "next_offset": offset + limit if len(rows) > limit else None,
         }, status=status.HTTP_200_OK)
 
 
+
+class PlayerGameStatExportView(APIView):
+    authentication_classes = hot_path_authentication_classes()
+    permission_classes = [IsAuthenticated, IsSuperAdminOrAdminOrDataCollector]
+
+    def get(self, request):
+        """
+        GET: Stream PlayerGameStat rows as CSV or NDJSON
+          ?output=csv (default) | ndjson
+        Filters (any combination):
+          ?season_id= &matchday_id= &game_id= &team_id= &player_id= &metric_id=
+        """
+        output = request.query_params.get("output", "csv")
+        if output not in ("csv", "ndjson"):
+            return _wrap({"error": "output must be csv or ndjson."}, status.HTTP_400_BAD_REQUEST, "Invalid output.")
+
+        filters = {}
+        for param, lookup in EXPORT_FILTERS.items():
+            value = request.query_params.get(param)
+            if value:
+                try:
+                    filters[lookup] = int(value)
+                except ValueError:
+                    return _wrap({"error": f"{param} must be an integer."}, status.HTTP_400_BAD_REQUEST, "Invalid filter.")
+
+        rows = export_rows(filters)
+        if output == "csv":
+            response = StreamingHttpResponse(to_csv(rows), content_type="text/csv")
+            response["Content-Disposition"] = 'attachment; filename="player-stats.csv"'
+        else:
+            response = StreamingHttpResponse(to_ndjson(rows), content_type="application/x-ndjson")
+        return response
+
+
+# core/views.py
+import asyncio
+import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+from .authentication import get_validated_token
+from .broadcast import get_broker
+from .core import json_envelope
+
+
+async def game_stat_stream(request, game_id):
+    """
+    GET: Server-Sent Events stream of stat increments for one game.
+      /api/games/5/stream/            (Authorization: Bearer <access>)
+      /api/games/5/stream/?token=...  (for EventSource clients)
+
+    Each applied increment batch arrives as an ``event: stats`` message whose
+    data is {"game_id", "stats": [{"player_id", "metric_id", "value", "count"}]}.
+    Only served under ASGI: under WSGI an open stream would hold a worker
+    for good, so the request is answered with 501.
+    """
+    if not isinstance(request, ASGIRequest):
+        return json_envelope({}, 501, "The live stream is only available from the ASGI server.")
+    if request.method != "GET":
+        return json_envelope({}, 405, "Method not allowed.")
+    if get_validated_token(request) is None:
+        return json_envelope({}, 401, "Authentication credentials were not provided or are invalid.")
+    if not await Game.objects.filter(id=game_id).aexists():
+        return json_envelope({}, 404, "Game not found.")
+
+    async def events():
+        async with get_broker().subscribe(game_id) as subscription:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(), timeout=settings.STAT_STREAM_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: stats\ndata: {json.dumps(event)}\n\n"
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from .middleware import metrics
+
+
+def request_metrics(request):
+    """
+    GET: Per-view request counts, query counts and timings collected by
+    RequestMetricsMiddleware, in the Prometheus text format.
+      Authorization: Bearer <REQUEST_METRICS_TOKEN>
+    Not served at all (404) until REQUEST_METRICS_TOKEN is set.
+    """
+    token = settings.REQUEST_METRICS_TOKEN
+    if not token:
+        return json_envelope({}, 404, "Not found.")
+    if not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return json_envelope({}, 401, "Authentication credentials were not provided or are invalid.")
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# core/views.py
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+
+from .core import DEFAULT_MESSAGE, SUCCESS_MESSAGES
+from .pagination import IdCursorPagination
+from .permissions import aget_token_roles
+
+
+def async_read_view(*roles):
+    """
+    Async counterpart of a DRF GET action for plain async Django views.
+
+    The access token is validated and its user looked up (one query, see
+    aget_token_roles): it must still exist and be active and, when
+    ``roles`` are given, be a superuser or hold one of them. Errors use the
+    same envelope as wrap_response. The view returns (data, http_status).
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            if request.method != "GET":
+                return json_envelope({}, 405, "Method not allowed.")
+            token = get_validated_token(request, query_token=False)
+            if token is None:
+                return json_envelope({}, 401, "Authentication credentials were not provided or are invalid.")
+            access = await aget_token_roles(token)
+            if access is None:
+                return json_envelope({}, 401, "User not found or inactive.")
+            is_superuser, granted = access
+            if roles and not is_superuser and not granted & set(roles):
+                return json_envelope({}, 403, "You do not have permission to perform this action.")
+
+            data, http_status = await view(request, *args, **kwargs)
+            if http_status < 400:
+                message = SUCCESS_MESSAGES.get(http_status, DEFAULT_MESSAGE)
+            else:
+                message = data.get("detail", DEFAULT_MESSAGE)
+            return json_envelope(data, http_status, message)
+        return wrapped
+    return decorator
+
+
+def _int_param(request, name):
+    """Query parameter ``name`` as an int; None when absent, ValueError when malformed."""
+    value = request.GET.get(name)
+    return int(value) if value else None
+
+
+async def _paginated(queryset, request, serialize):
+    try:
+        rows, links = await IdCursorPagination().apaginate(queryset, Request(request))
+    except NotFound as exc:
+        return {"detail": str(exc.detail)}, 404
+    return {**links, "results": serialize(rows)}, 200
+
+
+@async_read_view("data_collector")
+async def async_player_stats(request):
+    """
+    GET: Async PlayerGameStatUpdateView.get, same filters and output.
+      /api/async/player-stats/?game_id=5&player_id=10
+    """
+    try:
+        filters = player_stat_filters(request.GET)
+    except ValueError as exc:
+        return {"error": str(exc)}, 400
+
+    await sync_to_async(flush_before_read)(filters)
+    queryset = PlayerGameStatFastSerializer.values(player_stats_queryset(filters))
+    return PlayerGameStatFastSerializer.serialize([row async for row in queryset.aiterator()]), 200
+
+
+@async_read_view()
+async def async_games(request, pk=None):
+    """
+    GET: Async GameViewSet list (cursor-paginated) and retrieve, same output.
+      /api/async/games/  /api/async/games/5/
+    ?fields= is not supported here.
+    """
+    queryset = GameFastSerializer.values(Game.objects.all())
+    if pk is None:
+        return await _paginated(queryset, request, GameFastSerializer.serialize)
+    try:
+        return GameFastSerializer.serialize([await queryset.aget(pk=pk)])[0], 200
+    except Game.DoesNotExist:
+        return {"detail": "No Game matches the given query."}, 404
+
+
+PLAYER_FIELDS = ["id", "name", "team", "position", "jersey_number"]
+
+
+async def _astat_map(game_id, player_id=None):
+    """Async PlayerViewSet.get_stat_map."""
+    return build_stat_map([row async for row in stat_map_rows(game_id, player_id).aiterator()])
+
+
+@async_read_view()
+async def async_players(request, pk=None):
+    """
+    GET: Async PlayerViewSet list (cursor-paginated) and retrieve, same
+    output, including ``stats`` for ?game_id=.
+      /api/async/players/?game_id=5  /api/async/players/10/?game_id=5
+    ?fields= is not supported here.
+    """
+    try:
+        game_id = _int_param(request, "game_id")
+    except ValueError:
+        return {"detail": "game_id must be an integer."}, 400
+    stat_map = await _astat_map(game_id, pk) if game_id is not None else {}
+
+    def serialize(rows):
+        return [{**row, "stats": stat_map.get(row["id"], {})} for row in rows]
+
+    queryset = Player.objects.values(*PLAYER_FIELDS)
+    if pk is None:
+        return await _paginated(queryset, request, serialize)
+    try:
+        return serialize([await queryset.aget(pk=pk)])[0], 200
+    except Player.DoesNotExist:
+        return {"detail": "No Player matches the given query."}, 404
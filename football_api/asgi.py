@@ -3,6 +3,19 @@ ASGI config for football_api project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with uvicorn for the async read views (/api/async/...) and the
+live stat stream, e.g.:
+
+    uvicorn football_api.asgi:application --workers 4
+
+The live stream (/api/games/<id>/stream/) is only served here; the WSGI
+server answers it with 501 rather than tie up a worker per open stream.
+
+The Procfile still runs football_api.wsgi under gunicorn: under ASGI Django
+buffers sync StreamingHttpResponses such as /api/player-stats/export/ in
+memory before sending them, so move the export to ASGI only if it is made
+async too.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -44,13 +44,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.RequestMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
 ]
 
 ROOT_URLCONF = 'football_api.urls'
@@ -94,17 +95,78 @@ load_dotenv(dotenv_path=BASE_DIR / '.env')
 
 import dj_database_url
 
+# Persistent connections: a worker keeps its connection for DB_CONN_MAX_AGE
+# seconds instead of reconnecting on every request, and pings it before
+# reusing it after a request boundary so a database restart does not surface
+# as a 500. Under ASGI prefer DB_POOL, since persistent connections are per
+# thread there.
 DATABASES = {
-    'default': dj_database_url.config(default='sqlite:///db.sqlite3')
+    'default': dj_database_url.config(
+        default='sqlite:///db.sqlite3',
+        conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        conn_health_checks=os.environ.get('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
+    )
 }
 
-
-
-
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql' and os.environ.get('DB_POOL', 'False') == 'True':
+    # Django's native psycopg 3 pool (needs psycopg[pool]). Connections go
+    # back to the pool at the end of each request, so it replaces
+    # CONN_MAX_AGE, which must then be 0.
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', '300')),
+    }
+elif DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Single-node SQLite: writes take the lock up front (IMMEDIATE) instead of
+    # failing on upgrade, and a writer waits up to SQLITE_BUSY_TIMEOUT seconds
+    # for the lock. SQLITE_WAL=True switches the file to WAL, which lets
+    # readers run alongside the writer; it is opt-in because it rewrites the
+    # database file's header (and adds -wal/-shm files) on first connect.
+    sqlite_pragmas = ['PRAGMA temp_store=MEMORY;', 'PRAGMA cache_size=-20000;', 'PRAGMA mmap_size=134217728;']
+    if os.environ.get('SQLITE_WAL', 'False') == 'True':
+        sqlite_pragmas = ['PRAGMA journal_mode=WAL;', 'PRAGMA synchronous=NORMAL;'] + sqlite_pragmas
+    DATABASES['default'].setdefault('OPTIONS', {}).update({
+        'timeout': float(os.environ.get('SQLITE_BUSY_TIMEOUT', '20')),
+        'transaction_mode': 'IMMEDIATE',
+        'init_command': ''.join(sqlite_pragmas),
+    })
+
+
+
+
+
+# JWT_STATELESS_AUTH=True builds request.user from the verified token claims
+# (id, is_superuser, roles) instead of loading the User row on every request.
+JWT_STATELESS_AUTH = os.environ.get('JWT_STATELESS_AUTH', 'False') == 'True'
+JWT_AUTHENTICATION_CLASS = (
+    'rest_framework_simplejwt.authentication.JWTStatelessUserAuthentication'
+    if JWT_STATELESS_AUTH else
+    'rest_framework_simplejwt.authentication.JWTAuthentication'
+)
+
+# Response cache for the reference-data viewsets (leagues, seasons,
+# matchdays, teams, metrics). locmem is per process; point CACHE_BACKEND at
+# django.core.cache.backends.filebased.FileBasedCache (CACHE_LOCATION = a
+# directory) or a shared server so invalidations reach every worker.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'football-api'),
+    }
+}
+RESPONSE_CACHE_TIMEOUT = 300  # seconds
+# Lifetime of the per-model and per-player form cache versions
+# (core.cache.model_version, core.form.player_form). A shared cache keeps
+# them until the next change; locmem cannot see other workers' bumps (e.g.
+# the queue-mode flusher's), so there they expire and are reseeded after a minute.
+CACHE_VERSION_TIMEOUT = 60 if CACHES['default']['BACKEND'].endswith('.LocMemCache') else None
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        JWT_AUTHENTICATION_CLASS,
         'rest_framework.authentication.BasicAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
@@ -112,8 +174,61 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'EXCEPTION_HANDLER': 'core.core.custom_exception_handler',
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.IdCursorPagination',
 }
 
+# Authenticators of the stat write/read endpoints. The default list unless
+# HOT_PATH_JWT_ONLY=True, which drops the Basic and Session fallbacks there.
+HOT_PATH_JWT_ONLY = os.environ.get('HOT_PATH_JWT_ONLY', 'False') == 'True'
+HOT_PATH_AUTHENTICATION_CLASSES = (
+    [JWT_AUTHENTICATION_CLASS] if HOT_PATH_JWT_ONLY else REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES']
+)
+
+# Live stat events pushed to /api/games/<id>/stream/. The in-process broker
+# only reaches subscribers of the same worker; set STAT_BROADCAST_REDIS_URL
+# to fan out through Redis when running several.
+STAT_BROADCAST_REDIS_URL = os.environ.get('STAT_BROADCAST_REDIS_URL')
+STAT_BROADCAST = {
+    'BACKEND': 'core.broadcast.RedisBroker' if STAT_BROADCAST_REDIS_URL else 'core.broadcast.InProcessBroker',
+    'OPTIONS': {'url': STAT_BROADCAST_REDIS_URL} if STAT_BROADCAST_REDIS_URL else {},
+}
+STAT_STREAM_KEEPALIVE_SECONDS = 15
+
+# "sync" applies stat increments inside the request. "queue" appends them to
+# the PendingIncrement table and answers 202; `manage.py flush_increments`
+# applies them in coalesced batches. With read-your-writes on (opt-in: it
+# costs a flush per read), GET /api/player-stats/ flushes the pending rows
+# it is about to read first.
+STAT_INGEST_MODE = os.environ.get('STAT_INGEST_MODE', 'sync')
+STAT_INGEST_READ_YOUR_WRITES = os.environ.get('STAT_INGEST_READ_YOUR_WRITES', 'False') == 'True'
+
+# POST /api/sync/ (core.sync): deltas reach this far behind the client's
+# sync token, and gzip request bodies may expand to at most this size.
+STAT_SYNC_OVERLAP_SECONDS = int(os.environ.get('STAT_SYNC_OVERLAP_SECONDS', '10'))
+STAT_SYNC_MAX_BODY_BYTES = int(os.environ.get('STAT_SYNC_MAX_BODY_BYTES', str(10 * 1024 * 1024)))
+
+# core.standings: short_code of the Metric whose TeamGameStat counts are a
+# team's goals in a game.
+STANDINGS_GOAL_METRIC = os.environ.get('STANDINGS_GOAL_METRIC', 'GOAL')
+
+# core.form (GET /api/players/<id>/form/): short_code of the Metric holding
+# minutes played, for per-90 rates, and how long a computed series is kept.
+# Cached series are also dropped as soon as the player's stats change.
+FORM_MINUTES_METRIC = os.environ.get('FORM_MINUTES_METRIC', 'MIN')
+FORM_CACHE_TIMEOUT = 24 * 60 * 60  # seconds
+
+# core.middleware.RequestMetricsMiddleware: Server-Timing headers, N+1
+# warnings and the Prometheus endpoint /api/_metrics. Scrapers authenticate
+# with "Authorization: Bearer <REQUEST_METRICS_TOKEN>"; without a token the
+# endpoint is not served.
+REQUEST_METRICS_TOKEN = os.environ.get('REQUEST_METRICS_TOKEN', '')
+REQUEST_METRICS_N_PLUS_ONE_THRESHOLD = int(os.environ.get('REQUEST_METRICS_N_PLUS_ONE_THRESHOLD', '10'))
+REQUEST_METRICS_SERVER_TIMING = os.environ.get('REQUEST_METRICS_SERVER_TIMING', 'True') == 'True'
+
 from datetime import timedelta
 
 SIMPLE_JWT = {
@@ -122,6 +237,8 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': False,
     'BLACKLIST_AFTER_ROTATION': False,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    # Embeds roles in the token; only trusted with JWT_STATELESS_AUTH.
+    'TOKEN_OBTAIN_SERIALIZER': 'core.serializers.RoleTokenObtainPairSerializer',
 }
 
 # DATABASES = {
@@ -182,6 +299,3 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 import os
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATIC_URL = '/static/'
-
-# Whitenoise middleware
-MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')